@@ -1,10 +1,13 @@
 #### **Listing 5.1: Extracting News Articles**
 ```python
-import requests  #A
+import sys  #A
 import pandas as pd  
 import logging  
 from datetime import datetime, timedelta  
 
+sys.path.append('../..')  # repo root, so pipeline_kit is importable  
+from pipeline_kit.newsapi import extract_articles as fetch_articles  
+
 NEWS_API_KEY = 'your_news_api_key_here'  #B
 
 # Dynamic date calculation: today minus one day  
@@ -12,24 +15,19 @@ today = datetime.now().date()  #C
 yesterday = today - timedelta(days=1)  
 
 # Function to extract articles from NewsAPI  
-def extract_articles(query, from_date=yesterday, api_key=NEWS_API_KEY):  
-    url = f'https://newsapi.org/v2/everything?q={query}&from={from_date}&to={today}&apiKey={api_key}'  #D
-    response = requests.get(url)  
-    
-    if response.status_code == 200:  
-        articles = response.json().get('articles', [])  #E
-        logging.info(f"Successfully extracted {len(articles)} articles.")  
-        return articles  
-    else:  
-        logging.error(f"Failed to fetch articles. Status code: {response.status_code}")  
-        return None  
+def extract_articles(query, from_date=yesterday, api_key=NEWS_API_KEY, concurrency=8):  
+    articles = fetch_articles(query, from_date, today, api_key=api_key, concurrency=concurrency)  #D
+    logging.info(f"Successfully extracted {len(articles)} articles.")  #E
+    return articles  
 
 # Example use case  
 articles = extract_articles('Tesla')  #F
+# articles = extract_articles(['Tesla', 'NVIDIA', 'Disney'])  # many tickers, fetched in parallel  #G
 
-#A Import required libraries for requests, data handling, and logging.
+#A Import required libraries for data handling and logging, plus the shared async extractor.
 #B Store your NewsAPI key as a constant for easy access.
 #C Calculate today’s date and set yesterday for the date range.
-#D Construct the URL for the NewsAPI request using query, date range, and API key.
-#E Extract articles from the response and log success or failure.
-#F Call the function with "Tesla" as a query example.
\ No newline at end of file
+#D Page through every result page concurrently over one shared connection pool.
+#E The extractor retries rate limits (429) and server errors with backoff and raises NewsAPIError on any other failure, so reaching this line means every page came back; log the total.
+#F Call the function with "Tesla" as a query example.
+#G Pass a list of queries to fan out across tickers; use pipeline_kit.newsapi.stream_articles to consume them as a stream.
\ No newline at end of file
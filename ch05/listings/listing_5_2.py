@@ -1,29 +1,25 @@
-# Function to preprocess articles  
-def preprocess_articles(articles):  
-    data = []  #A
-    
-    for article in articles[:5]:  # Limit to 5 articles for testing  #B
-        title = article.get('title', '')  
-        description = article.get('description', '')  
-        content = article.get('content', '')  
-        
-        # Clean and format the text  
-        clean_text = f"{title} {description} {content}".replace('\n', ' ').strip()  #C
-        data.append({  
-            'title': title,  
-            'description': description,  
-            'content': clean_text  
-        })  
-        
-    df = pd.DataFrame(data)  #D
-    logging.info(f"Preprocessed {len(df)} articles.")  
-    return df  
+from pipeline_kit.preprocess import iter_article_chunks  # repo root is on sys.path from listing 5.1
 
-# Preprocess the extracted articles  
+# Function to preprocess articles
+def preprocess_articles(articles, sample=5, chunk_size=1000):
+    chunks = []  #A
+
+    for chunk in iter_article_chunks(articles, chunk_size=chunk_size, sample=sample):  #B
+        # Title, description and content are cleaned and combined column-wise  #C
+        chunks.append(chunk)
+
+    df = pd.concat(chunks) if chunks else pd.DataFrame(columns=['title', 'description', 'content'])  #D
+    logging.info(f"Preprocessed {len(df)} articles.")
+    return df
+
+# Preprocess the extracted articles
 df_articles = preprocess_articles(articles)  #E
+# df_articles = preprocess_articles(articles, sample=None)  # every article  #F
+# df_articles = preprocess_articles(articles, sample=0.1)   # a random 10% sample
 
-#A Initialize an empty list to store preprocessed article data.
-#B Loop through the first 5 articles, limiting scope for testing.
-#C Clean and format the combined text fields by removing line breaks.
-#D Convert the list of dictionaries into a DataFrame for structured analysis.
+#A Initialize an empty list to collect the preprocessed chunks.
+#B Stream the articles through in fixed-size chunks; sample limits the scope for testing (5 articles by default).
+#C Text is normalized with vectorized pandas string ops: line breaks and repeated whitespace collapsed, NewsAPI's "[+N chars]" marker dropped.
+#D Concatenate the chunks into one DataFrame for structured analysis.
 #E Call preprocess_articles and store the result in df_articles.
+#F sample=None processes every article, an int keeps the first N, and a float keeps that fraction at random. For very large pulls, process each chunk inside the loop instead of collecting them, so memory stays flat.
@@ -1,14 +1,16 @@
 import openai  
+from pipeline_kit.llm_cache import CachedOpenAI  # repo root is on sys.path from listing 5.1
 
 # Set your OpenAI API key  
 openai.api_key = 'your_openai_api_key_here'  #A
+llm = CachedOpenAI()  # identical requests are answered from a local cache  
 
 # Function to perform sentiment analysis using ChatGPT  
 def perform_sentiment_analysis(article_content):  
     prompt = f"Analyze the sentiment of the following article content: {article_content}. Is the sentiment positive, negative, or neutral?"
     
     try:  
-        response = openai.chat.completions.create(  
+        response = llm.chat.completions.create(  
             model="gpt-4o",  
             messages=[  
                 {"role": "system", "content": "You are a helpful assistant."},  
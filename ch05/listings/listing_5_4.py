@@ -2,7 +2,7 @@ def perform_sentiment_analysis(article_content):
     prompt = f"Analyze the sentiment of the following article content and return 'Positive', 'Neutral', or 'Negative' only: {article_content}."  #A
     
     try:  
-        response = openai.chat.completions.create(  
+        response = llm.chat.completions.create(  
             model="gpt-4o",  
             messages=[  
                 {"role": "system", "content": "You are a helpful assistant."},  
@@ -19,5 +19,15 @@ def perform_sentiment_analysis(article_content):
         logging.error(f"Error performing sentiment analysis: {e}")  
         return None  
 
+# Batched variant: many articles per request, one structured score per article  
+from pipeline_kit.sentiment import batch_sentiment  
+
+def perform_sentiment_analysis_batch(contents):  
+    scores = pd.Series(batch_sentiment(contents, llm=llm), dtype="float")  #C
+    return pd.cut(scores, bins=[-1.01, -0.2, 0.2, 1.0],  #D
+                  labels=["Negative", "Neutral", "Positive"]).astype(object).tolist()
+
 #A Modify the prompt to return only a structured sentiment value.
 #B Extract and clean the AI's response for structured output.
+#C Pack as many articles as fit a token budget into each call; the model returns a list of {id, score} objects.
+#D Bucket the numeric scores into the same three labels, vectorized over the whole batch.
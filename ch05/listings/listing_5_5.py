@@ -1,5 +1,35 @@
+from pipeline_kit.concurrency import map_concurrent  # repo root is on sys.path from listing 5.1
+from pipeline_kit.local_sentiment import tiered_sentiment
+
 # Function to update DataFrame with sentiment analysis  
-def update_with_sentiment(df):  
+def update_with_sentiment(df, concurrent=False, tiered=False, max_in_flight=8,
+                          requests_per_minute=500, tokens_per_minute=30000):  
+    if tiered:  
+        scores, report = tiered_sentiment(  #I
+            df['content'],
+            lambda texts: map_concurrent(
+                perform_sentiment_analysis,
+                texts,
+                max_in_flight=max_in_flight,
+                requests_per_minute=requests_per_minute,
+                tokens_per_minute=tokens_per_minute,
+            ),
+        )
+        logging.info(f"Escalated {report['escalated']}/{report['rows']} articles to the LLM: {report}")  #J
+        df['sentiment'] = scores
+        return df  
+
+    if concurrent:  
+        sentiments = map_concurrent(  #F
+            perform_sentiment_analysis,
+            df['content'].tolist(),
+            max_in_flight=max_in_flight,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
+        df['sentiment'] = pd.Series(sentiments, index=df.index)  #G
+        return df  
+
     sentiments = []  #A
     
     for index, content in enumerate(df['content']):  
@@ -12,9 +42,16 @@ def update_with_sentiment(df):
 
 # Update DataFrame  
 df_articles_with_sentiment = update_with_sentiment(df_articles)  #E
+# df_articles_with_sentiment = update_with_sentiment(df_articles, concurrent=True, max_in_flight=16)  #H
+# df_articles_with_sentiment = update_with_sentiment(df_articles, tiered=True)  # local lexicon first, LLM for the rest
 
 #A Initialize list for storing sentiment results.
 #B Call perform_sentiment_analysis on each article.
 #C Log sentiment progress.
 #D Add sentiment column to DataFrame.
 #E Apply function and update DataFrame.
+#F Concurrent mode: run many LLM calls at once, capped by in-flight, request-per-minute and token-per-minute limits.
+#G Results come back in row order; assign the whole column at once, aligned to the DataFrame index.
+#H For large batches, switch on concurrent mode and size max_in_flight to your rate-limit tier.
+#I Tiered mode: score every article locally with a finance lexicon, then escalate only borderline or low-confidence rows to the LLM.
+#J The report carries the escalation rate, per-tier latency, and lexicon/LLM agreement.
\ No newline at end of file
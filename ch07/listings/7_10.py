@@ -1,8 +1,11 @@
+import sys
 import pandas as pd  #A
-from pandas.tseries.offsets import BDay  #B
 import pytz  #C
 from datetime import datetime  #D
 
+sys.path.append('../..')  # repo root, so pipeline_kit is importable
+from pipeline_kit.ledger_dates import business_due_dates, fiscal_quarters, term_days  #B
+
 transactions = [
     {"account": "A001", "transaction_date": "2025-01-31T16:00:00Z", "terms": "NET30", "amount_due": 1200},
     {"account": "A001", "transaction_date": "2025-02-28T12:45:00Z", "terms": "NET60", "amount_due": 800},
@@ -47,21 +50,10 @@ df["month"] = df["transaction_date"].dt.month  #O
 df["year"] = df["transaction_date"].dt.year  #P
 
 # F: Custom fiscal quarter based on internal calendar (Q1 = Feb–Apr)  #Q
-def get_fiscal_quarter(date):  #R
-    fiscal_month = (date.month - 1) % 12 + 1  #S
-    if fiscal_month in [2, 3, 4]: return "Q1"  #T
-    elif fiscal_month in [5, 6, 7]: return "Q2"  #U
-    elif fiscal_month in [8, 9, 10]: return "Q3"  #V
-    else: return "Q4"  #W
-
-df["fiscal_quarter"] = df["transaction_date"].apply(get_fiscal_quarter)  #X
+df["fiscal_quarter"] = fiscal_quarters(df["transaction_date"], start_month=2)  #X
 
 # 2: Due date calculation using business days only  #Y
-def get_due_date(row):  #Z
-    term_days = int(row["terms"].replace("NET", ""))  #AA
-    return row["transaction_date"] + BDay(term_days)  #AB
-
-df["due_date"] = df.apply(get_due_date, axis=1)  #AC
+df["due_date"] = business_due_dates(df["transaction_date"], term_days(df["terms"]))  #AC
 
 # 3: Percent contribution of each transaction to its account's total balance  #AD
 account_totals = df.groupby("account")["amount_due"].transform("sum")  #AE
@@ -6,8 +6,21 @@ summaries and sentiment analysis, and loads them into PostgreSQL.
 
 Parameters (pass via trigger config):
 - query: Company name to search for (default: "Tesla")
+- queries: List of queries to fan out across in one run (overrides query)
+- concurrency: Max NewsAPI requests in flight (default: 8)
+- max_pages: Optional cap on result pages fetched per query
 - from_date: Start date in YYYY-MM-DD format (default: yesterday)
 - to_date: End date in YYYY-MM-DD format (default: today)
+- sample: Articles to enrich per run: an int keeps the first N, a float in
+  (0, 1) a random fraction, null keeps all (default: 5, to limit API costs)
+- llm_mode: "merged" (default) fills extraction, sentiment and QC fields in
+  one LLM call per article; "staged" runs them as three separate passes
+- load_mode: "upsert" (default) merges on the article URL hash so re-runs
+  never duplicate rows; "append" COPYs straight into news_articles
+- sentiment_mode: "llm" (default) scores every summary with the LLM; "tiered"
+  scores locally with a finance lexicon and escalates only borderline rows.
+  Tiered needs llm_mode="staged": with the merged call sentiment is already
+  in the response, so the combination is rejected at extract time
 """
 
 from datetime import datetime, timedelta
@@ -45,17 +58,28 @@ def news_articles_pipeline():
         """
         Cell 1: Extract articles from NewsAPI
         
-        Retrieves articles based on query and date range parameters.
+        Retrieves articles based on query and date range parameters. Every
+        query is paged through concurrently over one shared connection pool.
         """
-        import requests
-        import pandas as pd
-        from datetime import datetime, timedelta
+        from pipeline_kit.db import connection
+        from datetime import datetime, timedelta, timezone
+        from pipeline_kit.newsapi import extract_articles as fetch_articles
+        from pipeline_kit.news_state import ensure_state_tables, get_watermarks
+        from pipeline_kit.artifacts import write_artifact
         
         # Get parameters from trigger config or use defaults
         dag_run = context.get('dag_run')
         conf = dag_run.conf if dag_run else {}
         
-        query = conf.get('query', 'Tesla')
+        queries = conf.get('queries') or [conf.get('query', 'Tesla')]
+        concurrency = int(conf.get('concurrency', 8))
+        max_pages = conf.get('max_pages')
+        incremental = conf.get('incremental', True)
+        execution_mode = conf.get('execution_mode', 'sync')
+        sentiment_mode = conf.get('sentiment_mode', 'llm')
+        sample = conf.get('sample', 5)
+        llm_mode = conf.get('llm_mode', 'merged')
+        load_mode = conf.get('load_mode', 'upsert')
         
         # Handle date parameters
         today = datetime.now().date()
@@ -64,32 +88,97 @@ def news_articles_pipeline():
         from_date = conf.get('from_date', str(yesterday))
         to_date = conf.get('to_date', str(today))
         
+        if sentiment_mode == 'tiered' and llm_mode == 'merged':
+            raise ValueError(
+                'sentiment_mode="tiered" needs llm_mode="staged": the merged call returns sentiment '
+                'with the extraction, so there is no separate sentiment pass to tier'
+            )
+        
         NEWS_API_KEY = os.getenv('NEWS_API_KEY')
         
         if not NEWS_API_KEY:
             raise ValueError("NEWS_API_KEY environment variable is not set")
         
-        url = f'https://newsapi.org/v2/everything?q={query}&from={from_date}&to={to_date}&apiKey={NEWS_API_KEY}'
+        # Per-query watermarks: only ask for articles newer than the last load
+        since = {}
+        if incremental:
+            with connection() as conn:
+                ensure_state_tables(conn)
+                watermarks = get_watermarks(conn, queries)
+            
+            for query, ts in watermarks.items():
+                mark = ts.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+                if mark > from_date:
+                    since[query] = mark
+            logging.info(f"Using stored watermarks for {len(since)} of {len(queries)} queries")
+        
+        logging.info(
+            f"Fetching articles for {len(queries)} queries, from={from_date}, to={to_date}, "
+            f"concurrency={concurrency}"
+        )
         
-        logging.info(f"Fetching articles for query='{query}', from={from_date}, to={to_date}")
+        # Raises on a bad key or exhausted retries; report says which queries got every page
+        report = {}
+        articles = fetch_articles(
+            queries,
+            from_date,
+            to_date,
+            api_key=NEWS_API_KEY,
+            concurrency=concurrency,
+            max_pages=max_pages,
+            since=since,
+            report=report,
+        )
+        complete_queries = [query for query, status in report.items() if status['complete']]
+        logging.info(
+            f"Successfully extracted {len(articles)} articles "
+            f"({len(complete_queries)} of {len(queries)} queries fully paged)"
+        )
         
-        response = requests.get(url)
+        # Articles go to Parquet (one partition per query); only the reference goes through XCom
+        artifact = write_artifact(articles, 'extract', context=context, partition_cols=['query'])
         
-        if response.status_code == 200:
-            articles = response.json().get('articles', [])
-            logging.info(f"Successfully extracted {len(articles)} articles")
-            
-            # Return articles as list of dicts
-            return {
-                'articles': articles,
-                'query': query,
-                'from_date': from_date,
-                'to_date': to_date,
-                'count': len(articles)
-            }
-        else:
-            logging.error(f"Failed to fetch articles. Status code: {response.status_code}")
-            raise Exception(f"API request failed with status {response.status_code}")
+        return {
+            'artifact': artifact,
+            'query': ', '.join(queries),
+            'queries': queries,
+            'complete_queries': complete_queries,
+            'from_date': from_date,
+            'to_date': to_date,
+            'incremental': incremental,
+            'execution_mode': execution_mode,
+            'sentiment_mode': sentiment_mode,
+            'sample': sample,
+            'llm_mode': llm_mode,
+            'load_mode': load_mode,
+            'count': artifact['rows']
+        }
+    
+    @task()
+    def filter_new_articles(extract_result: dict):
+        """
+        Drop articles that were already loaded
+        
+        Matches URL and content hashes against news_article_hashes so
+        previously enriched articles never reach an OpenAI call.
+        """
+        from airflow.operators.python import get_current_context
+        from pipeline_kit.artifacts import read_records, write_artifact
+        from pipeline_kit.db import connection
+        from pipeline_kit.news_state import filter_unseen
+        
+        if not extract_result.get('incremental', True):
+            return extract_result
+        
+        with connection() as conn:
+            articles = filter_unseen(conn, read_records(extract_result['artifact']))
+        artifact = write_artifact(articles, 'filter', context=get_current_context(), partition_cols=['query'])
+        
+        return {
+            **extract_result,
+            'artifact': artifact,
+            'count': artifact['rows']
+        }
     
     @task()
     def transform_articles(extract_result: dict):
@@ -99,47 +188,54 @@ def news_articles_pipeline():
         Extracts structured data and performs sentiment analysis.
         """
         import openai
-        import pandas as pd
-        from pydantic import BaseModel
+        from airflow.operators.python import get_current_context
+        from pipeline_kit.artifacts import read_records, write_artifact
+        from pipeline_kit.llm_cache import CachedOpenAI
+        from pipeline_kit.news_enrichment import (
+            EXTRACTION_PROMPT, MERGED_PROMPT, EnrichedArticle, ExtractedArticle, clean_enrichment, fallback_rows
+        )
+        from pipeline_kit.preprocess import take_sample
         
         openai.api_key = os.getenv('OPENAI_API_KEY')
         
         if not openai.api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
         
-        class ExtractedArticle(BaseModel):
-            source: str
-            title: str
-            short_summary: str
-            publish_date: str
+        llm = CachedOpenAI()
         
-        system_prompt = f"""
-You are a data extraction agent. For each input article JSON, return a single object matching this schema:
-{ExtractedArticle.schema_json(indent=2)}
-
-Use the raw JSON to guide extraction with natural language hints:
-- source: use article['source']['name'] when present.
-- title: use article['title'].
-- short_summary: 1–2 sentences summarizing the article in plain English.
-- publish_date: use article['publishedAt'] (ISO-8601 timestamp).
-
-Return exactly one object that matches the schema.
-        """.strip()
+        # llm_mode="merged" fills extraction, sentiment and QC in one call per
+        # article; "staged" keeps the separate extraction/sentiment/QC passes
+        merged = extract_result.get('llm_mode', 'merged') == 'merged'
+        ArticleSchema = EnrichedArticle if merged else ExtractedArticle
         
-        def perform_sentiment_analysis(text: str):
-            """Analyze sentiment of text and return score from -1 to 1"""
+        # Pipeline bookkeeping, not article content: kept out of the prompt (and so
+        # out of the LLM cache key) and re-attached to the result by with_lineage
+        lineage_only = ("query", "url_hash", "content_hash")
+        
+        def extraction_messages(article):
+            raw = {key: value for key, value in article.items() if key not in lineage_only}
+            return [
+                {"role": "system", "content": MERGED_PROMPT if merged else EXTRACTION_PROMPT},
+                {"role": "user", "content": f"{raw}"}
+            ]
+        
+        def sentiment_messages(text):
             prompt = (
                 "Analyze the sentiment of the following text and return a numerical sentiment "
                 "score from -1 (very negative) to 1 (very positive). Return only the number: "
                 f"{text}"
             )
+            return [
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": prompt}
+            ]
+        
+        def perform_sentiment_analysis(text: str):
+            """Analyze sentiment of text and return score from -1 to 1"""
             try:
-                response = openai.chat.completions.create(
+                response = llm.chat.completions.create(
                     model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant."},
-                        {"role": "user", "content": prompt}
-                    ],
+                    messages=sentiment_messages(text),
                     max_tokens=50,
                     temperature=0.3
                 )
@@ -149,36 +245,117 @@ Return exactly one object that matches the schema.
                 logging.error(f"Error performing sentiment analysis: {e}")
                 return None
         
-        articles = extract_result['articles']
+        def with_lineage(item, article):
+            # Keep lineage for the watermark/hash bookkeeping at load time
+            for key in ("query", "url", "publishedAt", "url_hash", "content_hash"):
+                item[key] = article.get(key)
+            return item
+        
+        # Raw NewsAPI fields plus lineage; urlToImage is never sent to the LLM
+        articles = read_records(extract_result['artifact'], columns=[
+            "source", "author", "title", "description", "url", "publishedAt", "content",
+            "query", "url_hash", "content_hash"
+        ])
+        execution_mode = extract_result.get('execution_mode', 'sync')
+        sentiment_mode = extract_result.get('sentiment_mode', 'llm')
         results = []
         
-        # Limit to prevent excessive API calls during testing (remove limit for production)
-        max_articles = 5
-        logging.info(f"Processing {min(len(articles), max_articles)} articles out of {len(articles)} total")
+        # Sample to limit API calls (pass sample=null in the trigger config for production)
+        total = len(articles)
+        articles = list(take_sample(articles, extract_result.get('sample', 5)))
+        logging.info(
+            f"Processing {len(articles)} articles out of {total} total "
+            f"(execution_mode={execution_mode}, llm_mode={'merged' if merged else 'staged'})"
+        )
         
-        for idx, article in enumerate(articles[:max_articles]):
-            try:
-                completion = openai.beta.chat.completions.parse(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": f"{article}"}
+        if execution_mode == 'batch':
+            from pipeline_kit.batch_api import chat_request, message_content, parse_results, run_batch
+            
+            # custom_id = article URL, so batch results join back to their article
+            by_url = {}
+            for article in articles:
+                by_url.setdefault(article.get('url') or article.get('title'), article)
+            
+            extraction = parse_results(run_batch(
+                [chat_request(url, "gpt-4o", extraction_messages(a), ArticleSchema) for url, a in by_url.items()],
+                metadata={'stage': 'news_extraction'},
+                cache=llm.cache
+            ), ArticleSchema)
+            for url, parsed in extraction.items():
+                if parsed:
+                    results.append(with_lineage(clean_enrichment(parsed.dict()), by_url[url]))
+            
+            def score_sentiment(texts):
+                sentiment = run_batch(
+                    [
+                        chat_request(str(i), "gpt-4o", sentiment_messages(text), max_tokens=50, temperature=0.3)
+                        for i, text in enumerate(texts)
                     ],
-                    response_format=ExtractedArticle
+                    metadata={'stage': 'news_sentiment'},
+                    cache=llm.cache
                 )
-                parsed = completion.choices[0].message.parsed
-                if parsed:
-                    item = parsed.dict()
-                    item["sentiment"] = perform_sentiment_analysis(item["short_summary"])
-                    results.append(item)
-                    logging.info(f"Processed article {idx + 1}/{min(len(articles), max_articles)}")
-            except Exception as e:
-                logging.error(f"Error on article {idx}: {e}")
+                scores = []
+                for i in range(len(texts)):
+                    try:
+                        scores.append(float(message_content(sentiment[str(i)]).strip()))
+                    except (KeyError, ValueError, AttributeError) as e:
+                        logging.error(f"No sentiment for text {i}: {e}")
+                        scores.append(None)
+                return scores
+        else:
+            for idx, article in enumerate(articles):
+                try:
+                    completion = llm.beta.chat.completions.parse(
+                        model="gpt-4o",
+                        messages=extraction_messages(article),
+                        response_format=ArticleSchema
+                    )
+                    parsed = completion.choices[0].message.parsed
+                    if parsed:
+                        results.append(with_lineage(clean_enrichment(parsed.dict()), article))
+                        logging.info(f"Processed article {idx + 1}/{len(articles)}")
+                except Exception as e:
+                    logging.error(f"Error on article {idx}: {e}")
+            
+            def score_sentiment(texts):
+                return [perform_sentiment_analysis(text) for text in texts]
+        
+        if merged:
+            # Sentiment came back with the extraction call; rows where it was not a
+            # usable number fall back to the staged sentiment pass
+            redo = fallback_rows(results, ["sentiment"])
+            logging.info(
+                f"llm_mode=merged: sentiment and QC fields came back with the extraction call; "
+                f"{len(redo)} of {len(results)} rows fall back to the sentiment pass"
+            )
+            if redo:
+                scores = score_sentiment([results[pos]["short_summary"] for pos in redo])
+                for pos, score in zip(redo, scores):
+                    results[pos]["sentiment"] = score
+        else:
+            # Sentiment agent: every summary to the LLM, or a local lexicon first
+            # with only borderline summaries escalated (sentiment_mode="tiered")
+            summaries = [item["short_summary"] for item in results]
+            if sentiment_mode == 'tiered' and summaries:
+                from pipeline_kit.local_sentiment import tiered_sentiment
+                scores, report = tiered_sentiment(summaries, score_sentiment)
+                logging.info(
+                    f"Tiered sentiment escalated {report['escalated']}/{report['rows']} summaries "
+                    f"({report['escalation_rate']:.0%}); local {report['local_seconds']}s, "
+                    f"LLM {report['llm_seconds']}s; agreement {report['agreement_escalated']}"
+                )
+                scores = scores.astype(object).where(scores.notna(), None).tolist()
+            else:
+                scores = score_sentiment(summaries)
+            for item, score in zip(results, scores):
+                item["sentiment"] = score
         
         logging.info(f"Successfully transformed {len(results)} articles")
+        logging.info(f"LLM cache: {llm.cache.stats()}")
         
         return {
-            'extracted_articles': results,
+            'artifact': write_artifact(results, 'transform', context=get_current_context()),
+            'count': len(results),
             'metadata': extract_result
         }
     
@@ -187,67 +364,107 @@ Return exactly one object that matches the schema.
         """
         Cell 3: Quality check and categorize articles
         
-        Adds timezone conversions, topic categorization, and region detection.
+        Adds topic categorization and region detection (LLM), plus short_date
+        and EST/PST/GMT timestamps derived locally from publish_date.
         """
         import openai
-        import pandas as pd
-        from pydantic import BaseModel
+        from pipeline_kit.llm_cache import CachedOpenAI
+        from pipeline_kit.news_enrichment import QC_PROMPT, QualityCategorization, fallback_rows
+        from pipeline_kit.publish_times import with_publish_times
+        from airflow.operators.python import get_current_context
+        from pipeline_kit.artifacts import read_records, write_artifact
         
         openai.api_key = os.getenv('OPENAI_API_KEY')
         
-        class QualityCategorization(BaseModel):
-            short_date: str            # YYYY-MM-DD (no timezone)
-            publish_est: str           # ISO-8601 datetime in America/New_York
-            publish_pst: str           # ISO-8601 datetime in America/Los_Angeles
-            publish_gmt: str           # ISO-8601 datetime in GMT/UTC (+00:00)
-            topic: str                 # One of: Financial, Operations, Product/Technology, etc.
-            region: str                # One of: North America, South America, Europe, etc.
-        
-        qc_system_prompt = f"""
-You are a data quality and categorization agent. For each input article, return a single object matching this schema:
-{QualityCategorization.schema_json(indent=2)}
-
-Instructions:
-- short_date: Derive from the input publish_date by dropping time and timezone, format as YYYY-MM-DD.
-- publish_est / publish_pst / publish_gmt: Convert the input publish_date to the specified timezone and return ISO-8601 (include timezone offset).
-- topic: Choose the best label from [Financial, Operations, Product/Technology, Regulatory/Legal, Market/Competition, Executive/Personnel, Strategy/M&A, Customers/Partnerships, Supply Chain/Manufacturing, ESG/Sustainability, Risk/Incidents, Marketing/PR].
-- region: Infer using language cues, source, and content (country/city mentions). Map to one of: [North America, South America, Europe, Africa, Middle East, Asia, Oceania].
-- Return strictly valid JSON with exactly these keys and no extra text.
-        """.strip()
-        
-        extracted_articles = transform_result['extracted_articles']
-        qc_results = []
-        
-        for idx, article in enumerate(extracted_articles):
+        def qc_messages(article):
             article_input = {
                 "source": article.get("source", ""),
                 "title": article.get("title", ""),
-                "short_summary": article.get("short_summary", ""),
-                "publish_date": article.get("publish_date", "")
+                "short_summary": article.get("short_summary", "")
             }
-            try:
-                completion = openai.beta.chat.completions.parse(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": qc_system_prompt},
-                        {"role": "user", "content": f"{article_input}"}
-                    ],
-                    response_format=QualityCategorization
-                )
-                parsed = completion.choices[0].message.parsed
+            return [
+                {"role": "system", "content": QC_PROMPT},
+                {"role": "user", "content": f"{article_input}"}
+            ]
+        
+        extracted_articles = read_records(transform_result['artifact'])
+        merged = transform_result['metadata'].get('llm_mode', 'merged') == 'merged'
+        if merged:
+            # The merged call already categorized these; only rows whose topic or region
+            # matched no label go through the QC pass (and are kept as they are if it fails)
+            redo = set(fallback_rows(extracted_articles, ["topic", "region"]))
+            qc_results = [article for pos, article in enumerate(extracted_articles) if pos not in redo]
+            pending = [article for pos, article in enumerate(extracted_articles) if pos in redo]
+            logging.info(
+                f"llm_mode=merged: {len(qc_results)} articles already categorized, "
+                f"{len(pending)} fall back to the QC pass"
+            )
+        else:
+            qc_results, pending = [], extracted_articles
+        
+        if not pending:
+            return {
+                'artifact': write_artifact(
+                    with_publish_times(qc_results), 'quality_check', context=get_current_context()
+                ),
+                'count': len(qc_results),
+                'metadata': transform_result['metadata']
+            }
+        
+        if not openai.api_key:
+            raise ValueError("OPENAI_API_KEY environment variable is not set")
+        
+        llm = CachedOpenAI()
+        execution_mode = transform_result['metadata'].get('execution_mode', 'sync')
+        
+        if execution_mode == 'batch':
+            from pipeline_kit.batch_api import chat_request, parse_results, run_batch
+            
+            # custom_id = position in the pending list
+            qc = parse_results(run_batch(
+                [
+                    chat_request(str(idx), "gpt-4o", qc_messages(article), QualityCategorization)
+                    for idx, article in enumerate(pending)
+                ],
+                metadata={'stage': 'news_quality_check'},
+                cache=llm.cache
+            ), QualityCategorization)
+            for idx, article in enumerate(pending):
+                parsed = qc.get(str(idx))
+                if parsed:
+                    qc_results.append({**article, **parsed.dict()})
+                elif merged:
+                    qc_results.append(article)
+        else:
+            for idx, article in enumerate(pending):
+                parsed = None
+                try:
+                    completion = llm.beta.chat.completions.parse(
+                        model="gpt-4o",
+                        messages=qc_messages(article),
+                        response_format=QualityCategorization
+                    )
+                    parsed = completion.choices[0].message.parsed
+                except Exception as e:
+                    logging.error(f"QC error on article {idx}: {e}")
                 if parsed:
                     qc_data = parsed.dict()
                     # Merge original article data with QC data
                     enriched_article = {**article, **qc_data}
                     qc_results.append(enriched_article)
-                    logging.info(f"Enriched article {idx + 1}/{len(extracted_articles)}")
-            except Exception as e:
-                logging.error(f"QC error on article {idx}: {e}")
+                    logging.info(f"Enriched article {idx + 1}/{len(pending)}")
+                elif merged:
+                    qc_results.append(article)
+        
+        # Date/timezone columns are a pure function of publish_date: no LLM needed
+        qc_results = with_publish_times(qc_results)
         
         logging.info(f"Successfully enriched {len(qc_results)} articles")
+        logging.info(f"LLM cache: {llm.cache.stats()}")
         
         return {
-            'enriched_articles': qc_results,
+            'artifact': write_artifact(qc_results, 'quality_check', context=get_current_context()),
+            'count': len(qc_results),
             'metadata': transform_result['metadata']
         }
     
@@ -256,11 +473,25 @@ Instructions:
         """
         Cell 4: Load enriched articles to PostgreSQL
         
-        Generates DDL if needed and inserts articles into the database.
+        Generates DDL only when the column map changes (versioned in
+        schema_registry) and inserts articles into the database.
+        Article hashes and query watermarks are recorded in the same
+        transaction, so a failed load never advances the watermark. A
+        watermark only moves for fully paged queries and stays below any
+        article that was extracted but not loaded, so those are retried.
+        
+        load_mode="upsert" (default) merges on url_hash through a temporary
+        staging table, so retries and re-triggers never duplicate rows;
+        load_mode="append" COPYs straight into news_articles.
         """
-        import psycopg
+        from pipeline_kit.db import connection, statement_stats
         import openai
         from pydantic import BaseModel
+        from pipeline_kit.llm_cache import CachedOpenAI
+        from pipeline_kit.bulk_load import copy_frame, upsert_frame
+        from pipeline_kit.news_state import article_hashes, ensure_state_tables, record_loaded
+        from pipeline_kit.schema_registry import ensure_schema
+        from pipeline_kit.artifacts import read_records
         
         openai.api_key = os.getenv('OPENAI_API_KEY')
         
@@ -269,6 +500,7 @@ Instructions:
         
         # Define expected schema
         sample_fields = {
+            "url_hash": "text",
             "source": "text",
             "title": "text",
             "short_summary": "text",
@@ -282,81 +514,100 @@ Instructions:
             "region": "text"
         }
         
-        # Generate DDL using AI
-        ddl_prompt = f"""
-You are a SQL DDL assistant. Return only a single valid PostgreSQL CREATE TABLE statement for table name news_articles.
+        # Generate DDL using AI (only when the field map changes; see schema_registry)
+        def generate_ddl(table, fields):
+            ddl_prompt = f"""
+You are a SQL DDL assistant. Return only a single valid PostgreSQL CREATE TABLE statement for table name {table}.
 Use these columns and suggested types. Adjust types conservatively if needed, add NOT NULL only if obviously safe.
 Columns:
-{json.dumps(sample_fields, indent=2)}
+{json.dumps(fields, indent=2)}
 
 Rules:
 - Include a surrogate primary key id BIGSERIAL PRIMARY KEY.
 - Add created_at TIMESTAMPTZ DEFAULT NOW().
 - Use snake_case column names exactly as provided.
 - Return strictly the SQL, no comments or extra text.
-        """.strip()
-        
-        completion = openai.beta.chat.completions.parse(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": ddl_prompt},
-                {"role": "user", "content": "Generate the DDL now."}
-            ],
-            response_format=TableDDL
-        )
-        TABLE_DDL = completion.choices[0].message.parsed.ddl
-        logging.info(f"Generated DDL:\n{TABLE_DDL}")
+            """.strip()
+            
+            if not openai.api_key:
+                raise ValueError("OPENAI_API_KEY environment variable is not set (needed to generate DDL)")
+            
+            completion = CachedOpenAI().beta.chat.completions.parse(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": ddl_prompt},
+                    {"role": "user", "content": "Generate the DDL now."}
+                ],
+                response_format=TableDDL
+            )
+            return completion.choices[0].message.parsed.ddl
         
         # Connect to PostgreSQL
-        conn = psycopg.connect(
-            host=os.getenv("PGHOST", "localhost"),
-            port=os.getenv("PGPORT", "5432"),
-            dbname=os.getenv("PGDATABASE", "news_db"),
-            user=os.getenv("PGUSER", "news_user"),
-            password=os.getenv("PGPASSWORD", "")
-        )
-        
-        # Create table if not exists
-        with conn.cursor() as cur:
-            try:
-                cur.execute(TABLE_DDL)
-                logging.info("Table created successfully")
-            except Exception as e:
-                msg = str(e).lower()
-                if "already exists" in msg:
-                    logging.info("Table already exists, continuing...")
-                else:
-                    raise
-        conn.commit()
-        
-        # Prepare insert
-        cols = [
-            "source", "title", "short_summary", "publish_date", "sentiment",
-            "short_date", "publish_est", "publish_pst", "publish_gmt", "topic", "region"
-        ]
-        
-        placeholders = ",".join(["%s"] * len(cols))
-        insert_sql = f"INSERT INTO news_articles ({','.join(cols)}) VALUES ({placeholders})"
-        
-        # Convert articles to tuples
-        enriched_articles = enrichment_result['enriched_articles']
-        rows = []
-        for article in enriched_articles:
-            row = tuple(article.get(c) for c in cols)
-            rows.append(row)
-        
-        # Batch insert
-        with conn.cursor() as cur:
-            if rows:
-                cur.executemany(insert_sql, rows)
-                logging.info(f"Inserted {len(rows)} rows into news_articles")
+        with connection() as conn:
+            # Create or migrate the table; a no-op (and no LLM call) when the fields are unchanged
+            schema = ensure_schema(conn, "news_articles", sample_fields, generate_ddl)
+            
+            # Natural key for idempotent upserts, plus indexes for verify_load and
+            # downstream filters (url_hash stays NULL on rows loaded before it existed)
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS news_articles_url_hash_key ON news_articles (url_hash);
+                    CREATE INDEX IF NOT EXISTS news_articles_publish_date_idx ON news_articles (publish_date);
+                    CREATE INDEX IF NOT EXISTS news_articles_topic_idx ON news_articles (topic);
+                    CREATE INDEX IF NOT EXISTS news_articles_region_idx ON news_articles (region);
+                """)
+            conn.commit()
+            
+            cols = [
+                "url_hash", "source", "title", "short_summary", "publish_date", "sentiment",
+                "short_date", "publish_est", "publish_pst", "publish_gmt", "topic", "region"
+            ]
+            enriched_articles = [
+                {**article, 'url_hash': article.get('url_hash') or article_hashes(article)[0]}
+                for article in read_records(
+                    enrichment_result['artifact'],
+                    columns=cols + ["query", "url", "publishedAt", "content_hash", "description", "content"]
+                )
+            ]
+            load_mode = enrichment_result['metadata'].get('load_mode', 'upsert')
+            
+            # Bulk load with COPY (binary where the column types allow)
+            ensure_state_tables(conn)
+            stats = {'rows': 0, 'rows_per_sec': 0.0}
+            if enriched_articles and load_mode == 'upsert':
+                stats = upsert_frame(conn, "news_articles", enriched_articles, key="url_hash", columns=cols)
+                logging.info(
+                    f"Upserted {stats['merged']} of {stats['rows']} rows into news_articles "
+                    f"({stats['rows_per_sec']} rows/s into staging)"
+                )
+            elif enriched_articles:
+                # Append keeps url_hash NULL so repeated loads do not trip the unique key
+                stats = copy_frame(conn, "news_articles", enriched_articles, columns=cols[1:])
+                logging.info(f"Inserted {stats['rows']} rows into news_articles ({stats['rows_per_sec']} rows/s)")
             else:
                 logging.warning("No rows to insert")
-        conn.commit()
-        conn.close()
+            
+            # Everything extracted this run; what did not make it through enrichment is retried next run
+            extracted = [
+                {**article, 'url_hash': article.get('url_hash') or article_hashes(article)[0]}
+                for article in read_records(
+                    enrichment_result['metadata']['artifact'],
+                    columns=["query", "url", "publishedAt", "url_hash", "title", "description", "content"]
+                )
+            ]
+            record_loaded(
+                conn,
+                enriched_articles,
+                pending=extracted,
+                complete=set(enrichment_result['metadata'].get('complete_queries', [])),
+            )
+            conn.commit()
+        logging.info(f"Postgres statement timings: {statement_stats()}")
         
         return {
-            'rows_inserted': len(rows),
+            'rows_inserted': stats.get('merged', stats['rows']),
+            'rows_per_sec': stats['rows_per_sec'],
+            'schema_version': schema['version'],
             'metadata': enrichment_result['metadata']
         }
     
@@ -367,36 +618,28 @@ Rules:
         
         Queries the database to confirm articles were inserted.
         """
-        import psycopg
+        from pipeline_kit.db import connection, statement_stats
         import pandas as pd
         
-        conn = psycopg.connect(
-            host=os.getenv("PGHOST", "localhost"),
-            port=os.getenv("PGPORT", "5432"),
-            dbname=os.getenv("PGDATABASE", "news_db"),
-            user=os.getenv("PGUSER", "news_user"),
-            password=os.getenv("PGPASSWORD", "")
-        )
-        
-        # Count total rows
-        with conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) FROM news_articles;")
-            total_rows = cur.fetchone()[0]
-        
-        logging.info(f"Total rows in news_articles: {total_rows}")
-        
-        # Get last 5 rows
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT id, source, title, publish_date, topic, region, sentiment, created_at
-                FROM news_articles
-                ORDER BY id DESC
-                LIMIT 5;
-            """)
-            rows = cur.fetchall()
-            cols = [c[0] for c in cur.description]
-        
-        conn.close()
+        with connection() as conn:
+            # Count total rows
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*) FROM news_articles;")
+                total_rows = cur.fetchone()[0]
+            
+            logging.info(f"Total rows in news_articles: {total_rows}")
+            
+            # Get last 5 rows
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT id, source, title, publish_date, topic, region, sentiment, created_at
+                    FROM news_articles
+                    ORDER BY id DESC
+                    LIMIT 5;
+                """)
+                rows = cur.fetchall()
+                cols = [c[0] for c in cur.description]
+        logging.info(f"Postgres statement timings: {statement_stats()}")
         
         # Create DataFrame for logging
         df = pd.DataFrame(rows, columns=cols)
@@ -411,7 +654,8 @@ Rules:
     
     # Define task dependencies
     extract_result = extract_articles()
-    transform_result = transform_articles(extract_result)
+    new_articles = filter_new_articles(extract_result)
+    transform_result = transform_articles(new_articles)
     enrichment_result = quality_check_and_categorize(transform_result)
     load_result = load_to_postgres(enrichment_result)
     verify_result = verify_load(load_result)
@@ -1,5 +1,5 @@
 #cell 1
-import requests  #A
+import sys  #A
 import pandas as pd  
 import logging  
 import os
@@ -9,6 +9,9 @@ pd.set_option("display.max_colwidth", None)
 
 load_dotenv()
 
+sys.path.append('../..')  # repo root, so pipeline_kit is importable
+from pipeline_kit.newsapi import extract_articles as fetch_articles
+
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")  #B
 
 # Dynamic date calculation: today minus one day  
@@ -16,17 +19,13 @@ today = datetime.now().date()  #C
 yesterday = today - timedelta(days=1)  
 
 # Function to extract articles from NewsAPI  
-def extract_articles(query, from_date=yesterday, api_key=NEWS_API_KEY):  
-    url = f'https://newsapi.org/v2/everything?q={query}&from={from_date}&to={today}&apiKey={api_key}'  #D
-    response = requests.get(url)  
-    
-    if response.status_code == 200:  
-        articles = response.json().get('articles', [])  #E
-        logging.info(f"Successfully extracted {len(articles)} articles.")  
-        return articles  
-    else:  
-        logging.error(f"Failed to fetch articles. Status code: {response.status_code}")  
-        return []  
+def extract_articles(query, from_date=yesterday, api_key=NEWS_API_KEY, concurrency=8):  
+    # Pages are fetched concurrently; a list of queries fans out across tickers.
+    # Rate limits and server errors are retried with backoff; any other failure
+    # raises NewsAPIError instead of returning a partial list.
+    articles = fetch_articles(query, from_date, today, api_key=api_key, concurrency=concurrency)  #D
+    logging.info(f"Successfully extracted {len(articles)} articles.")  #E
+    return articles  
 
 # Example use case  
 articles = extract_articles('Tesla')  #F
@@ -4,9 +4,12 @@ import openai
 import pandas as pd
 from dotenv import load_dotenv
 from pydantic import BaseModel
+from pipeline_kit.llm_cache import CachedOpenAI  # repo root is on sys.path from listing 8.1
+from pipeline_kit.sentiment import batch_sentiment
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
+llm = CachedOpenAI()  # re-runs answer identical requests from a local cache
 
 class ExtractedArticle(BaseModel):
     source: str
@@ -35,7 +38,7 @@ def perform_sentiment_analysis(text: str):
         f"{text}"
     )
     try:
-        response = openai.chat.completions.create(
+        response = llm.chat.completions.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant."},
@@ -56,7 +59,7 @@ input_articles = articles  # from prior cell
 # Limit for quick iteration; adjust/remove as needed
 for idx, article in enumerate(input_articles[:5]):
     try:
-        completion = openai.beta.chat.completions.parse(
+        completion = llm.beta.chat.completions.parse(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -66,11 +69,14 @@ for idx, article in enumerate(input_articles[:5]):
         )
         parsed = completion.choices[0].message.parsed
         if parsed:
-            item = parsed.dict()
-            item["sentiment"] = perform_sentiment_analysis(item["short_summary"])  # agent call
-            results.append(item)
+            results.append(parsed.dict())
     except Exception as e:
         print(f"Error on article {idx}: {e}")
 
 extracted_df = pd.DataFrame(results)
+
+# Sentiment agent, batched: many summaries per call instead of one call each
+# (perform_sentiment_analysis above is the one-at-a-time version)
+if not extracted_df.empty:
+    extracted_df["sentiment"] = batch_sentiment(extracted_df["short_summary"].tolist(), llm=llm)
 extracted_df
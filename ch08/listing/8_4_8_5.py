@@ -4,16 +4,23 @@ import logging
 import pandas as pd
 import openai
 from pydantic import BaseModel
+from pipeline_kit.llm_cache import CachedOpenAI
+from pipeline_kit.bulk_load import copy_frame
+from pipeline_kit.schema_registry import ensure_schema
 
 # Ensure psycopg is available
 import sys, subprocess
 try:
     import psycopg
+    import psycopg_pool
 except Exception:
-    subprocess.run([sys.executable, "-m", "pip", "install", "psycopg[binary]>=3.1"], check=False)
+    subprocess.run([sys.executable, "-m", "pip", "install", "psycopg[binary,pool]>=3.1"], check=False)
     import psycopg
 
+from pipeline_kit.db import connection
+
 openai.api_key = os.getenv("OPENAI_API_KEY")
+llm = CachedOpenAI()
 
 # Pydantic for DDL contract
 class TableDDL(BaseModel):
@@ -34,12 +41,13 @@ sample_fields = {
     "region": "text"
 }
 
-# Compose prompt to generate DDL
-ddl_prompt = f"""
-You are a SQL DDL assistant. Return only a single valid PostgreSQL CREATE TABLE statement for table name news_articles.
+# Ask AI for DDL -- only called when sample_fields changes (the version is kept in schema_registry)
+def generate_ddl(table, fields):
+    ddl_prompt = f"""
+You are a SQL DDL assistant. Return only a single valid PostgreSQL CREATE TABLE statement for table name {table}.
 Use these columns and suggested types. Adjust types conservatively if needed, add NOT NULL only if obviously safe.
 Columns:
-{json.dumps(sample_fields, indent=2)}
+{json.dumps(fields, indent=2)}
 
 Rules:
 - Include a surrogate primary key id BIGSERIAL PRIMARY KEY.
@@ -48,60 +56,33 @@ Rules:
 - Return strictly the SQL, no comments or extra text.
 """.strip()
 
-# Ask AI for DDL
-completion = openai.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": ddl_prompt},
-        {"role": "user", "content": "Generate the DDL now."}
-    ],
-    response_format=TableDDL
-)
-TABLE_DDL = completion.choices[0].message.parsed.ddl
-print(TABLE_DDL)
-
-# Connect to Postgres
-conn = psycopg.connect(
-    host=os.getenv("PGHOST", "localhost"),
-    port=os.getenv("PGPORT", "5432"),
-    dbname=os.getenv("PGDATABASE", "news_db"),
-    user=os.getenv("PGUSER", "news_user"),
-    password=os.getenv("PGPASSWORD", "")
-)
-
-# Create table if not exists (idempotent):
-with conn.cursor() as cur:
-    try:
-        cur.execute(TABLE_DDL)
-    except Exception as e:
-        # If table already exists, ignore
-        msg = str(e).lower()
-        if "already exists" not in msg:
-            raise
-conn.commit()
+    completion = llm.beta.chat.completions.parse(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": ddl_prompt},
+            {"role": "user", "content": "Generate the DDL now."}
+        ],
+        response_format=TableDDL
+    )
+    return completion.choices[0].message.parsed.ddl
 
-# Prepare insert (upsert optional)
-cols = [
-    "source", "title", "short_summary", "publish_date", "sentiment",
-    "short_date", "publish_est", "publish_pst", "publish_gmt", "topic", "region"
-]
+# Borrow a pooled connection built from the PG* env vars; it commits when the block exits cleanly
+with connection() as conn:
+    # Create the table on first run, ALTER it when sample_fields changes, otherwise do nothing
+    schema = ensure_schema(conn, "news_articles", sample_fields, generate_ddl)
+    print(f"news_articles schema version {schema['version']} ({schema['action']})")
+    if schema["ddl"]:
+        print(schema["ddl"])
 
-placeholders = ",".join(["%s"] * len(cols))
-insert_sql = f"INSERT INTO news_articles ({','.join(cols)}) VALUES ({placeholders})"
+    # Columns to load
+    cols = [
+        "source", "title", "short_summary", "publish_date", "sentiment",
+        "short_date", "publish_est", "publish_pst", "publish_gmt", "topic", "region"
+    ]
 
-# Convert dataframe rows to tuples
-rows = []
-for _, r in enriched_df.iterrows():
-    rows.append(tuple(r.get(c) for c in cols))
-
-# Batch insert
-with conn.cursor() as cur:
-    if rows:
-        cur.executemany(insert_sql, rows)
-        print(f"Inserted {len(rows)} rows into news_articles")
+    # Bulk load: one COPY stream straight from the DataFrame (binary where types allow)
+    if len(enriched_df):
+        stats = copy_frame(conn, "news_articles", enriched_df, columns=cols)
+        print(f"Inserted {stats['rows']} rows into news_articles ({stats['rows_per_sec']} rows/s, {stats['format']} COPY)")
     else:
         print("No rows to insert")
-conn.commit()
-
-conn.close()
-
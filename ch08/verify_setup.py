@@ -66,7 +66,8 @@ def check_dependencies():
         'pydantic': '2.0.0',
         'requests': '2.31.0',
         'python-dotenv': '1.0.0',
-        'psycopg': '3.1.0'
+        'psycopg': '3.1.0',
+        'psycopg_pool': '3.1.0'
     }
     
     optional_packages = {
@@ -327,7 +328,7 @@ def check_postgres_connection():
         
     except ImportError as e:
         print_error(f"Missing psycopg package: {e}")
-        print_info("Install with: pip install 'psycopg[binary]>=3.1.0'")
+        print_info("Install with: pip install 'psycopg[binary,pool]>=3.1.0'")
         return False
     except Exception as e:
         print_error(f"PostgreSQL connection failed: {e}")
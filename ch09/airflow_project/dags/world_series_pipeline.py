@@ -1,31 +1,102 @@
 """
-World Series Game 7 Play-by-Play Analysis Pipeline
-===================================================
-Processes play-by-play text data from World Series Game 7 and extracts:
+World Series Play-by-Play Analysis Pipeline
+===========================================
+Processes play-by-play text data from one or many World Series games
+(every file matching DATA_GLOB) and extracts:
 - Structured game data (innings, scores, players, pitch data)
 - Canonical player/pitch mappings
 - Excitement metrics and key moments
 - Statistical analyses
 
 Configuration:
-- NUM_ROWS: Set to 10 for testing, 0 for all rows
+- DATA_GLOB: Play-by-play CSV files to process, one game per file; the
+  file name (without .csv) is the game_id (override per run with
+  {"data_glob": "/data/2025_postseason/*.csv"})
+- NUM_ROWS: Plays per game, 10 for testing, 0 for all rows (override per
+  run with {"num_rows": 0})
+- EXECUTION_MODE: "sync" for per-play completions, or "batch" to submit each
+  LLM stage as one OpenAI Batch API job (override per run with
+  {"execution_mode": "batch"} in the trigger config)
+
+Every game is loaded by a mapped task, then plan_shards splits all of
+them into play_id ranges of SHARD_SIZE (override with {"shard_size": 25})
+as one flat list of (game_id, shard) pairs. Extraction and excitement
+analysis run one mapped task instance per pair in LLM_POOL, so a single
+long game still fans out across workers. The per-game task group ``game``
+merges its shards, maps canonical ids and writes the game's summary, and
+aggregate_games rolls the games up:
+
+    list_games -> load (per game) -> plan_shards -> extract/analyze (per shard)
+        -> game[merge -> map -> summary] -> aggregate_games
+
+A failing shard or game only fails its own game's group. In batch mode
+each game is a single shard, since the Batch API parallelizes
+server-side. Each task writes only the columns it adds (plus
+play_id/play_hash) as a Parquet checkpoint under
+PIPELINE_ARTIFACT_ROOT/<dag_id>/<run_id>/<game_id>.<stage>/ and passes the
+location through XCom; readers join the columns they need on play_id. A
+retried task whose checkpoint already exists for the run is skipped;
+trigger with {"rebuild": true} to recompute every stage. Canonical
+mapping resolves distinct names only.
+
+Extraction and excitement analysis keep each play's result in an
+enrichment store keyed by play_hash (a MemoTable in MEMO_PATH), so later
+runs, games and appended or corrected rows only send plays with new text
+to the LLM. Window-mode scores depend on the surrounding plays, so they
+are keyed by game, half-inning and the window's play hashes instead, and
+only windows containing new plays are re-scored.
+
+Excitement analysis scores a whole half-inning per call by default
+(ANALYSIS_MODE = 'window', or {"analysis_mode": "play"} for one call per
+play), so the model sees the plays leading up to each one.
+
+Each game's summary adds its plays to additive pitcher/batter/inning
+aggregate tables (pipeline_kit.play_aggregates) stored under
+PLAY_STATS_ROOT per game: each run adds only the plays not aggregated
+before. aggregate_games then rolls the stored tables up across the run's
+games without re-reading any plays.
+Trigger with {"stats_to_postgres": true} to mirror them into Postgres.
 """
 
 from airflow import DAG
+from airflow.decorators import task_group
 from airflow.operators.python import PythonOperator
 from datetime import datetime, timedelta
 import pandas as pd
+import glob
 import hashlib
+import json
 import openai
 import os
-from pydantic import BaseModel
-from typing import Optional
-import pickle
+from functools import lru_cache
+from pydantic import BaseModel, create_model
+from typing import List, Optional
+
+from pipeline_kit.artifacts import write_artifact
+from pipeline_kit.batch_api import chat_request, parse_results, run_batch
+from pipeline_kit.canonical_match import CanonicalMatcher
+from pipeline_kit.llm_cache import CachedOpenAI
+from pipeline_kit.memo import MemoTable, memo_version
+from pipeline_kit.play_aggregates import AggregateStore, combine, finalize, save_to_postgres
+from pipeline_kit.play_rules import coverage, pre_extract
+from pipeline_kit.play_shards import (
+    enrichment_store, game_stage, half_inning_windows, half_innings, merge_shard_artifacts, pending_plays,
+    plan_game_shards, read_plays, shard_stage, stage_checkpoint, window_key, window_results,
+)
 
 # =============================================================================
 # CONFIGURATION - CHANGE THIS TO CONTROL NUMBER OF ROWS PROCESSED
 # =============================================================================
-NUM_ROWS = 10  # Set to 10 for testing, 0 to process ALL rows (729)
+NUM_ROWS = 10  # Plays per game: 10 for testing, 0 to process ALL rows (trigger config: {"num_rows": N})
+EXECUTION_MODE = 'sync'  # 'sync' or 'batch' (OpenAI Batch API: half price, results within 24h)
+SHARD_SIZE = 50  # Plays per mapped extraction/analysis instance, cut at half-innings (trigger config: {"shard_size": N})
+LLM_POOL = 'default_pool'  # Airflow pool the LLM stages run in (create one to cap API concurrency)
+LLM_POOL_SLOTS = 1  # Pool slots each LLM task instance occupies
+MAX_ACTIVE_SHARDS = 16  # Shards of one LLM stage running at once across workers and games
+MAX_ACTIVE_GAMES = 16  # Games in canonical mapping at once
+ANALYSIS_MODE = 'window'  # 'window' (one call per half-inning) or 'play' (one call per play)
+WINDOW_TOKEN_BUDGET = 6000  # Input tokens per half-inning window call (longer innings are split)
+STATS_TO_POSTGRES = False  # Also write the aggregate tables to Postgres (PG* env vars)
 # =============================================================================
 
 # Default DAG arguments
@@ -43,49 +114,135 @@ default_args = {
 dag = DAG(
     'world_series_analysis',
     default_args=default_args,
-    description='Analyze World Series Game 7 play-by-play data with AI',
+    description='Analyze World Series play-by-play data with AI, sharded across games and play ranges',
     schedule_interval=None,  # Manual trigger only
     catchup=False,
     tags=['baseball', 'ai', 'analysis'],
 )
 
-# Paths
-DATA_PATH = '/opt/airflow/dags/../data/world_series_2025_game_7_playbyplay.csv'
-TEMP_DATA_PATH = '/opt/airflow/airflow-data/temp_data.pkl'
+# Paths: one play-by-play CSV per game
+DATA_GLOB = '/opt/airflow/dags/../data/*_playbyplay.csv'
+GAME_GROUP = 'game'  # Mapped task group that merges, maps and summarizes one game
 
 # OpenAI setup
 openai.api_key = os.getenv('OPENAI_API_KEY')
 
+# Every call goes through a content-addressed cache (LLM_CACHE_PATH), so
+# re-running after a downstream failure costs no API calls for finished stages
+llm = CachedOpenAI()
+
+
+def get_conf(context):
+    """Trigger config of the current run ({} when triggered without one)"""
+    dag_run = context.get('dag_run')
+    return (dag_run.conf if dag_run else None) or {}
+
+
+def get_execution_mode(context):
+    """Trigger config wins over the EXECUTION_MODE constant"""
+    return get_conf(context).get('execution_mode', EXECUTION_MODE)
+
+
+def completed_stage(stage, context, inputs=None):
+    """This run's finished checkpoint for a stage, unless {"rebuild": true} was passed"""
+    return stage_checkpoint(stage, context=context, inputs=inputs, rebuild=get_conf(context).get('rebuild'))
+
+
+def game_task(task_id):
+    """Task id of a task inside the per-game group"""
+    return f"{GAME_GROUP}.{task_id}"
+
+
+def upstream_ref(context, task_id):
+    """Checkpoint reference returned by an upstream per-game task (same map index = same game)"""
+    ti = context['ti']
+    return ti.xcom_pull(task_ids=task_id, map_indexes=ti.map_index)
+
 
 # =============================================================================
 # TASK 1: Load CSV and Create Canonical IDs (9.1)
 # =============================================================================
-def load_csv_and_create_ids(**context):
-    """Load CSV and create play_id and play_hash"""
-    print(f"Loading CSV from: {DATA_PATH}")
-    df = pd.read_csv(DATA_PATH)
+def list_games(**context):
+    """Find the run's game files; each is loaded, merged and summarized by its own mapped task instances"""
+    pattern = get_conf(context).get('data_glob', DATA_GLOB)
+    paths = sorted(glob.glob(pattern))
+    if not paths:
+        raise FileNotFoundError(f"No play-by-play files match {pattern}")
+    games = [{'game_id': os.path.splitext(os.path.basename(path))[0], 'path': path} for path in paths]
+    print(f"🗂️ {len(games)} games match {pattern}")
+    return games
+
+
+def load_csv_and_create_ids(game_id, path, **context):
+    """Load one game's CSV and create play_id and play_hash"""
+    stage = game_stage(game_id, 'plays')
+    done = completed_stage(stage, context)
+    if done:
+        return done
+    
+    print(f"Loading CSV for {game_id} from: {path}")
+    df = pd.read_csv(path)
     
     # Limit rows if configured
-    if NUM_ROWS > 0:
-        df = df.head(NUM_ROWS)
-        print(f"LIMITED TO {NUM_ROWS} ROWS FOR TESTING")
+    num_rows = int(get_conf(context).get('num_rows', NUM_ROWS))
+    if num_rows > 0:
+        df = df.head(num_rows)
+        print(f"LIMITED TO {num_rows} ROWS FOR TESTING")
     else:
         print(f"PROCESSING ALL {len(df)} ROWS")
     
-    # Create canonical IDs
+    # Create canonical IDs (play_id is per game; game_id + play_id is unique)
+    df['game_id'] = game_id
     df['play_id'] = range(1, len(df) + 1)
     
     def create_text_hash(text):
         return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
     
     df['play_hash'] = df['playbyplay'].apply(create_text_hash)
+    # Labelled over the whole game: shards are cut and windows grouped by it
+    df['half_inning'] = half_innings(df['playbyplay']).values
     
     print(f"✅ Loaded {len(df)} plays with canonical IDs")
     
-    # Save to temp file for next task
-    df.to_pickle(TEMP_DATA_PATH)
+    # Checkpoint for the downstream tasks of this game
+    return write_artifact(df, stage, context=context)
+
+
+def plan_shards(**context):
+    """Split every loaded game into play_id ranges ending on half-innings: one flat list, one mapped task instance per range"""
+    ti = context['ti']
+    games = ti.xcom_pull(task_ids='list_games') or []
+    if get_execution_mode(context) == 'batch':
+        shard_size = None
+    else:
+        shard_size = int(get_conf(context).get('shard_size', SHARD_SIZE))
+    shards = []
+    for index, game in enumerate(games):
+        plays_ref = ti.xcom_pull(task_ids='load_csv_and_create_ids', map_indexes=index)
+        if not plays_ref:
+            print(f"❌ {game['game_id']} was not loaded; its game group will fail")
+            continue
+        shards.extend(plan_game_shards(game['game_id'], plays_ref, shard_size))
+    print(f"🔀 {len(games)} games -> {len(shards)} shards of about {shard_size or 'one game'} plays")
+    return shards
+
+
+def merge_shards(game_id, stage, shard_task_id, **context):
+    """Reduce one game's shard checkpoints of a mapped stage into one checkpoint, ordered by play_id"""
+    ti = context['ti']
+    shards = ti.xcom_pull(task_ids='plan_shards') or []
+    indexes = [index for index, shard in enumerate(shards) if shard['game_id'] == game_id]
+    if not indexes:
+        raise ValueError(f"No {stage} shards were planned for {game_id} (did loading it fail?)")
+    shard_refs = [ti.xcom_pull(task_ids=shard_task_id, map_indexes=index) for index in indexes]
+    failed = [shards[index]['shard'] for index, ref in zip(indexes, shard_refs) if not ref]
+    if failed:
+        raise RuntimeError(f"{game_id}: {stage} shards {failed} did not finish")
     
-    return f"Loaded {len(df)} plays"
+    stage = game_stage(game_id, stage)
+    merged = merge_shard_artifacts(shard_refs, stage, context=context, rebuild=get_conf(context).get('rebuild'))
+    print(f"✅ Merged {len(shard_refs)} shards into {merged['rows']} rows for {stage}")
+    return merged
 
 
 # =============================================================================
@@ -110,9 +267,26 @@ class PlayByPlayExtraction(BaseModel):
     ball_in_play: Optional[bool] = None
 
 
-def extract_structured_data(**context):
-    """Extract structured baseball data using OpenAI"""
-    df = pd.read_pickle(TEMP_DATA_PATH)
+@lru_cache(maxsize=None)
+def remaining_schema(fields):
+    """PlayByPlayExtraction narrowed to ``fields``, the ones the regex rules left null"""
+    return create_model(
+        'PlayByPlayRemaining',
+        **{
+            field: (info.annotation, ... if info.is_required() else info.default)
+            for field, info in PlayByPlayExtraction.model_fields.items() if field in fields
+        },
+    )
+
+
+def extract_structured_data(game_id, shard, first_play_id, last_play_id, plays, **context):
+    """Extract structured baseball data using OpenAI (one shard of one game's plays)"""
+    plays_ref = plays
+    stage = game_stage(game_id, shard_stage('extracted', shard))
+    done = completed_stage(stage, context, inputs={'plays': plays_ref})
+    if done:
+        return done
+    df = read_plays((plays_ref, ['play_hash', 'playbyplay']), play_ids=(first_play_id, last_play_id))
     
     system_prompt = """
 You are a baseball play-by-play data extraction assistant. Extract structured information from baseball commentary text.
@@ -142,39 +316,93 @@ Rules:
 - Extract names exactly as mentioned in the text
 - Be precise with counts - distinguish between pre-pitch and post-pitch counts
 
-Return the result as a JSON object matching the PlayByPlayExtraction structure.
+Return a JSON object with only the fields in the response schema; the others were already extracted from the text by rules.
 """
     
-    extracted_data = []
-    print(f"🔄 Extracting data from {len(df)} plays...")
-    
-    for idx, row in df.iterrows():
-        try:
-            completion = openai.beta.chat.completions.parse(
-                model="gpt-4o",
-                messages=[
+    # Regex pass over the whole shard first: inning, outs, count, score, pitch
+    # type and speed are deterministic; the LLM is only asked for what is left null
+    rules = pre_extract(df['playbyplay'])
+    rule_values = rules.astype(object).where(rules.notna(), None).to_dict('records')
+    remaining = [
+        tuple(field for field in PlayByPlayExtraction.model_fields if values.get(field) is None)
+        for values in rule_values
+    ]
+    asked = sum(len(fields) for fields in remaining)
+    print(f"🧩 Rule coverage: {coverage(rules)}")
+    print(f"   LLM asked for {asked} of {len(df) * len(PlayByPlayExtraction.model_fields)} fields")
+    
+    # Plays enriched by an earlier run (same text, so same play_hash) are reused
+    # from the store; a stored answer counts only if it covers the fields asked now
+    store = enrichment_store('extracted', "gpt-4o", system_prompt, sorted(PlayByPlayExtraction.model_fields))
+    stored = store.get_many(df['play_hash'].unique())
+    pending = pending_plays(df['play_hash'], stored, remaining)
+    execution_mode = get_execution_mode(context)
+    print(f"🗃️ {len(df) - len(pending)} plays already enriched, {len(pending)} new or changed")
+    print(f"🔄 Extracting data from {len(pending)} plays (execution_mode={execution_mode})...")
+    
+    fresh = {}
+    if execution_mode == 'batch':
+        # One request per distinct play text, keyed by play_hash
+        unique_plays = {}
+        for pos in pending:
+            unique_plays.setdefault(df['play_hash'].iat[pos], (df['playbyplay'].iat[pos], remaining[pos]))
+        results = run_batch(
+            [
+                chat_request(play_hash, "gpt-4o", [
                     {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": row['playbyplay']}
-                ],
-                response_format=PlayByPlayExtraction
-            )
-            extracted_data.append(completion.choices[0].message.parsed.model_dump())
-        except Exception as e:
-            print(f"❌ Error processing play_id {row['play_id']}: {e}")
-            extracted_data.append({field: None for field in PlayByPlayExtraction.__fields__})
-            continue
+                    {"role": "user", "content": text}
+                ], remaining_schema(fields))
+                for play_hash, (text, fields) in unique_plays.items()
+            ],
+            metadata={'stage': 'extract_structured_data', 'game_id': game_id, 'shard': str(shard)},
+            cache=llm.cache
+        )
+        for play_hash, (text, fields) in unique_plays.items():
+            if play_hash in results:
+                result = parse_results({play_hash: results[play_hash]}, remaining_schema(fields))[play_hash]
+                if result:
+                    fresh[play_hash] = result.model_dump()
+    else:
+        for pos in pending:
+            row = df.iloc[pos]
+            if row.play_hash in fresh:
+                continue
+            try:
+                completion = llm.beta.chat.completions.parse(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": row.playbyplay}
+                    ],
+                    response_format=remaining_schema(remaining[pos])
+                )
+                fresh[row.play_hash] = completion.choices[0].message.parsed.model_dump()
+            except Exception as e:
+                print(f"❌ Error processing play_id {row.play_id}: {e}")
+                continue
+    store.set_many(fresh)
+    enriched = {**stored, **fresh}
     
-    # Merge extracted data back
+    # Rule values where they matched, LLM values for the fields the rules left null
+    empty = {field: None for field in PlayByPlayExtraction.model_fields}
+    extracted_data = []
+    for values, fields, play_hash in zip(rule_values, remaining, df['play_hash']):
+        llm_values = enriched.get(play_hash, {})
+        extracted_data.append({
+            **empty,
+            **{field: value for field, value in values.items() if value is not None},
+            **{field: llm_values[field] for field in fields if field in llm_values},
+        })
+    
+    # Checkpoint only the extracted columns, keyed like the input
     df_extracted = pd.DataFrame(extracted_data)
     df_extracted['play_id'] = df['play_id'].values
     df_extracted['play_hash'] = df['play_hash'].values
     
-    df_enriched = df.merge(df_extracted, on=['play_id', 'play_hash'], how='left')
-    
     print(f"✅ Successfully extracted data from {len(df_extracted)} plays")
-    df_enriched.to_pickle(TEMP_DATA_PATH)
+    print(f"LLM cache: {llm.cache.stats()}")
     
-    return f"Extracted {len(df_extracted)} plays"
+    return write_artifact(df_extracted, stage, context=context, inputs={'plays': plays_ref})
 
 
 # =============================================================================
@@ -206,6 +434,19 @@ pitch_type_reference = {
     "KC": "Knuckle Curve"
 }
 
+# Spellings the local matcher should accept that neither the canonical names
+# nor fuzzy scoring cover (aliases for players not in a list are ignored)
+player_aliases = {
+    "Kike Hernandez": 31358, "Vladdy Jr.": 35002, "IKF": 33572,
+}
+
+pitch_type_aliases = {
+    "four-seam fastball": "FF", "4-seam fastball": "FF", "fastball": "FF", "four seamer": "FF",
+    "cut fastball": "FC", "curveball": "CU", "knuckle curveball": "KC", "knuckle-curve": "KC",
+    "change-up": "CH", "change": "CH", "split-finger fastball": "FS", "splitter": "FS",
+    "two-seam fastball": "SI", "two-seamer": "SI", "sweeping slider": "ST",
+}
+
 
 class PlayerMapping(BaseModel):
     canonical_id: int
@@ -219,9 +460,14 @@ class PitchTypeMapping(BaseModel):
     confidence: str
 
 
-def map_to_canonical_ids(**context):
-    """Map extracted names and pitch types to canonical IDs"""
-    df_enriched = pd.read_pickle(TEMP_DATA_PATH)
+def map_to_canonical_ids(game_id, **context):
+    """Map extracted names and pitch types to canonical IDs, resolving each distinct value once"""
+    extracted_ref = upstream_ref(context, game_task('merge_extracted'))
+    stage = game_stage(game_id, 'mapped')
+    done = completed_stage(stage, context, inputs={'extracted': extracted_ref})
+    if done:
+        return done
+    df_enriched = read_plays((extracted_ref, ['play_hash', 'pitcher_name', 'batter_name', 'pitch_type']))
     
     # Create prompts
     pitcher_str = "\\n".join([f"ID: {pid}, Name: {name}" for pid, name in pitcher_reference.items()])
@@ -275,84 +521,106 @@ Rules:
 Return a JSON object with: canonical_abbr (str), canonical_text (str), confidence (str)
 """
     
-    print(f"🔄 Mapping to canonical IDs for {len(df_enriched)} plays...")
-    
-    pitcher_mappings = []
-    batter_mappings = []
-    pitch_type_mappings = []
-    
-    for idx, row in df_enriched.iterrows():
-        # Map pitcher
-        if pd.notna(row['pitcher_name']):
-            try:
-                completion = openai.beta.chat.completions.parse(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": pitcher_prompt},
-                        {"role": "user", "content": f"Pitcher name: {row['pitcher_name']}"}
-                    ],
-                    response_format=PlayerMapping
-                )
-                pitcher_mappings.append(completion.choices[0].message.parsed.model_dump())
-            except Exception as e:
-                print(f"❌ Error mapping pitcher: {e}")
-                pitcher_mappings.append({"canonical_id": None, "canonical_name": None, "confidence": "low"})
-        else:
-            pitcher_mappings.append({"canonical_id": None, "canonical_name": None, "confidence": "low"})
-        
-        # Map batter
-        if pd.notna(row['batter_name']):
-            try:
-                completion = openai.beta.chat.completions.parse(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": batter_prompt},
-                        {"role": "user", "content": f"Batter name: {row['batter_name']}"}
-                    ],
-                    response_format=PlayerMapping
-                )
-                batter_mappings.append(completion.choices[0].message.parsed.model_dump())
-            except Exception as e:
-                print(f"❌ Error mapping batter: {e}")
-                batter_mappings.append({"canonical_id": None, "canonical_name": None, "confidence": "low"})
-        else:
-            batter_mappings.append({"canonical_id": None, "canonical_name": None, "confidence": "low"})
-        
-        # Map pitch type
-        if pd.notna(row['pitch_type']):
-            try:
-                completion = openai.beta.chat.completions.parse(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": pitch_type_prompt},
-                        {"role": "user", "content": f"Pitch type: {row['pitch_type']}"}
-                    ],
-                    response_format=PitchTypeMapping
-                )
-                pitch_type_mappings.append(completion.choices[0].message.parsed.model_dump())
-            except Exception as e:
-                print(f"❌ Error mapping pitch type: {e}")
-                pitch_type_mappings.append({"canonical_abbr": None, "canonical_text": None, "confidence": "low"})
-        else:
-            pitch_type_mappings.append({"canonical_abbr": None, "canonical_text": None, "confidence": "low"})
-    
-    # Add mapped columns
-    df_enriched['pitcher_id'] = [m['canonical_id'] for m in pitcher_mappings]
-    df_enriched['pitcher_canonical_name'] = [m['canonical_name'] for m in pitcher_mappings]
-    df_enriched['pitcher_confidence'] = [m['confidence'] for m in pitcher_mappings]
-    
-    df_enriched['batter_id'] = [m['canonical_id'] for m in batter_mappings]
-    df_enriched['batter_canonical_name'] = [m['canonical_name'] for m in batter_mappings]
-    df_enriched['batter_confidence'] = [m['confidence'] for m in batter_mappings]
-    
-    df_enriched['pitch_type_abbr'] = [m['canonical_abbr'] for m in pitch_type_mappings]
-    df_enriched['pitch_type_canonical'] = [m['canonical_text'] for m in pitch_type_mappings]
-    df_enriched['pitch_type_confidence'] = [m['confidence'] for m in pitch_type_mappings]
+    execution_mode = get_execution_mode(context)
+    
+    # (kind, extracted column, prompt, label, schema, {result field: output column})
+    lookups = [
+        ('pitcher', 'pitcher_name', pitcher_prompt, "Pitcher name", PlayerMapping,
+         {'canonical_id': 'pitcher_id', 'canonical_name': 'pitcher_canonical_name', 'confidence': 'pitcher_confidence'}),
+        ('batter', 'batter_name', batter_prompt, "Batter name", PlayerMapping,
+         {'canonical_id': 'batter_id', 'canonical_name': 'batter_canonical_name', 'confidence': 'batter_confidence'}),
+        ('pitch', 'pitch_type', pitch_type_prompt, "Pitch type", PitchTypeMapping,
+         {'canonical_abbr': 'pitch_type_abbr', 'canonical_text': 'pitch_type_canonical', 'confidence': 'pitch_type_confidence'}),
+    ]
+    
+    matchers = {
+        'pitcher': CanonicalMatcher(pitcher_reference, aliases=player_aliases, last_names=True),
+        'batter': CanonicalMatcher(batter_reference, aliases=player_aliases, last_names=True),
+        'pitch': CanonicalMatcher(pitch_type_reference, aliases=pitch_type_aliases),
+    }
+    
+    # Distinct extracted values are matched locally first (exact, alias, last name,
+    # rapidfuzz); only ties and low scores escalate, and of those only values not
+    # already in the memo table reach the LLM. The memo version changes with the
+    # prompt (and so the reference lists)
+    memos, resolved, missing = {}, {}, {}
+    for kind, column, prompt, label, schema, _ in lookups:
+        id_field, name_field = [field for field in schema.model_fields if field != 'confidence']
+        local = matchers[kind].match_many(df_enriched[column])
+        resolved[kind] = {
+            value: {id_field: match['key'], name_field: match['name'], 'confidence': match['confidence']}
+            for value, match in local.items() if match
+        }
+        escalated = [value for value, match in local.items() if match is None]
+        memos[kind] = MemoTable(kind, version=memo_version(prompt, "gpt-4o", schema.model_json_schema()))
+        memoized, missing[kind] = memos[kind].split(escalated)
+        resolved[kind].update(memoized)
+        escalated_plays = int(df_enriched[column].isin(escalated).sum())
+        print(f"🎯 {kind}: {matchers[kind].stats()} "
+              f"({escalated_plays}/{len(df_enriched)} plays escalated)")
+    
+    total_missing = sum(len(values) for values in missing.values())
+    print(f"🔄 Mapping to canonical IDs for {len(df_enriched)} plays: "
+          f"{total_missing} escalated values to resolve with the LLM (execution_mode={execution_mode})...")
+    
+    fresh = {kind: {} for kind in missing}
+    if execution_mode == 'batch' and total_missing:
+        # One request per new distinct value, keyed by "<kind>:<value>"
+        requests = [
+            chat_request(f"{kind}:{value}", "gpt-4o", [
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": f"{label}: {value}"}
+            ], schema)
+            for kind, column, prompt, label, schema, _ in lookups
+            for value in missing[kind]
+        ]
+        results = run_batch(requests, metadata={'stage': 'map_to_canonical_ids'}, cache=llm.cache)
+        for kind, column, prompt, label, schema, _ in lookups:
+            parsed = parse_results({k: v for k, v in results.items() if k.startswith(f"{kind}:")}, schema)
+            for value in missing[kind]:
+                result = parsed.get(f"{kind}:{value}")
+                fresh[kind][value] = result.model_dump() if result else None
+    else:
+        for kind, column, prompt, label, schema, _ in lookups:
+            for value in missing[kind]:
+                try:
+                    completion = llm.beta.chat.completions.parse(
+                        model="gpt-4o",
+                        messages=[
+                            {"role": "system", "content": prompt},
+                            {"role": "user", "content": f"{label}: {value}"}
+                        ],
+                        response_format=schema
+                    )
+                    fresh[kind][value] = completion.choices[0].message.parsed.model_dump()
+                except Exception as e:
+                    print(f"❌ Error mapping {kind} '{value}': {e}")
+                    fresh[kind][value] = None
+    
+    # Broadcast each distinct value's mapping back to its plays with one merge per kind
+    df_mapped = df_enriched[['play_id', 'play_hash']].copy()
+    for kind, column, prompt, label, schema, outputs in lookups:
+        memos[kind].set_many(fresh[kind])
+        resolved[kind].update({value: result for value, result in fresh[kind].items() if result is not None})
+        mapping = pd.DataFrame(
+            [{column: value, **result} for value, result in resolved[kind].items()],
+            columns=[column, *outputs],
+        ).rename(columns=outputs)
+        merged = df_enriched[[column]].merge(mapping, on=column, how='left')
+        for output in outputs.values():
+            df_mapped[output] = merged[output].values
+        # Unresolved or missing values keep the old fallback: no match, low confidence
+        confidence = outputs['confidence']
+        df_mapped[confidence] = df_mapped[confidence].fillna('low')
+    
+    for column in ['pitcher_id', 'batter_id']:
+        df_mapped[column] = pd.to_numeric(df_mapped[column]).astype('Int64')
     
     print(f"✅ Successfully mapped canonical IDs")
+    print(f"Memo: { {kind: memo.stats() for kind, memo in memos.items()} }")
+    print(f"LLM cache: {llm.cache.stats()}")
     
-    df_enriched.to_pickle(TEMP_DATA_PATH)
-    return f"Mapped {len(df_enriched)} plays"
+    return write_artifact(df_mapped, stage, context=context, inputs={'extracted': extracted_ref})
 
 
 # =============================================================================
@@ -363,9 +631,39 @@ class PlayAnalysis(BaseModel):
     excitement: int
 
 
-def analyze_excitement_and_key_moments(**context):
-    """Analyze each play for excitement and key moments"""
-    df_enriched = pd.read_pickle(TEMP_DATA_PATH)
+class KeyedPlayAnalysis(PlayAnalysis):
+    play_id: int
+
+
+class WindowAnalysis(BaseModel):
+    plays: List[KeyedPlayAnalysis]
+
+
+WINDOW_INSTRUCTIONS = """
+The user sends a JSON list of consecutive plays from one half-inning, each with an
+integer "play_id" and its "text". Return one analysis per play_id, using the ids as
+given. Use the earlier plays as context (score, runners, momentum), but rate each
+play on its own merits.
+"""
+
+
+def window_messages(window, system_prompt):
+    """Chat messages scoring every play of one window in a single request"""
+    payload = [{"play_id": play_id, "text": text} for play_id, text in window]
+    return [
+        {"role": "system", "content": system_prompt + WINDOW_INSTRUCTIONS},
+        {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
+    ]
+
+
+def analyze_excitement_and_key_moments(game_id, shard, first_play_id, last_play_id, plays, **context):
+    """Analyze each play for excitement and key moments (one shard of one game's plays)"""
+    plays_ref = plays
+    stage = game_stage(game_id, shard_stage('analysis', shard))
+    done = completed_stage(stage, context, inputs={'plays': plays_ref})
+    if done:
+        return done
+    df_enriched = read_plays((plays_ref, ['play_hash', 'playbyplay', 'half_inning']), play_ids=(first_play_id, last_play_id))
     
     system_prompt = """
 You are a baseball narrative analyst. Analyze the provided play-by-play commentary and determine:
@@ -395,74 +693,164 @@ Consider factors:
 Return a JSON object with: key_moment (bool), excitement (int 1-10)
 """
     
-    print(f"🔄 Analyzing excitement and key moments...")
-    
-    play_analyses = []
-    for idx, row in df_enriched.iterrows():
-        try:
-            completion = openai.beta.chat.completions.parse(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": row['playbyplay']}
+    execution_mode = get_execution_mode(context)
+    analysis_mode = get_conf(context).get('analysis_mode', ANALYSIS_MODE)
+    print(f"🔄 Analyzing excitement and key moments "
+          f"(execution_mode={execution_mode}, analysis_mode={analysis_mode})...")
+    
+    # Scores from earlier runs are reused; only new or changed plays (and, in window
+    # mode, the half-inning windows they belong to) go to the LLM. Per-play scores
+    # are keyed by play_hash; window scores by game, half-inning and the window's
+    # play hashes, because the same text scores differently in another context
+    store = enrichment_store(
+        'analysis', "gpt-4o", system_prompt, analysis_mode, WINDOW_INSTRUCTIONS if analysis_mode == 'window' else None
+    )
+    hash_of = dict(zip(df_enriched['play_id'], df_enriched['play_hash']))
+    key_of = dict(hash_of)
+    
+    default_analysis = {"key_moment": False, "excitement": 1}
+    fresh = {}
+    if analysis_mode == 'window':
+        # One call per half-inning window returns a list of analyses keyed by play_id
+        windows = {}
+        for half_inning, window in half_inning_windows(df_enriched, token_budget=WINDOW_TOKEN_BUDGET):
+            key = window_key(game_id, half_inning, window, hash_of)
+            windows[key] = window
+            key_of.update({play_id: f"{key}.{hash_of[play_id]}" for play_id, _ in window})
+        stored = store.get_many(key_of.values())
+        pending = {
+            key: window for key, window in windows.items()
+            if any(key_of[play_id] not in stored for play_id, _ in window)
+        }
+        print(f"🪟 {len(df_enriched)} plays in {len(windows)} windows "
+              f"({len(df_enriched) / max(len(windows), 1):.1f} plays per call), {len(pending)} with new plays")
+        analyses = {}
+        if execution_mode == 'batch':
+            parsed = parse_results(run_batch(
+                [
+                    chat_request(key, "gpt-4o", window_messages(window, system_prompt), WindowAnalysis)
+                    for key, window in pending.items()
                 ],
-                response_format=PlayAnalysis
-            )
-            play_analyses.append(completion.choices[0].message.parsed.model_dump())
-        except Exception as e:
-            print(f"❌ Error analyzing play: {e}")
-            play_analyses.append({"key_moment": False, "excitement": 1})
-            continue
-    
-    df_enriched['key_moment'] = [a['key_moment'] for a in play_analyses]
-    df_enriched['excitement'] = [a['excitement'] for a in play_analyses]
+                metadata={'stage': 'analyze_excitement_key_moments', 'game_id': game_id, 'shard': str(shard)},
+                cache=llm.cache
+            ), WindowAnalysis)
+            for key, window in pending.items():
+                analyses.update(window_results(window, parsed.get(key)))
+        else:
+            for n, window in enumerate(pending.values(), start=1):
+                try:
+                    completion = llm.beta.chat.completions.parse(
+                        model="gpt-4o",
+                        messages=window_messages(window, system_prompt),
+                        response_format=WindowAnalysis
+                    )
+                    analyses.update(window_results(window, completion.choices[0].message.parsed))
+                except Exception as e:
+                    print(f"❌ Error analyzing window {n}/{len(pending)}: {e}")
+        fresh = {key_of[play_id]: analysis for play_id, analysis in analyses.items()}
+    else:
+        stored = store.get_many(df_enriched['play_hash'].unique())
+        unique_plays = df_enriched.drop_duplicates('play_hash')
+        unique_plays = unique_plays[~unique_plays['play_hash'].isin(stored)]
+        print(f"🗃️ {len(stored)} distinct plays already scored, {len(unique_plays)} new or changed")
+        if execution_mode == 'batch':
+            parsed = parse_results(run_batch(
+                [
+                    chat_request(row.play_hash, "gpt-4o", [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": row.playbyplay}
+                    ], PlayAnalysis)
+                    for row in unique_plays.itertuples()
+                ],
+                metadata={'stage': 'analyze_excitement_key_moments', 'game_id': game_id, 'shard': str(shard)},
+                cache=llm.cache
+            ), PlayAnalysis)
+            fresh = {play_hash: result.model_dump() for play_hash, result in parsed.items() if result}
+        else:
+            for row in unique_plays.itertuples():
+                try:
+                    completion = llm.beta.chat.completions.parse(
+                        model="gpt-4o",
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": row.playbyplay}
+                        ],
+                        response_format=PlayAnalysis
+                    )
+                    fresh[row.play_hash] = completion.choices[0].message.parsed.model_dump()
+                except Exception as e:
+                    print(f"❌ Error analyzing play: {e}")
+                    continue
+    store.set_many(fresh)
+    
+    enriched = {**stored, **fresh}
+    keys = [key_of[play_id] for play_id in df_enriched['play_id']]
+    play_analyses = [enriched.get(key, default_analysis) for key in keys]
+    missing = sum(key not in enriched for key in keys)
+    if missing:
+        print(f"⚠️ No analysis returned for {missing} plays; using defaults")
+    
+    df_analysis = df_enriched[['play_id', 'play_hash']].copy()
+    df_analysis['key_moment'] = [a['key_moment'] for a in play_analyses]
+    df_analysis['excitement'] = [a['excitement'] for a in play_analyses]
     
     print(f"✅ Successfully analyzed {len(play_analyses)} plays")
+    print(f"LLM cache: {llm.cache.stats()}")
     
-    df_enriched.to_pickle(TEMP_DATA_PATH)
-    return f"Analyzed {len(play_analyses)} plays"
+    return write_artifact(df_analysis, stage, context=context, inputs={'plays': plays_ref})
 
 
 # =============================================================================
 # TASK 5: Generate Summary Statistics (9.5)
 # =============================================================================
-def generate_summary_statistics(**context):
-    """Generate final summary statistics"""
-    df_enriched = pd.read_pickle(TEMP_DATA_PATH)
-    
-    # Excitement statistics
-    key_moments_count = df_enriched['key_moment'].sum()
-    avg_excitement = df_enriched['excitement'].mean()
-    
-    # Pitcher statistics
-    pitcher_analysis = df_enriched[df_enriched['pitcher_id'].notna()].copy()
-    pitcher_stats = pitcher_analysis.groupby(['pitcher_id', 'pitcher_canonical_name']).agg({
-        'pitch_velocity_mph': 'mean',
-        'pitch_type_canonical': lambda x: x.value_counts().index[0] if len(x.value_counts()) > 0 else None,
-        'play_id': 'count'
-    }).reset_index()
-    pitcher_stats.columns = ['pitcher_id', 'pitcher_name', 'avg_pitch_speed_mph', 'most_frequent_pitch', 'total_pitches']
-    
-    # Batter statistics
-    batter_analysis = df_enriched[df_enriched['batter_id'].notna()].copy()
-    batter_stats = batter_analysis.groupby(['batter_id', 'batter_canonical_name']).agg({
-        'post_pitch_balls': lambda x: x.sum() if x.notna().any() else 0,
-        'post_pitch_strikes': lambda x: x.sum() if x.notna().any() else 0,
-        'ball_in_play': lambda x: x.sum() if x.notna().any() else 0,
-        'play_id': 'count'
-    }).reset_index()
-    batter_stats.columns = ['batter_id', 'batter_name', 'total_balls', 'total_strikes', 'balls_in_play', 'plate_appearances']
+def generate_summary_statistics(game_id, **context):
+    """Aggregate this game's new plays into the stats store and summarize the game"""
+    # Join just the columns the statistics use from each stage's checkpoint
+    df_enriched = read_plays(
+        (upstream_ref(context, 'load_csv_and_create_ids'), ['play_hash']),
+        (upstream_ref(context, game_task('merge_extracted')),
+         ['inning_number', 'inning_half', 'pitch_velocity_mph', 'post_pitch_balls', 'post_pitch_strikes',
+          'ball_in_play']),
+        (upstream_ref(context, game_task('map_to_canonical_ids')),
+         ['pitcher_id', 'pitcher_canonical_name', 'batter_id', 'batter_canonical_name', 'pitch_type_canonical']),
+        (upstream_ref(context, game_task('merge_analysis')), ['key_moment', 'excitement']),
+    )
+    
+    # Additive aggregates: only plays the store has not seen are grouped
+    store = AggregateStore()
+    if get_conf(context).get('rebuild'):
+        store.drop_game(game_id)
+    batch, new_tables = store.append(df_enriched, game_id)
+    if batch and get_conf(context).get('stats_to_postgres', STATS_TO_POSTGRES):
+        from pipeline_kit.db import connection
+        with connection() as conn:
+            # Batches the store replaced (re-enriched plays) are removed from the mirror too
+            save_to_postgres(conn, new_tables, game_id, batch, batches=store.batches(game_id))
+    
+    # Every figure below comes from the stored aggregates of this game
+    stored = store.load([game_id])
+    game = finalize(stored)
+    pitcher_stats, batter_stats = game['pitcher'], game['batter']
+    index = store.index()
+    new_plays = int((index['batch'] == batch).sum()) if batch else 0
+    
+    # Excitement statistics: additive inning measures summed over the game
+    innings = combine(stored)['inning']
+    total_plays = int(innings['plays'].sum())
+    key_moments_count = int(innings['key_moments'].sum())
+    excitement_count = innings['excitement_count'].sum()
+    avg_excitement = innings['excitement_sum'].sum() / excitement_count if excitement_count else float('nan')
     
     summary = f"""
     ================================================================================
-    WORLD SERIES GAME 7 ANALYSIS COMPLETE
+    {game_id} ANALYSIS COMPLETE
     ================================================================================
     
-    📊 Data Processed: {len(df_enriched)} plays
+    📊 Data Processed: {total_plays} plays ({new_plays} newly aggregated)
     
     🎭 Excitement Analysis:
        - Average excitement: {avg_excitement:.2f}/10
-       - Key moments: {key_moments_count} ({(key_moments_count/len(df_enriched)*100):.1f}%)
+       - Key moments: {key_moments_count} ({(key_moments_count/max(total_plays, 1)*100):.1f}%)
     
     ⚾ Pitcher Analysis:
        - Unique pitchers: {len(pitcher_stats)}
@@ -472,7 +860,7 @@ def generate_summary_statistics(**context):
        - Unique batters: {len(batter_stats)}
        - Total plate appearances: {batter_stats['plate_appearances'].sum()}
     
-    ✅ Pipeline Complete!
+    ✅ Game Complete!
     ================================================================================
     """
     
@@ -481,39 +869,146 @@ def generate_summary_statistics(**context):
     return summary
 
 
+# =============================================================================
+# TASK 6: Cross-Game Aggregation
+# =============================================================================
+def aggregate_games(**context):
+    """Roll the stored aggregates of this run's games up per game and across all of them"""
+    games = context['ti'].xcom_pull(task_ids='list_games')
+    if not games:
+        # Runs under trigger_rule='all_done', so also when list_games itself failed
+        raise RuntimeError("list_games returned no games (did it fail?); nothing to aggregate")
+    game_ids = [game['game_id'] for game in games]
+    store = AggregateStore()
+    tables = store.load(game_ids)
+    aggregated = set(store.index()['game_id'])
+    missing = [game_id for game_id in game_ids if game_id not in aggregated]
+    if missing:
+        print(f"❌ {len(missing)} games have no aggregates (failed upstream?): {missing}")
+    
+    # Checkpoint the rollups for downstream consumers (dashboards, exports)
+    rollups = {level: finalize(tables, level) for level in ['game', 'season']}
+    refs = {
+        f"{level}.{name}": write_artifact(frame, f"rollup.{level}.{name}", context=context)
+        for level, frames in rollups.items() for name, frame in frames.items()
+    }
+    season = rollups['season']
+    
+    summary = f"""
+    ================================================================================
+    WORLD SERIES ANALYSIS COMPLETE
+    ================================================================================
+    
+    🗂️ Games: {len(game_ids) - len(missing)} of {len(game_ids)} aggregated
+    
+    ⚾ Pitchers: {len(season['pitcher'])} ({season['pitcher']['total_pitches'].sum()} pitches)
+    🏏 Batters: {len(season['batter'])} ({season['batter']['plate_appearances'].sum()} plate appearances)
+    
+    ✅ Pipeline Complete!
+    ================================================================================
+    """
+    
+    print(summary)
+    
+    return refs
+
+
 # =============================================================================
 # Define Tasks
 # =============================================================================
-task_load = PythonOperator(
+task_games = PythonOperator(
+    task_id='list_games',
+    python_callable=list_games,
+    dag=dag,
+)
+
+
+task_load = PythonOperator.partial(
     task_id='load_csv_and_create_ids',
     python_callable=load_csv_and_create_ids,
     dag=dag,
-)
+).expand(op_kwargs=task_games.output)
 
-task_extract = PythonOperator(
-    task_id='extract_structured_data',
-    python_callable=extract_structured_data,
+# Runs even if some games failed to load; their groups fail on their own
+task_plan = PythonOperator(
+    task_id='plan_shards',
+    python_callable=plan_shards,
+    trigger_rule='all_done',
     dag=dag,
 )
 
-task_map = PythonOperator(
-    task_id='map_to_canonical_ids',
-    python_callable=map_to_canonical_ids,
+# LLM stages: one mapped task instance per (game, play range) across all games
+shard_args = dict(
+    pool=LLM_POOL,
+    pool_slots=LLM_POOL_SLOTS,
+    max_active_tis_per_dag=MAX_ACTIVE_SHARDS,
     dag=dag,
 )
 
-task_analyze = PythonOperator(
+task_extract = PythonOperator.partial(
+    task_id='extract_structured_data',
+    python_callable=extract_structured_data,
+    **shard_args,
+).expand(op_kwargs=task_plan.output)
+
+task_analyze = PythonOperator.partial(
     task_id='analyze_excitement_key_moments',
     python_callable=analyze_excitement_and_key_moments,
+    **shard_args,
+).expand(op_kwargs=task_plan.output)
+
+
+def game_id_of(game):
+    return game['game_id']
+
+
+# One instance of the group per game: merge its shards, map names, summarize
+@task_group(group_id=GAME_GROUP, dag=dag)
+def process_game(game_id):
+    # all_done: a failed shard of another game must not fail this one; the
+    # merge itself fails if one of this game's shards is missing
+    task_merge_extracted = PythonOperator(
+        task_id='merge_extracted',
+        python_callable=merge_shards,
+        op_kwargs={'game_id': game_id, 'stage': 'extracted', 'shard_task_id': 'extract_structured_data'},
+        trigger_rule='all_done',
+    )
+    
+    task_merge_analysis = PythonOperator(
+        task_id='merge_analysis',
+        python_callable=merge_shards,
+        op_kwargs={'game_id': game_id, 'stage': 'analysis', 'shard_task_id': 'analyze_excitement_key_moments'},
+        trigger_rule='all_done',
+    )
+    
+    # Not sharded: it resolves a few dozen distinct values, not one call per play
+    task_map = PythonOperator(
+        task_id='map_to_canonical_ids',
+        python_callable=map_to_canonical_ids,
+        pool=LLM_POOL,
+        pool_slots=LLM_POOL_SLOTS,
+        max_active_tis_per_dag=MAX_ACTIVE_GAMES,
+        op_kwargs={'game_id': game_id},
+    )
+    
+    task_summary = PythonOperator(
+        task_id='generate_summary_statistics',
+        python_callable=generate_summary_statistics,
+        op_kwargs={'game_id': game_id},
+    )
+    
+    task_merge_extracted >> task_map
+    [task_map, task_merge_analysis] >> task_summary
+
+
+task_process = process_game.expand(game_id=task_games.output.map(game_id_of))
+
+# Runs once every game has finished, aggregating the games that succeeded
+task_aggregate = PythonOperator(
+    task_id='aggregate_games',
+    python_callable=aggregate_games,
+    trigger_rule='all_done',
     dag=dag,
 )
 
-task_summary = PythonOperator(
-    task_id='generate_summary_statistics',
-    python_callable=generate_summary_statistics,
-    dag=dag,
-)
-
-# Set dependencies
-task_load >> task_extract >> task_map >> task_analyze >> task_summary
-
+task_games >> task_load >> task_plan >> [task_extract, task_analyze] >> task_process >> task_aggregate
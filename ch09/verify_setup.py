@@ -56,7 +56,10 @@ def check_packages():
         'pandas': 'pandas',
         'openai': 'openai',
         'psycopg': 'psycopg',
+        'psycopg_pool': 'psycopg-pool',
         'pydantic': 'pydantic',
+        'pyarrow': 'pyarrow',
+        'rapidfuzz': 'rapidfuzz',
         'requests': 'requests',
         'dotenv': 'python-dotenv',
         'matplotlib': 'matplotlib',
@@ -151,7 +154,7 @@ def check_database_connection():
         return True
         
     except ImportError:
-        print_check("PostgreSQL connection", False, "Install: pip install psycopg[binary]")
+        print_check("PostgreSQL connection", False, "Install: pip install psycopg[binary,pool]")
         return False
     except Exception as e:
         print_check("PostgreSQL connection", False, f"Error: {str(e)}")
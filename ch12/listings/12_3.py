@@ -1,11 +1,16 @@
 # Listing 12.3 Agent 1: URL discovery
 import os
+import sys
 
 import openai
 import requests
 from pydantic import BaseModel
 
+sys.path.append("../..")  # repo root, so pipeline_kit is importable
+from pipeline_kit.llm_cache import CachedOpenAI
+
 SERPAPI_KEY = os.getenv("SERPAPI_KEY")  #A
+llm = CachedOpenAI()
 
 
 class URLRanking(BaseModel):  #B
@@ -60,7 +65,7 @@ def discover_url(search_key: str):  #E
         f"Product search key: {search_key}\n\n"
         f"Candidate URLs:\n{listing}"
     )
-    completion = openai.beta.chat.completions.parse(  #H
+    completion = llm.beta.chat.completions.parse(  #H
         model="gpt-4o-mini",
         messages=[
             {"role": "system",
@@ -1,5 +1,8 @@
 # Listing 12.5 Agent 3: AI extraction
 import openai
+from pipeline_kit.llm_cache import CachedOpenAI  # repo root is on sys.path from listing 12.3
+
+llm = CachedOpenAI()  # re-extracting an unchanged page costs no API call
 
 EXTRACTION_PROMPT = """You are a product data extraction assistant.
 Given the text of a product web page, extract these fields:
@@ -16,7 +19,7 @@ Rules:
 @with_retries(max_attempts=2, exceptions=(openai.OpenAIError,))  #B
 def extract_product(cleaned_text: str) -> ProductExtraction:  #C
     """Agent: pull structured fields from cleaned text."""
-    response = openai.beta.chat.completions.parse(  #D
+    response = llm.beta.chat.completions.parse(  #D
         model="gpt-4o",
         messages=[
             {"role": "system", "content": EXTRACTION_PROMPT},
@@ -0,0 +1,8 @@
+"""
+pipeline_kit
+============
+Reusable building blocks shared by the chapter listings and Airflow DAGs.
+
+The chapter listings import from here once the repository root is on
+``sys.path``; the Airflow projects mount this folder into ``dags/``.
+"""
@@ -0,0 +1,33 @@
+"""
+Helpers for calling asyncio code from synchronous callers.
+
+Airflow tasks and plain scripts can use ``asyncio.run`` directly, but a
+Jupyter kernel already has an event loop running, so ``run_sync`` falls
+back to a worker thread in that case.
+"""
+
+import asyncio
+import threading
+
+
+def run_sync(coro):
+    """Run a coroutine to completion from sync code, notebook-safe."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result = {}
+
+    def runner():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:  # re-raised in the calling thread
+            result["error"] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
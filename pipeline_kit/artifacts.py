@@ -0,0 +1,165 @@
+"""
+Parquet Stage Artifacts
+=======================
+Pipeline stages hand each other data through Parquet files instead of
+pushing whole payloads through XCom (which stores them as JSON in the
+Airflow metadata database). A stage writes its output under
+
+    {PIPELINE_ARTIFACT_ROOT}/{dag_id}/{run_id}/{stage}/
+
+as fixed-size part files (optionally hive-partitioned by a column) and
+returns a small reference, ``{"uri": ..., "rows": ..., "columns": [...]}``,
+which is all that goes through XCom. The next stage reads it back,
+projecting only the columns it needs.
+
+    ref = write_artifact(articles, "extract", context=get_current_context(), partition_cols=["query"])
+    articles = read_records(ref, columns=["title", "description", "content"])
+
+The root can be a local path or any URI pyarrow understands (``s3://``,
+``gs://``, ...).
+
+Each finished write leaves a ``_SUCCESS`` marker next to its part files
+(readers skip it). ``completed_artifact`` returns the reference of a stage
+already finished for this run, so a retried task can skip work it has done;
+passing ``inputs`` makes that conditional on the upstream artifacts being
+the same writes the checkpoint was built from.
+
+    done = completed_artifact("extract", context=context, inputs={"load": load_ref})
+    ref = done or write_artifact(extracted, "extract", context=context, inputs={"load": load_ref})
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import uuid
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pyarrow import fs as pafs
+
+DEFAULT_CHUNK_ROWS = 50_000
+MARKER = "_SUCCESS"
+
+
+def artifact_root():
+    """Base location for artifacts: PIPELINE_ARTIFACT_ROOT or a temp directory."""
+    return os.getenv("PIPELINE_ARTIFACT_ROOT", os.path.join(tempfile.gettempdir(), "pipeline_artifacts"))
+
+
+def filesystem_for(uri):
+    """(pyarrow filesystem, path) for a local path or URI."""
+    if "://" in uri:
+        return pafs.FileSystem.from_uri(uri)
+    return pafs.LocalFileSystem(), os.path.abspath(uri)
+
+
+def _safe(part):
+    return re.sub(r"[^A-Za-z0-9._=-]", "_", str(part))
+
+
+def artifact_uri(stage, context=None, dag_id=None, run_id=None, root=None):
+    """Location for one stage of one run; ids default to those in the Airflow ``context``."""
+    dag_id = dag_id or (context["dag"].dag_id if context else "adhoc")
+    run_id = run_id or (context["run_id"] if context else "latest")
+    return "/".join([(root or artifact_root()).rstrip("/"), _safe(dag_id), _safe(run_id), _safe(stage)])
+
+
+def _to_table(data):
+    if isinstance(data, pa.Table):
+        return data
+    if hasattr(data, "to_pandas") and hasattr(data, "schema"):  # RecordBatch
+        return pa.Table.from_batches([data])
+    if hasattr(data, "columns"):  # DataFrame
+        return pa.Table.from_pandas(data, preserve_index=False)
+    return pa.Table.from_pylist(list(data))
+
+
+def _input_tokens(inputs):
+    return {name: (ref or {}).get("token") for name, ref in (inputs or {}).items()}
+
+
+def write_artifact(data, stage, context=None, partition_cols=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                   inputs=None, **uri_kwargs):
+    """
+    Write ``data`` (list of dicts, DataFrame or Arrow table) as Parquet parts; return its reference.
+
+    Re-running a stage for the same run replaces its previous output.
+    ``inputs`` ({name: ref}) records which upstream writes this one was built from.
+    """
+    table = _to_table(data)
+    uri = artifact_uri(stage, context=context, **uri_kwargs)
+    ref = {"uri": uri, "rows": table.num_rows, "columns": table.column_names, "token": uuid.uuid4().hex}
+
+    filesystem, path = filesystem_for(uri)
+    filesystem.create_dir(path, recursive=True)
+    filesystem.delete_dir_contents(path, missing_dir_ok=True)
+    if table.num_rows == 0:
+        logging.info(f"Stage '{stage}' produced no rows; nothing written to {uri}")
+    else:
+        ds.write_dataset(
+            table,
+            path,
+            filesystem=filesystem,
+            format="parquet",
+            partitioning=partition_cols,
+            partitioning_flavor="hive" if partition_cols else None,
+            basename_template="part-{i}.parquet",
+            max_rows_per_file=chunk_rows,
+            max_rows_per_group=chunk_rows,
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        logging.info(f"Wrote {table.num_rows} rows for stage '{stage}' to {uri}")
+
+    # Written last: a stage without a marker never finished
+    with filesystem.open_output_stream(f"{path}/{MARKER}") as marker:
+        marker.write(json.dumps({**ref, "inputs": _input_tokens(inputs)}).encode("utf-8"))
+    return ref
+
+
+def completed_artifact(stage, context=None, inputs=None, **uri_kwargs):
+    """
+    Reference of this run's finished ``stage`` output, or None if it must be (re)built.
+
+    With ``inputs`` ({name: ref}), a checkpoint built from different upstream
+    writes (e.g. after an upstream task was cleared and re-run) does not count.
+    """
+    uri = artifact_uri(stage, context=context, **uri_kwargs)
+    filesystem, path = filesystem_for(uri)
+    if filesystem.get_file_info(f"{path}/{MARKER}").type == pafs.FileType.NotFound:
+        return None
+    with filesystem.open_input_stream(f"{path}/{MARKER}") as marker:
+        recorded = json.loads(marker.read().decode("utf-8"))
+    if inputs is not None and recorded.pop("inputs", {}) != _input_tokens(inputs):
+        logging.info(f"Checkpoint for stage '{stage}' at {uri} is stale; rebuilding")
+        return None
+    recorded.pop("inputs", None)
+    logging.info(f"Stage '{stage}' already completed for this run ({recorded['rows']} rows at {uri}); skipping")
+    return recorded
+
+
+def read_artifact(ref, columns=None, filter=None):
+    """
+    Read an artifact back as an Arrow table, projecting ``columns`` that exist in it.
+
+    ``filter`` is a ``pyarrow.compute`` expression (e.g. a key range for one
+    shard); it is pushed down to the Parquet row groups.
+    """
+    if not ref or not ref.get("rows"):
+        return pa.table({c: pa.array([], pa.null()) for c in columns or []})
+    filesystem, path = filesystem_for(ref["uri"])
+    dataset = ds.dataset(path, filesystem=filesystem, format="parquet", partitioning="hive")
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    return dataset.to_table(columns=columns, filter=filter)
+
+
+def read_records(ref, columns=None, filter=None):
+    """Read an artifact back as a list of dicts (nulls come back as None)."""
+    return read_artifact(ref, columns, filter).to_pylist()
+
+
+def read_frame(ref, columns=None, filter=None):
+    """Read an artifact back as a pandas DataFrame."""
+    return read_artifact(ref, columns, filter).to_pandas()
@@ -0,0 +1,238 @@
+"""
+OpenAI Batch API Runner
+=======================
+Offline execution mode for non-latency-sensitive stages: every request for
+a stage is written to one JSONL file, submitted through the Batch API, and
+the task polls until the job finishes. Results come back keyed by the
+``custom_id`` you chose (an article URL, a ``play_hash``, ...), ready to be
+joined onto the stage's DataFrame.
+
+Batch jobs cost half as much as synchronous calls and do not count against
+the per-minute rate limits.
+
+Requests share the ``CachedOpenAI`` response cache (``pipeline_kit.llm_cache``):
+each request is looked up under the key the equivalent sync call would use
+and only misses are uploaded; results are written back afterwards. A stage
+re-run after a failure, or switched between sync and batch mode, does not
+pay for answers it already has.
+
+    requests = [chat_request(row.play_hash, "gpt-4o", messages, PlayAnalysis) for row in ...]
+    parsed = parse_results(run_batch(requests), PlayAnalysis)
+
+Set OPENAI_BATCH_BASE_URL to point batch jobs at a local stand-in server
+that implements the ``/files`` and ``/batches`` endpoints.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+
+import openai
+from pydantic import BaseModel
+
+from pipeline_kit.llm_cache import ResponseCache, request_key
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+DEFAULT_POLL_INTERVAL = 30  # seconds
+REQUEST_FIELDS = ("custom_id", "method", "url", "body")  # what is uploaded; other keys stay local
+
+
+def batch_client():
+    """OpenAI client for batch jobs, honouring OPENAI_BATCH_BASE_URL."""
+    base_url = os.getenv("OPENAI_BATCH_BASE_URL")
+    return openai.OpenAI(base_url=base_url) if base_url else openai.OpenAI()
+
+
+def _strict_schema(schema):
+    """JSON schema in the form structured outputs' strict mode expects: closed objects, every property required."""
+    if isinstance(schema, list):
+        return [_strict_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    # Optional fields stay nullable through anyOf; a null default is not allowed
+    schema = {key: _strict_schema(value) for key, value in schema.items() if not (key == "default" and value is None)}
+    if schema.get("type") == "object" and isinstance(schema.get("properties"), dict):
+        schema["additionalProperties"] = False
+        schema["required"] = list(schema["properties"])
+    return schema
+
+
+def response_format_param(model):
+    """``response_format`` body for a Pydantic model, as ``parse(response_format=model)`` sends it."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "schema": _strict_schema(model.model_json_schema()), "strict": True},
+    }
+
+
+def chat_request(custom_id, model, messages, response_format=None, **params):
+    """
+    Build one JSONL line for a chat completion, mirroring a sync create/parse call.
+
+    ``cache_key`` is the key the same sync call has in the LLM response
+    cache; it is not uploaded.
+    """
+    body = {"model": model, "messages": messages, **params}
+    call = {"model": model, "messages": messages, **params}
+    if isinstance(response_format, type) and issubclass(response_format, BaseModel):
+        body["response_format"] = response_format_param(response_format)
+        cache_key = request_key("beta.chat.completions.parse", response_format=response_format, **call)
+    else:
+        if response_format is not None:
+            body["response_format"] = call["response_format"] = response_format
+        cache_key = request_key("chat.completions.create", **call)
+    return {
+        "custom_id": str(custom_id), "method": "POST", "url": CHAT_COMPLETIONS_URL, "body": body,
+        "cache_key": cache_key,
+    }
+
+
+def submit_batch(requests, client=None, metadata=None):
+    """Write requests to a JSONL file, upload it and start a batch job; return the batch id."""
+    client = client or batch_client()
+    ids = [r["custom_id"] for r in requests]
+    if len(ids) != len(set(ids)):
+        raise ValueError("custom_id values must be unique within a batch")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as f:
+        for request in requests:
+            line = {field: request[field] for field in REQUEST_FIELDS}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        path = f.name
+    try:
+        with open(path, "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+    finally:
+        os.remove(path)
+
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=CHAT_COMPLETIONS_URL,
+        completion_window="24h",
+        metadata=metadata,
+    )
+    logging.info(f"Submitted batch {batch.id} with {len(requests)} requests")
+    return batch.id
+
+
+def wait_for_batch(batch_id, client=None, poll_interval=DEFAULT_POLL_INTERVAL, timeout=None):
+    """Poll a batch until it reaches a terminal state; return the final batch object."""
+    client = client or batch_client()
+    start = time.monotonic()
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        logging.info(
+            f"Batch {batch_id}: {batch.status}"
+            + (f" ({counts.completed}/{counts.total} done, {counts.failed} failed)" if counts else "")
+        )
+        if batch.status in TERMINAL_STATES:
+            return batch
+        if timeout and time.monotonic() - start > timeout:
+            raise TimeoutError(f"Batch {batch_id} still {batch.status} after {timeout}s")
+        time.sleep(poll_interval)
+
+
+def fetch_results(batch, client=None):
+    """Download a finished batch; return {custom_id: response body} for successful requests."""
+    client = client or batch_client()
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'")
+
+    results = {}
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                results[record["custom_id"]] = response["body"]
+            else:
+                logging.error(f"Batch request {record['custom_id']} failed: {record.get('error') or response}")
+
+    if batch.error_file_id:
+        for line in client.files.content(batch.error_file_id).text.splitlines():
+            if line.strip():
+                record = json.loads(line)
+                logging.error(f"Batch request {record.get('custom_id')} failed: {record.get('error')}")
+    return results
+
+
+def _cacheable(request, body):
+    """Response body as the sync client would have cached it, or None if it should not be cached."""
+    message = body["choices"][0]["message"]
+    if message.get("refusal"):
+        return None
+    if request["body"].get("response_format", {}).get("type") == "json_schema":
+        # A cached parse() completion carries the parsed object next to the raw content
+        try:
+            parsed = json.loads(message.get("content") or "")
+        except ValueError:
+            return None
+        body = {**body, "choices": [
+            {**choice, "message": {**choice["message"], "parsed": parsed if n == 0 else None}}
+            for n, choice in enumerate(body["choices"])
+        ]}
+    return json.dumps(body)
+
+
+def run_batch(requests, client=None, poll_interval=DEFAULT_POLL_INTERVAL, timeout=None, metadata=None,
+              cache=None):
+    """
+    Submit, wait for and download one batch job; return {custom_id: response body}.
+
+    Requests already in the LLM response cache (``cache``, default: a
+    ``ResponseCache`` on LLM_CACHE_PATH; pass False to bypass it) are
+    answered from it, and only the rest are uploaded.
+    """
+    if not requests:
+        return {}
+    if cache is None:
+        cache = ResponseCache()
+
+    cached, pending = {}, []
+    for request in requests:
+        text = cache.get(request["cache_key"]) if cache and request.get("cache_key") else None
+        if text is None:
+            pending.append(request)
+        else:
+            cached[request["custom_id"]] = json.loads(text)
+    if cached:
+        logging.info(f"{len(cached)} of {len(requests)} batch requests answered from the LLM cache")
+    if not pending:
+        return cached
+
+    client = client or batch_client()
+    batch_id = submit_batch(pending, client=client, metadata=metadata)
+    batch = wait_for_batch(batch_id, client=client, poll_interval=poll_interval, timeout=timeout)
+    results = fetch_results(batch, client=client)
+    logging.info(f"Batch {batch_id}: {len(results)}/{len(pending)} requests succeeded")
+
+    if cache:
+        for request in pending:
+            body = results.get(request["custom_id"])
+            text = _cacheable(request, body) if body and request.get("cache_key") else None
+            if text:
+                cache.set(request["cache_key"], text)
+    return {**cached, **results}
+
+
+def message_content(body):
+    """Return the assistant text from a chat completion response body."""
+    return body["choices"][0]["message"].get("content")
+
+
+def parse_results(results, response_format):
+    """Validate each response body against a Pydantic schema; unparseable bodies map to None."""
+    parsed = {}
+    for custom_id, body in results.items():
+        try:
+            parsed[custom_id] = response_format.model_validate_json(message_content(body))
+        except Exception as e:
+            logging.error(f"Could not parse batch result {custom_id}: {e}")
+            parsed[custom_id] = None
+    return parsed
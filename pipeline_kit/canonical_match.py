@@ -0,0 +1,144 @@
+"""
+Local Canonical Matching for Closed Vocabularies
+================================================
+Mapping an extracted name onto a small reference list ("Scherzer" ->
+28976 / "Max Scherzer") does not need an LLM when the candidates are
+known. ``CanonicalMatcher`` tries, in order:
+
+1. exact match on the normalized name or key     -> confidence "high"
+2. alias table (nicknames, spelled-out pitch names) -> "high"
+3. unique last name, alone or after a first name/initial
+   (``last_names=True``)                          -> "medium"
+4. ``rapidfuzz`` score against every candidate, accepted when the best
+   score clears ``score_cutoff`` and beats the runner-up by ``margin``
+   -> "medium"
+
+Anything else (no candidate above the cutoff, or a tie such as two
+players named Hernandez) returns None and should be escalated to the LLM.
+
+    matcher = CanonicalMatcher(pitcher_reference, last_names=True)
+    matches = matcher.match_many(df["pitcher_name"])   # {value: match or None}
+    print(matcher.stats())   # {'values': 14, 'escalated': 1, 'escalation_rate': 0.071, ...}
+
+Normalization lowercases, strips accents and punctuation, and drops
+generational suffixes (Jr., Sr., II, III), so "Vladimir Guerrero Jr" and
+"vladimir guerrero jr." match exactly.
+"""
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from rapidfuzz import fuzz, process
+
+DEFAULT_SCORE_CUTOFF = 88
+DEFAULT_MARGIN = 6
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+
+
+def normalize_name(text):
+    """Lowercase, strip accents/punctuation/suffixes and collapse whitespace."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    words = re.sub(r"[^a-z0-9]+", " ", text.lower()).split()
+    return " ".join(word for word in words if word not in SUFFIXES)
+
+
+class CanonicalMatcher:
+    """Resolve free-text values to the keys of a small {key: canonical name} reference."""
+
+    def __init__(self, reference, aliases=None, last_names=False,
+                 score_cutoff=DEFAULT_SCORE_CUTOFF, margin=DEFAULT_MARGIN, scorer=fuzz.token_sort_ratio):
+        self.reference = dict(reference)
+        self.score_cutoff = score_cutoff
+        self.margin = margin
+        self.scorer = scorer
+        self.counts = Counter()
+
+        self.exact = {}
+        for key, name in self.reference.items():
+            self.exact[normalize_name(name)] = key
+            if isinstance(key, str):  # codes such as pitch abbreviations match too
+                self.exact.setdefault(normalize_name(key), key)
+        # Aliases pointing outside this reference are ignored, so one table can serve several
+        self.aliases = {normalize_name(alias): key for alias, key in (aliases or {}).items() if key in self.reference}
+
+        # Trailing words of each name ("ohtani", "kiner falefa") -> keys sharing them
+        self.last_names = {}
+        if last_names:
+            index = defaultdict(set)
+            for key, name in self.reference.items():
+                words = normalize_name(name).split()
+                for start in range(1, len(words)):
+                    index[" ".join(words[start:])].add(key)
+            self.last_names = dict(index)
+
+        # Fuzzy candidates: names, aliases and unambiguous last names
+        unique_last = {last: next(iter(keys)) for last, keys in self.last_names.items() if len(keys) == 1}
+        self.choices = {**unique_last, **self.exact, **self.aliases}
+
+    def _result(self, key, confidence, method, score=100.0):
+        self.counts[method] += 1
+        return {
+            "key": key,
+            "name": self.reference[key],
+            "confidence": confidence,
+            "method": method,
+            "score": round(float(score), 1),
+        }
+
+    def match(self, value):
+        """Best local match for one value as {key, name, confidence, method, score}, or None to escalate."""
+        normalized = normalize_name(value)
+        if not normalized:
+            self.counts["escalated"] += 1
+            return None
+        if normalized in self.exact:
+            return self._result(self.exact[normalized], "high", "exact")
+        if normalized in self.aliases:
+            return self._result(self.aliases[normalized], "high", "alias")
+
+        candidates = self.last_names.get(normalized, set())
+        if len(candidates) == 1:
+            return self._result(next(iter(candidates)), "medium", "last_name")
+        # Initial or short first name plus a last name ("S. Ohtani", "Vlad Guerrero", "T. Hernandez")
+        words = normalized.split()
+        if len(words) > 1:
+            candidates = [
+                key for key in self.last_names.get(words[-1], ())
+                if normalize_name(self.reference[key]).startswith(words[0])
+            ]
+            if len(candidates) == 1:
+                return self._result(candidates[0], "medium", "last_name")
+
+        ranked = process.extract(normalized, list(self.choices), scorer=self.scorer, limit=None)
+        best_score, best_key, runner_up = 0.0, None, 0.0
+        for choice, score, _ in ranked:
+            key = self.choices[choice]
+            if best_key is None:
+                best_score, best_key = score, key
+            elif key != best_key:
+                runner_up = score
+                break
+        if best_key is not None and best_score >= self.score_cutoff and best_score - runner_up >= self.margin:
+            return self._result(best_key, "medium", "fuzzy", best_score)
+
+        self.counts["escalated"] += 1
+        return None
+
+    def match_many(self, values):
+        """{value: match or None} for every distinct non-null value, in first-seen order."""
+        matches = {}
+        for value in values:
+            if value is None or value != value or value in matches:  # None / NaN / seen
+                continue
+            matches[value] = self.match(value)
+        return matches
+
+    def stats(self):
+        """Counts per match method plus the escalation rate over the values matched so far."""
+        total = sum(self.counts.values())
+        return {
+            "values": total,
+            **{method: self.counts[method] for method in ("exact", "alias", "last_name", "fuzzy", "escalated")},
+            "escalation_rate": round(self.counts["escalated"] / total, 3) if total else 0.0,
+        }
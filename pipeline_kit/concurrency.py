@@ -0,0 +1,109 @@
+"""
+Async Worker Pool with Rate Limits
+==================================
+Runs a per-row function (usually one LLM call) concurrently while staying
+under the provider's limits:
+
+- max_in_flight: requests running at the same time
+- requests_per_minute (RPM) and tokens_per_minute (TPM): token buckets
+
+Results come back in input order, so they can be assigned to a DataFrame
+column in one step:
+
+    scores = map_concurrent(perform_sentiment_analysis, df["content"].tolist(),
+                            max_in_flight=16, requests_per_minute=500,
+                            tokens_per_minute=30_000)
+    df["sentiment"] = pd.Series(scores, index=df.index)
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline_kit.aio import run_sync
+
+
+def estimate_tokens(item, overhead=100):
+    """Rough token estimate (~4 characters per token) plus prompt/response overhead."""
+    return len(str(item)) // 4 + overhead
+
+
+class RateLimiter:
+    """Async token bucket that refills ``per_minute`` units evenly over each minute."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount=1):
+        """Wait until ``amount`` units are available, then take them."""
+        amount = min(amount, self.capacity)  # a single oversized request must still pass
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) / self.rate)
+
+
+async def amap_concurrent(
+    func,
+    items,
+    max_in_flight=8,
+    requests_per_minute=None,
+    tokens_per_minute=None,
+    token_estimator=estimate_tokens,
+    log_every=100,
+):
+    """
+    Apply a synchronous ``func`` to every item on a bounded pool of worker threads.
+
+    Returns a list aligned with ``items``; items whose call raised get None.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    semaphore = asyncio.Semaphore(max_in_flight)
+    rpm = RateLimiter(requests_per_minute) if requests_per_minute else None
+    tpm = RateLimiter(tokens_per_minute) if tokens_per_minute else None
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_in_flight)
+    done = 0
+
+    async def worker(i, item):
+        nonlocal done
+        if rpm:
+            await rpm.acquire()
+        if tpm:
+            await tpm.acquire(token_estimator(item))
+        async with semaphore:
+            try:
+                results[i] = await loop.run_in_executor(executor, func, item)
+            except Exception as e:
+                logging.error(f"Error processing item {i}: {e}")
+        done += 1
+        if log_every and done % log_every == 0:
+            logging.info(f"Processed {done}/{len(items)} items")
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker(i, item) for i, item in enumerate(items)))
+    finally:
+        executor.shutdown(wait=False)
+    elapsed = time.perf_counter() - start
+    logging.info(
+        f"Processed {len(items)} items in {elapsed:.1f}s "
+        f"({len(items) / elapsed if elapsed else 0:.1f} items/s, max_in_flight={max_in_flight})"
+    )
+    return results
+
+
+def map_concurrent(func, items, **kwargs):
+    """Synchronous wrapper around ``amap_concurrent`` (safe to call from Jupyter)."""
+    return run_sync(amap_concurrent(func, items, **kwargs))
@@ -0,0 +1,148 @@
+"""
+Pooled Postgres Sessions
+========================
+One ``psycopg_pool.ConnectionPool`` per process, built from the usual
+``PG*`` environment variables, so tasks and scripts that run many small
+queries (watermark lookups, verification counts, ...) reuse connections
+instead of paying TCP + auth setup for each one.
+
+    from pipeline_kit.db import connection
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM news_articles")
+
+- ``connection()`` commits when the block succeeds and rolls back on error;
+  the connection goes back to the pool either way.
+- Pooled connections keep psycopg's default prepare threshold.
+  ``PG_PREPARE_THRESHOLD`` overrides it (an integer, or "none" to never
+  prepare). Prepared plans live as long as the pooled connection, so a low
+  threshold also means more plans left stale by ``ALTER TABLE`` migrations.
+- Every statement is timed; ``statement_stats()`` returns call counts and
+  total/mean latency per statement, and statements slower than
+  ``PG_SLOW_STATEMENT_MS`` are logged as warnings.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg
+from psycopg_pool import ConnectionPool
+
+DEFAULT_SLOW_STATEMENT_MS = 500
+
+_pools = {}
+_pools_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def conninfo_from_env(**overrides):
+    """Connection keyword arguments from PGHOST/PGPORT/PGDATABASE/PGUSER/PGPASSWORD."""
+    params = {
+        "host": os.getenv("PGHOST", "localhost"),
+        "port": os.getenv("PGPORT", "5432"),
+        "dbname": os.getenv("PGDATABASE", "news_db"),
+        "user": os.getenv("PGUSER", "news_user"),
+        "password": os.getenv("PGPASSWORD", ""),
+    }
+    params.update(overrides)
+    return params
+
+
+def _record(query, seconds):
+    key = " ".join(str(query).split())[:200]
+    with _stats_lock:
+        calls, total = _stats.get(key, (0, 0.0))
+        _stats[key] = (calls + 1, total + seconds)
+    slow_ms = float(os.getenv("PG_SLOW_STATEMENT_MS", DEFAULT_SLOW_STATEMENT_MS))
+    if seconds * 1000 >= slow_ms:
+        logging.warning(f"Slow statement ({seconds * 1000:.0f} ms): {key}")
+
+
+class TimedCursor(psycopg.Cursor):
+    """Cursor that records the wall time of every execute/executemany/copy."""
+
+    def execute(self, query, params=None, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, params, **kwargs)
+        finally:
+            _record(self._as_text(query), time.perf_counter() - start)
+
+    def executemany(self, query, params_seq, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, params_seq, **kwargs)
+        finally:
+            _record(self._as_text(query), time.perf_counter() - start)
+
+    @contextmanager
+    def copy(self, statement, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with super().copy(statement, *args, **kwargs) as copy:
+                yield copy
+        finally:
+            _record(self._as_text(statement), time.perf_counter() - start)
+
+    def _as_text(self, query):
+        if isinstance(query, (str, bytes)):
+            return query.decode() if isinstance(query, bytes) else query
+        try:
+            return query.as_string(self)
+        except Exception:
+            return repr(query)
+
+
+def get_pool(min_size=1, max_size=4, **overrides):
+    """Return the process-wide pool for these connection parameters, opening it on first use."""
+    params = conninfo_from_env(**overrides)
+    key = tuple(sorted((k, str(v)) for k, v in params.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            kwargs = {**params, "cursor_factory": TimedCursor}
+            threshold = os.getenv("PG_PREPARE_THRESHOLD")
+            if threshold:
+                kwargs["prepare_threshold"] = None if threshold == "none" else int(threshold)
+            pool = ConnectionPool(
+                kwargs=kwargs,
+                min_size=min_size,
+                max_size=max_size,
+                name=f"{params['user']}@{params['host']}/{params['dbname']}",
+                open=True,
+            )
+            _pools[key] = pool
+    return pool
+
+
+@contextmanager
+def connection(timeout=None, **overrides):
+    """Borrow a pooled connection (waiting up to ``timeout`` seconds); commit on success, roll back on error."""
+    with get_pool(**overrides).connection(timeout=timeout) as conn:
+        yield conn
+
+
+def statement_stats():
+    """Per-statement {calls, total_ms, mean_ms} recorded in this process, slowest first."""
+    with _stats_lock:
+        items = list(_stats.items())
+    stats = {
+        query: {"calls": calls, "total_ms": round(total * 1000, 2), "mean_ms": round(total * 1000 / calls, 2)}
+        for query, (calls, total) in items
+    }
+    return dict(sorted(stats.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+
+
+@atexit.register
+def close_pools():
+    """Close every pool opened in this process."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -0,0 +1,103 @@
+"""
+Vectorized Ledger Date Columns
+==============================
+Payment terms, business-day due dates and fiscal quarters for whole
+columns at once, instead of a ``df.apply(..., axis=1)`` that builds a
+``BDay`` offset per row:
+
+- ``term_days`` parses "NET30" / "net 45" with one ``str.extract`` over
+  the distinct terms.
+- ``business_due_dates`` moves every date forward with
+  ``numpy.busday_offset`` (Mon-Fri, optionally skipping holidays) and keeps
+  each timestamp's time of day and timezone.
+- ``fiscal_quarters`` is an array lookup on ``dt.month``.
+
+    ledger = add_ledger_dates(ledger)                              # due_date, fiscal_quarter
+    ledger = add_ledger_dates(ledger, holidays=USFederalHolidayCalendar())
+
+Without holidays, ``business_due_dates`` matches ``date + BDay(n)``:
+a weekend start counts from the Friday before, so Saturday + 1 business
+day is Monday, and Saturday + 0 business days is also Monday (never a
+due date before the start). Unparseable terms or dates give NaT / None.
+"""
+
+import numpy as np
+import pandas as pd
+
+TERMS_PATTERN = r"(?i)^\s*net\s*-?\s*(\d+)\s*$"
+FISCAL_START_MONTH = 2  # Q1 = Feb-Apr
+
+
+def term_days(terms):
+    """Days in payment terms such as "NET30" as an Int64 Series (<NA> when unparseable)."""
+    terms = pd.Series(terms)
+    # A ledger has a handful of distinct terms: parse those once and broadcast by code
+    codes, distinct = pd.factorize(terms)
+    days = pd.Series(distinct, dtype="string").str.extract(TERMS_PATTERN, expand=False)
+    days = pd.array(pd.to_numeric(days, errors="coerce"), dtype="Int64")
+    parsed = days.take(codes, allow_fill=True)
+    return pd.Series(parsed, index=terms.index)
+
+
+def _holiday_dates(holidays, start, end):
+    """Holiday dates as datetime64[D]: from a pandas holiday calendar over [start, end], or a list of dates."""
+    if holidays is None:
+        return np.array([], dtype="datetime64[D]")
+    if hasattr(holidays, "holidays"):  # pandas AbstractHolidayCalendar
+        holidays = holidays.holidays(start=start, end=end)
+    return pd.to_datetime(pd.Series(list(holidays))).dt.tz_localize(None).values.astype("datetime64[D]")
+
+
+def business_due_dates(dates, days, holidays=None, weekmask="Mon Tue Wed Thu Fri"):
+    """
+    ``dates`` moved ``days`` business days forward, for whole columns.
+
+    Args:
+        dates: Series of timestamps (naive or tz-aware; the time of day is kept).
+        days: Series or array of business days per row (e.g. ``term_days(terms)``).
+        holidays: Optional list of dates or a pandas holiday calendar
+            (``USFederalHolidayCalendar()``) to skip as well as weekends.
+    """
+    dates = pd.to_datetime(pd.Series(dates), errors="coerce")
+    days = pd.Series(pd.array(days, dtype="Int64"), index=dates.index)
+    tz = dates.dt.tz
+    local = dates.dt.tz_localize(None) if tz is not None else dates
+    day = local.dt.normalize()
+
+    valid = day.notna() & days.notna()
+    start = day[valid].values.astype("datetime64[D]")
+    offsets = days[valid].to_numpy(dtype="int64")
+    first, last = (day[valid].min(), day[valid].max()) if valid.any() else (None, None)
+    if last is not None:
+        # Far enough past the last start for the longest term, weekends and holidays included
+        last += pd.Timedelta(days=2 * int(offsets.max()) + 30)
+    calendar = np.busdaycalendar(weekmask=weekmask, holidays=_holiday_dates(holidays, first, last))
+    # Like BDay, a start on a weekend/holiday counts from the business day before
+    # (roll="backward"), except that zero days rolls forward to the next business day
+    moved = np.busday_offset(start, offsets, roll="backward", busdaycal=calendar)
+    zero = offsets == 0
+    moved[zero] = np.busday_offset(start[zero], 0, roll="forward", busdaycal=calendar)
+
+    due = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+    due[valid] = moved.astype("datetime64[ns]")
+    due = due + (local - day)
+    return due.dt.tz_localize(tz) if tz is not None else due
+
+
+def fiscal_quarters(dates, start_month=FISCAL_START_MONTH):
+    """Fiscal quarter labels ("Q1".."Q4") for a Series of dates; the fiscal year starts in ``start_month``."""
+    dates = pd.to_datetime(pd.Series(dates), errors="coerce")
+    months = np.arange(1, 13)
+    # Index 0 is for missing dates; 1-12 hold each calendar month's quarter
+    labels = np.array([None] + [f"Q{(month - start_month) % 12 // 3 + 1}" for month in months], dtype=object)
+    month = dates.dt.month.fillna(0).astype("int64").to_numpy()
+    return pd.Series(labels[month], index=dates.index, dtype=object)
+
+
+def add_ledger_dates(df, date_column="transaction_date", terms_column="terms", holidays=None,
+                     start_month=FISCAL_START_MONTH):
+    """Return ``df`` with fiscal_quarter and due_date derived from ``date_column`` and ``terms_column``."""
+    return df.assign(
+        fiscal_quarter=fiscal_quarters(df[date_column], start_month),
+        due_date=business_due_dates(df[date_column], term_days(df[terms_column]), holidays=holidays),
+    )
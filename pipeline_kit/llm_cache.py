@@ -0,0 +1,204 @@
+"""
+Content-Addressed LLM Response Cache
+====================================
+A drop-in wrapper around the OpenAI client that stores every chat/parse
+response in a local SQLite file, keyed by a hash of the request:
+model, messages (system prompt + user content), the ``response_format``
+schema, and sampling parameters.
+
+Identical requests are answered from disk, so re-running a pipeline after a
+downstream failure costs zero API calls for the stages that already ran.
+
+    llm = CachedOpenAI()
+    completion = llm.beta.chat.completions.parse(
+        model="gpt-4o", messages=[...], response_format=ExtractedArticle
+    )
+    print(llm.cache.stats())   # {'hits': ..., 'misses': ..., ...}
+
+Configuration (constructor args or environment variables):
+- LLM_CACHE_PATH: SQLite file (default: ~/.cache/pipeline_kit/llm_cache.sqlite)
+- LLM_CACHE_TTL_SECONDS: Entries older than this are refetched (default: 30 days)
+- LLM_CACHE_MAX_MB: Least-recently-used entries are evicted above this size
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+import openai
+from openai.types.chat import ChatCompletion, ParsedChatCompletion
+from pydantic import BaseModel
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "pipeline_kit", "llm_cache.sqlite")
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_MB = 512
+
+CACHE_DDL = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_last_access_idx ON llm_cache (last_access);
+"""
+
+
+def _is_schema(response_format):
+    return isinstance(response_format, type) and issubclass(response_format, BaseModel)
+
+
+def request_key(endpoint, **kwargs):
+    """Hash the parts of a request that determine its response."""
+    response_format = kwargs.get("response_format")
+    if _is_schema(response_format):
+        kwargs["response_format"] = {
+            "name": response_format.__name__,
+            "schema": response_format.model_json_schema(),
+        }
+    payload = json.dumps({"endpoint": endpoint, **kwargs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed key/value store with TTL expiry, LRU size eviction and counters."""
+
+    def __init__(self, path=None, ttl_seconds=None, max_mb=None):
+        self.path = path or os.getenv("LLM_CACHE_PATH", DEFAULT_PATH)
+        self.ttl_seconds = float(ttl_seconds or os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        self.max_bytes = int(float(max_mb or os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        # Opened lazily so importing a DAG file never touches the disk
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(CACHE_DDL)
+        return self._conn
+
+    def get(self, key):
+        """Return the cached response text, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] > self.ttl_seconds:
+                self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, response):
+        """Store a response, then evict least-recently-used entries over max size."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, len(response), now, now),
+            )
+            cur = self.conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY last_access DESC, key) AS running
+                        FROM llm_cache
+                    ) WHERE running > ?
+                )
+                """,
+                (self.max_bytes,),
+            )
+            self.evictions += max(cur.rowcount, 0)
+            self.conn.commit()
+
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            self.conn.execute("DELETE FROM llm_cache")
+            self.conn.commit()
+
+    def stats(self):
+        """Return hit/miss/eviction counters plus current entry count and size."""
+        with self._lock:
+            entries, size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_mb": round(size / (1024 * 1024), 2),
+        }
+
+
+class CachedOpenAI:
+    """
+    Caching stand-in for the ``openai`` client.
+
+    Exposes ``chat.completions.create`` and ``beta.chat.completions.parse``
+    with the same arguments and return types as the real client.
+    """
+
+    def __init__(self, client=None, cache=None, **cache_kwargs):
+        self.client = client or openai
+        self.cache = cache or ResponseCache(**cache_kwargs)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.beta = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(parse=self._parse))
+        )
+
+    def _cached_call(self, endpoint, call, restore, kwargs):
+        if kwargs.get("stream"):
+            return call(**kwargs)
+
+        key = request_key(endpoint, **kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logging.debug(f"LLM cache hit ({endpoint}, model={kwargs.get('model')})")
+            return restore(cached)
+
+        completion = call(**kwargs)
+        if not any(choice.message.refusal for choice in completion.choices):
+            self.cache.set(key, completion.model_dump_json())
+        return completion
+
+    def _create(self, **kwargs):
+        return self._cached_call(
+            "chat.completions.create",
+            self.client.chat.completions.create,
+            ChatCompletion.model_validate_json,
+            kwargs,
+        )
+
+    def _parse(self, **kwargs):
+        response_format = kwargs.get("response_format")
+        model = ParsedChatCompletion[response_format] if _is_schema(response_format) else ChatCompletion
+        return self._cached_call(
+            "beta.chat.completions.parse",
+            self.client.beta.chat.completions.parse,
+            model.model_validate_json,
+            kwargs,
+        )
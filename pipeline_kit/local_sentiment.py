@@ -0,0 +1,158 @@
+"""
+Tiered Sentiment: Local Lexicon Fast Path with LLM Escalation
+=============================================================
+Most financial headlines are unambiguous ("beats estimates", "shares
+plunge"), so paying LLM latency for them is waste. This module scores the
+whole text column locally first, with a small finance lexicon and
+vectorized pandas string ops on the CPU, and only escalates rows that are
+borderline or low-confidence to the LLM.
+
+    scores, report = tiered_sentiment(
+        df["content"],
+        lambda texts: map_concurrent(perform_sentiment_analysis, texts, max_in_flight=16,
+                                     requests_per_minute=500, tokens_per_minute=30_000),
+    )
+    df["sentiment"] = scores
+
+``report`` carries the escalation rate, per-tier latency, and agreement
+between the lexicon and the LLM on the rows both scored.
+"""
+
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+# Weights in [-1, 1]; tuned for business/market news rather than general text
+FINANCE_LEXICON = {
+    # positive
+    "beat": 0.6, "beats": 0.6, "surge": 0.7, "surges": 0.7, "surged": 0.7, "soar": 0.8,
+    "soars": 0.8, "soared": 0.8, "rally": 0.6, "rallies": 0.6, "rallied": 0.6, "gain": 0.5,
+    "gains": 0.5, "gained": 0.5, "jump": 0.5, "jumps": 0.5, "jumped": 0.5, "record": 0.4,
+    "profit": 0.5, "profits": 0.5, "profitable": 0.6, "growth": 0.5, "grow": 0.4, "grows": 0.4,
+    "strong": 0.5, "stronger": 0.5, "upgrade": 0.6, "upgraded": 0.6, "outperform": 0.6,
+    "bullish": 0.7, "boost": 0.5, "boosts": 0.5, "boosted": 0.5, "expands": 0.4, "expansion": 0.4,
+    "approval": 0.5, "approved": 0.5, "wins": 0.5, "win": 0.4, "success": 0.6, "successful": 0.6,
+    "optimistic": 0.6, "rebound": 0.5, "rebounds": 0.5, "innovative": 0.4, "breakthrough": 0.7,
+    "exceeds": 0.6, "exceeded": 0.6, "raises": 0.3, "dividend": 0.3, "partnership": 0.3,
+    # negative
+    "miss": -0.6, "misses": -0.6, "missed": -0.6, "plunge": -0.8, "plunges": -0.8,
+    "plunged": -0.8, "slump": -0.7, "slumps": -0.7, "fall": -0.5, "falls": -0.5, "fell": -0.5,
+    "drop": -0.5, "drops": -0.5, "dropped": -0.5, "decline": -0.5, "declines": -0.5,
+    "declined": -0.5, "loss": -0.6, "losses": -0.6, "weak": -0.5, "weaker": -0.5,
+    "downgrade": -0.6, "downgraded": -0.6, "underperform": -0.6, "bearish": -0.7, "recall": -0.6,
+    "recalls": -0.6, "lawsuit": -0.6, "sued": -0.6, "probe": -0.5, "investigation": -0.5,
+    "fraud": -0.9, "layoffs": -0.6, "layoff": -0.6, "cuts": -0.4, "cut": -0.3, "crash": -0.8,
+    "crashes": -0.8, "fine": -0.3, "fined": -0.6, "penalty": -0.5, "warning": -0.4, "warns": -0.5,
+    "risk": -0.3, "risks": -0.3, "delay": -0.4, "delays": -0.4, "delayed": -0.4, "bankruptcy": -0.9,
+    "concerns": -0.4, "concern": -0.4, "fears": -0.5, "volatile": -0.3, "selloff": -0.7,
+    "tumble": -0.7, "tumbles": -0.7, "tumbled": -0.7, "halt": -0.5, "halts": -0.5,
+}
+NEGATORS = {"not", "no", "never", "without", "isn't", "wasn't", "didn't", "doesn't", "won't", "can't"}
+
+DEFAULT_BAND = 0.25      # |score| below this is borderline and escalates
+DEFAULT_MIN_HITS = 2     # fewer lexicon hits than this escalates
+NEUTRAL_BAND = 0.1       # |score| below this counts as neutral when comparing tiers
+
+
+def lexicon_scores(texts, lexicon=FINANCE_LEXICON, negators=NEGATORS):
+    """
+    Score a Series of texts in one vectorized pass.
+
+    Returns a DataFrame (same index) with ``score`` in [-1, 1] and ``hits``,
+    the number of lexicon terms found.
+    """
+    texts = pd.Series(texts)
+    index, texts = texts.index, texts.reset_index(drop=True)  # groupby(level=0) needs a unique index
+    tokens = texts.fillna("").astype(str).str.lower().str.findall(r"[a-z']+").explode()
+    weights = tokens.map(lexicon)
+    negated = tokens.groupby(level=0).shift().isin(negators)
+    weights = weights.where(~negated, -weights)
+
+    raw = weights.groupby(level=0).sum(min_count=1).reindex(texts.index).fillna(0.0)
+    hits = weights.notna().groupby(level=0).sum().reindex(texts.index).fillna(0).astype(int)
+    score = raw / np.sqrt(raw ** 2 + 1.0)  # squash into (-1, 1), VADER-style
+    return pd.DataFrame({"score": score.to_numpy(), "hits": hits.to_numpy()}, index=index)
+
+
+def _labels(values, neutral=NEUTRAL_BAND):
+    """Map scores (or 'Positive'/'Neutral'/'Negative' strings) to -1/0/1."""
+    values = pd.Series(values)
+    text = values.astype(str).str.lower()
+    numeric = pd.to_numeric(values, errors="coerce")
+    labels = np.sign(numeric).where(numeric.abs() >= neutral, 0.0)
+    labels = labels.mask(text.str.startswith("pos"), 1.0).mask(text.str.startswith("neg"), -1.0)
+    return labels.mask(text.str.startswith("neu"), 0.0)
+
+
+def tiered_sentiment(
+    texts,
+    score_escalated,
+    band=DEFAULT_BAND,
+    min_hits=DEFAULT_MIN_HITS,
+    audit_fraction=0.0,
+    random_state=0,
+):
+    """
+    Score texts locally and send only low-confidence rows to the LLM.
+
+    Args:
+        texts: Series (or list) of texts; the result keeps its index.
+        score_escalated: Callable taking a list of texts and returning a list of
+            LLM scores in [-1, 1] (label strings are mapped to -1/0/1).
+        band / min_hits: Rows with |score| < band or fewer than min_hits lexicon
+            hits are escalated.
+        audit_fraction: Share of confident rows also sent to the LLM, only to
+            measure agreement; their local score is kept.
+
+    Returns:
+        (scores, report): a float Series aligned to ``texts`` and a metrics dict.
+    """
+    texts = pd.Series(texts)
+    index, texts = texts.index, texts.reset_index(drop=True)
+
+    start = time.perf_counter()
+    local = lexicon_scores(texts)
+    local_seconds = time.perf_counter() - start
+
+    escalate = (local["score"].abs() < band) | (local["hits"] < min_hits)
+    audit = pd.Series(False, index=texts.index)
+    if audit_fraction and (~escalate).any():
+        audit_index = local.index[~escalate].to_series().sample(frac=audit_fraction, random_state=random_state)
+        audit.loc[audit_index] = True
+    to_llm = escalate | audit
+
+    start = time.perf_counter()
+    llm_values = score_escalated(texts[to_llm].fillna("").tolist()) if to_llm.any() else []
+    llm_seconds = time.perf_counter() - start
+    llm_scores = pd.Series(llm_values, index=texts.index[to_llm], dtype=object)
+    llm_numeric = pd.to_numeric(llm_scores, errors="coerce").fillna(_labels(llm_scores).where(llm_scores.notna()))
+
+    scores = local["score"].astype(float).copy()
+    scores.loc[escalate] = llm_numeric.reindex(local.index[escalate]).astype(float)
+
+    compared = llm_scores.notna()
+    local_labels = _labels(local["score"][to_llm][compared])
+    llm_labels = _labels(llm_scores[compared])
+    report = {
+        "rows": len(texts),
+        "escalated": int(escalate.sum()),
+        "escalation_rate": round(float(escalate.mean()), 3) if len(texts) else 0.0,
+        "audited": int(audit.sum()),
+        "local_seconds": round(local_seconds, 4),
+        "llm_seconds": round(llm_seconds, 2),
+        "llm_seconds_per_row": round(llm_seconds / int(to_llm.sum()), 3) if to_llm.any() else 0.0,
+        "agreement_escalated": _agreement(local_labels, llm_labels, escalate),
+        "agreement_audited": _agreement(local_labels, llm_labels, audit),
+    }
+    logging.info(f"Tiered sentiment: {report}")
+    return scores.set_axis(index), report
+
+
+def _agreement(local_labels, llm_labels, mask):
+    """Share of rows in ``mask`` where the local and LLM labels match (None if no rows)."""
+    rows = local_labels.index.intersection(mask[mask].index)
+    if rows.empty:
+        return None
+    return round(float((local_labels[rows] == llm_labels[rows]).mean()), 3)
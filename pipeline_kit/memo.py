@@ -0,0 +1,157 @@
+"""
+Persistent Value Memo
+=====================
+Entity-resolution stages ask the same question about the same handful of
+values over and over: a game has thousands of plays but only ~13 pitchers,
+~22 batters and 9 pitch types. ``MemoTable`` resolves each *distinct*
+value once and remembers the answer in a SQLite table, so later shards,
+retries and runs only pay for values they have never seen.
+
+    memo = MemoTable("pitcher", version=memo_version(pitcher_prompt, "gpt-4o"))
+    resolved = memo.resolve(df["pitcher_name"], resolve_pitchers)
+    # {"Scherzer": {"canonical_id": 28976, ...}, ...}
+
+``version`` should change whenever the answer could (prompt, reference
+list, model), so stale mappings are never reused. Only successful
+resolutions are stored; values the resolver could not map are retried
+next time.
+
+The same table works as a per-record store: keyed by a content hash
+(e.g. ``play_hash``), it holds each play's stage output so a re-run only
+sends new or changed records to the LLM.
+
+    store = MemoTable("enriched.extracted", version=memo_version(prompt, "gpt-4o"))
+    done = store.get_many(df["play_hash"])      # {play_hash: result} from earlier runs
+
+Configuration:
+- MEMO_PATH: SQLite file (default: ~/.cache/pipeline_kit/memo.sqlite)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "pipeline_kit", "memo.sqlite")
+LOOKUP_CHUNK = 500  # values per SELECT ... IN (...), under SQLite's bound-parameter limit
+
+MEMO_DDL = """
+CREATE TABLE IF NOT EXISTS value_memo (
+    namespace TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (namespace, version, value)
+);
+"""
+
+
+def memo_version(*parts):
+    """Short hash of everything the resolved answer depends on."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def distinct_values(values):
+    """Distinct non-null values in first-seen order."""
+    return list(pd.Series(values, dtype=object).dropna().drop_duplicates())
+
+
+class MemoTable:
+    """SQLite-backed {value: result} memo for one namespace and version."""
+
+    def __init__(self, namespace, version="", path=None):
+        self.namespace = namespace
+        self.version = version
+        self.path = path or os.getenv("MEMO_PATH", DEFAULT_PATH)
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        # Opened lazily so importing a DAG file never touches the disk
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(MEMO_DDL)
+        return self._conn
+
+    def get_many(self, values):
+        """Return {value: result} for the values already memoized."""
+        keys = {str(value): value for value in values}
+        found = {}
+        with self._lock:
+            # Chunked IN lookups: per-play stores ask for thousands of values at once
+            chunk = list(keys)
+            for start in range(0, len(chunk), LOOKUP_CHUNK):
+                part = chunk[start:start + LOOKUP_CHUNK]
+                rows = self.conn.execute(
+                    "SELECT value, result FROM value_memo WHERE namespace = ? AND version = ? "
+                    f"AND value IN ({', '.join('?' * len(part))})",
+                    (self.namespace, self.version, *part),
+                ).fetchall()
+                for value, result in rows:
+                    found[keys[value]] = json.loads(result)
+        return found
+
+    def set_many(self, results):
+        """Memoize {value: result}; None results are skipped."""
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO value_memo (namespace, version, value, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (self.namespace, self.version, str(value), json.dumps(result), now)
+                    for value, result in results.items() if result is not None
+                ],
+            )
+            self.conn.commit()
+
+    def resolve(self, values, resolver):
+        """
+        Resolve every distinct non-null value in ``values``, calling the resolver only for new ones.
+
+        Args:
+            resolver: Callable (list of values) -> {value: result or None}.
+
+        Returns:
+            {value: result} for every distinct value that resolved.
+        """
+        resolved, missing = self.split(values)
+        if missing:
+            fresh = resolver(missing)
+            self.set_many(fresh)
+            resolved.update({value: result for value, result in fresh.items() if result is not None})
+        return resolved
+
+    def split(self, values):
+        """Return ({value: result} already memoized, [distinct values still to resolve])."""
+        distinct = distinct_values(values)
+        memoized = self.get_many(distinct)
+        missing = [value for value in distinct if value not in memoized]
+        self.hits += len(memoized)
+        self.misses += len(missing)
+        logging.info(
+            f"Memo {self.namespace}: {len(distinct)} distinct values, "
+            f"{len(memoized)} memoized, {len(missing)} to resolve"
+        )
+        return memoized, missing
+
+    def stats(self):
+        """Return hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
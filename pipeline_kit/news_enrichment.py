@@ -0,0 +1,129 @@
+"""
+News Enrichment Schemas and Merged-Response Checks
+==================================================
+The news DAG enriches each article either in one structured LLM call
+(``llm_mode="merged"``: extraction, sentiment, topic and region together)
+or in separate extraction, sentiment and QC passes (``"staged"``). This
+module holds the schemas and system prompts for both, and checks what the
+merged call returns so that one bad field costs a targeted follow-up call
+instead of a wrong row:
+
+- ``clean_enrichment`` clamps sentiment to [-1, 1] and maps topic/region
+  onto the allowed labels (case-insensitive); anything else becomes None.
+- ``fallback_rows`` lists the rows whose fields are still None, which the
+  DAG sends through the staged sentiment or QC pass.
+
+    item = clean_enrichment(completion.choices[0].message.parsed.dict())
+    redo = fallback_rows(results, ["topic", "region"])
+
+The prompts embed each schema's JSON, so they (and the LLM cache keys
+built from them) only change when a schema does.
+"""
+
+import json
+import math
+
+from pydantic import BaseModel
+
+TOPICS = [
+    "Financial", "Operations", "Product/Technology", "Regulatory/Legal", "Market/Competition",
+    "Executive/Personnel", "Strategy/M&A", "Customers/Partnerships", "Supply Chain/Manufacturing",
+    "ESG/Sustainability", "Risk/Incidents", "Marketing/PR",
+]
+REGIONS = ["North America", "South America", "Europe", "Africa", "Middle East", "Asia", "Oceania"]
+
+
+class ExtractedArticle(BaseModel):
+    source: str
+    title: str
+    short_summary: str
+    publish_date: str
+
+
+class EnrichedArticle(ExtractedArticle):
+    sentiment: float           # -1 (very negative) to 1 (very positive)
+    topic: str                 # One of TOPICS
+    region: str                # One of REGIONS
+
+
+class QualityCategorization(BaseModel):
+    topic: str                 # One of TOPICS
+    region: str                # One of REGIONS
+
+
+EXTRACTION_PROMPT = f"""
+You are a data extraction agent. For each input article JSON, return a single object matching this schema:
+{json.dumps(ExtractedArticle.model_json_schema(), indent=2)}
+
+Use the raw JSON to guide extraction with natural language hints:
+- source: use article['source']['name'] when present.
+- title: use article['title'].
+- short_summary: 1–2 sentences summarizing the article in plain English.
+- publish_date: use article['publishedAt'] (ISO-8601 timestamp).
+
+Return exactly one object that matches the schema.
+""".strip()
+
+MERGED_PROMPT = f"""
+You are a news enrichment agent. For each input article JSON, return a single object matching this schema:
+{json.dumps(EnrichedArticle.model_json_schema(), indent=2)}
+
+Use the raw JSON to guide extraction with natural language hints:
+- source: use article['source']['name'] when present.
+- title: use article['title'].
+- short_summary: 1–2 sentences summarizing the article in plain English.
+- publish_date: use article['publishedAt'] (ISO-8601 timestamp).
+- sentiment: a numerical score of the article from -1 (very negative) to 1 (very positive).
+- topic: choose the best label from [{", ".join(TOPICS)}].
+- region: infer using language cues, source, and content (country/city mentions). Map to one of: [{", ".join(REGIONS)}].
+
+Return exactly one object that matches the schema.
+""".strip()
+
+QC_PROMPT = f"""
+You are a data quality and categorization agent. For each input article, return a single object matching this schema:
+{json.dumps(QualityCategorization.model_json_schema(), indent=2)}
+
+Instructions:
+- topic: Choose the best label from [{", ".join(TOPICS)}].
+- region: Infer using language cues, source, and content (country/city mentions). Map to one of: [{", ".join(REGIONS)}].
+- Return strictly valid JSON with exactly these keys and no extra text.
+""".strip()
+
+_TOPIC_LABELS = {label.lower(): label for label in TOPICS}
+_REGION_LABELS = {label.lower(): label for label in REGIONS}
+
+
+def _label(value, labels):
+    return labels.get(str(value).strip().lower()) if value is not None else None
+
+
+def _sentiment(value):
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return None
+    return max(-1.0, min(1.0, score)) if math.isfinite(score) else None
+
+
+def clean_enrichment(item):
+    """
+    Return ``item`` with its sentiment/topic/region fields checked.
+
+    Sentiment is clamped to [-1, 1] (None if it is not a finite number);
+    topic and region are mapped onto TOPICS / REGIONS, None when they match
+    no label. Fields the item does not have are not added.
+    """
+    item = dict(item)
+    if "sentiment" in item:
+        item["sentiment"] = _sentiment(item["sentiment"])
+    if "topic" in item:
+        item["topic"] = _label(item["topic"], _TOPIC_LABELS)
+    if "region" in item:
+        item["region"] = _label(item["region"], _REGION_LABELS)
+    return item
+
+
+def fallback_rows(items, fields):
+    """Positions of the items missing any of ``fields`` (None or absent)."""
+    return [pos for pos, item in enumerate(items) if any(item.get(field) is None for field in fields)]
@@ -0,0 +1,181 @@
+"""
+Incremental State for the News Pipeline
+=======================================
+Two small tables live next to ``news_articles`` so re-runs only pay for
+articles they have not seen before:
+
+- news_extract_watermarks: per-query ``publishedAt`` high-water mark. The
+  extractor asks NewsAPI only for articles newer than this.
+- news_article_hashes: URL and content hashes of every article already
+  loaded. Articles matching either hash are dropped before any LLM call.
+
+Both are written in the same transaction as the ``news_articles`` insert,
+so a failed load never advances the watermark. A query's watermark only
+moves when every result page was fetched, and stays below the oldest
+article that was fetched but not loaded (sampled out, or dropped after an
+LLM/QC failure), so the next run asks for those articles again.
+"""
+
+import hashlib
+import logging
+
+STATE_DDL = """
+CREATE TABLE IF NOT EXISTS news_extract_watermarks (
+    query TEXT PRIMARY KEY,
+    last_published_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE TABLE IF NOT EXISTS news_article_hashes (
+    url_hash TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    query TEXT,
+    published_at TIMESTAMPTZ,
+    loaded_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS news_article_hashes_content_idx
+    ON news_article_hashes (content_hash);
+"""
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def article_hashes(article):
+    """Return (url_hash, content_hash) for a raw NewsAPI article."""
+    content = " ".join(
+        (article.get(k) or "").strip().lower() for k in ("title", "description", "content")
+    )
+    url = article.get("url") or content  # fall back to content when a URL is missing
+    return _sha256(url), _sha256(content)
+
+
+def ensure_state_tables(conn):
+    """Create the watermark and hash tables if they do not exist yet."""
+    with conn.cursor() as cur:
+        cur.execute(STATE_DDL)
+    conn.commit()
+
+
+def get_watermarks(conn, queries):
+    """Return {query: last_published_at} for the queries that have a watermark."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT query, last_published_at FROM news_extract_watermarks WHERE query = ANY(%s)",
+            (list(queries),),
+        )
+        return {query: ts for query, ts in cur.fetchall()}
+
+
+def filter_unseen(conn, articles):
+    """
+    Drop articles already loaded (by URL or content hash) and in-batch duplicates.
+
+    Returns the surviving articles, oldest first, each tagged with
+    ``url_hash`` and ``content_hash`` for ``record_loaded``.
+    """
+    tagged = []
+    for article in articles:
+        url_hash, content_hash = article_hashes(article)
+        tagged.append({**article, "url_hash": url_hash, "content_hash": content_hash})
+
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT url_hash, content_hash FROM news_article_hashes
+            WHERE url_hash = ANY(%s) OR content_hash = ANY(%s)
+            """,
+            ([a["url_hash"] for a in tagged], [a["content_hash"] for a in tagged]),
+        )
+        seen = set()
+        for url_hash, content_hash in cur.fetchall():
+            seen.update((url_hash, content_hash))
+
+    unseen = []
+    for article in tagged:
+        if article["url_hash"] in seen or article["content_hash"] in seen:
+            continue
+        seen.update((article["url_hash"], article["content_hash"]))
+        unseen.append(article)
+
+    # Oldest first, so a capped run advances the watermark without leaving gaps
+    unseen.sort(key=lambda a: a.get("publishedAt") or "")
+    logging.info(f"Hash filter kept {len(unseen)} of {len(articles)} articles")
+    return unseen
+
+
+def _watermarks(loaded, pending=(), complete=None):
+    """
+    {query: new watermark}: the newest loaded ``publishedAt`` per query that is
+    older than every pending article of that query. Queries not in ``complete``
+    (when given) keep their current watermark.
+    """
+    oldest_pending = {}
+    for article in pending:
+        query, published_at = article.get("query"), article.get("publishedAt")
+        if query and published_at and (query not in oldest_pending or published_at < oldest_pending[query]):
+            oldest_pending[query] = published_at
+
+    latest = {}
+    for query, published_at in loaded:
+        if not query or not published_at:
+            continue
+        if complete is not None and query not in complete:
+            continue
+        if query in oldest_pending and published_at >= oldest_pending[query]:
+            continue
+        if published_at > latest.get(query, ""):
+            latest[query] = published_at
+    return latest
+
+
+def record_loaded(conn, articles, pending=(), complete=None):
+    """
+    Record hashes for loaded articles and advance each query's watermark.
+
+    Args:
+        articles: Loaded articles, with ``url_hash``/``content_hash`` from ``filter_unseen``.
+        pending: Articles fetched this run but not loaded; each query's
+            watermark stays below the oldest of them.
+        complete: Queries whose extraction fetched every page (see
+            ``newsapi.stream_articles(report=...)``); other queries keep their
+            watermark. None advances every query.
+
+    Call inside the load transaction; the caller commits.
+    """
+    rows = [
+        (a["url_hash"], a["content_hash"], a.get("query"), a.get("publishedAt"))
+        for a in articles
+        if a.get("url_hash")
+    ]
+    if not rows:
+        return
+
+    with conn.cursor() as cur:
+        cur.executemany(
+            """
+            INSERT INTO news_article_hashes (url_hash, content_hash, query, published_at)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (url_hash) DO NOTHING
+            """,
+            rows,
+        )
+
+        loaded = {url_hash for url_hash, _, _, _ in rows}
+        latest = _watermarks(
+            [(query, published_at) for _, _, query, published_at in rows],
+            [a for a in pending if a.get("url_hash") not in loaded],
+            complete,
+        )
+        cur.executemany(
+            """
+            INSERT INTO news_extract_watermarks (query, last_published_at)
+            VALUES (%s, %s)
+            ON CONFLICT (query) DO UPDATE
+            SET last_published_at = GREATEST(news_extract_watermarks.last_published_at,
+                                             EXCLUDED.last_published_at),
+                updated_at = NOW()
+            """,
+            list(latest.items()),
+        )
+    logging.info(f"Recorded {len(rows)} article hashes; advanced {len(latest)} watermarks")
@@ -0,0 +1,253 @@
+"""
+Async NewsAPI Extractor
+=======================
+Pages through the NewsAPI ``/v2/everything`` endpoint concurrently and fans
+out across many queries over one shared HTTP connection pool.
+
+Articles are yielded as they arrive instead of being collected into one
+list, and each article is tagged with the ``query`` that produced it:
+
+    async for article in stream_articles(["Tesla", "NVIDIA"], "2025-10-05", "2025-10-06"):
+        ...
+
+Synchronous callers (listings, Airflow tasks) can use ``extract_articles``.
+
+Rate limits (429) and server errors (5xx) are retried with exponential
+backoff, honouring ``Retry-After``. Any other failure (a bad API key, an
+invalid query, retries exhausted) raises ``NewsAPIError`` so the caller
+fails instead of silently returning fewer articles. Pass ``report={}`` to
+see, per query, whether every page was fetched.
+"""
+
+import asyncio
+import logging
+import math
+import os
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from pipeline_kit.aio import run_sync
+
+NEWSAPI_URL = "https://newsapi.org/v2/everything"
+MAX_PAGE_SIZE = 100        # NewsAPI hard limit per request
+DEFAULT_CONCURRENCY = 8    # Requests in flight across all queries
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 1.0      # Doubled per attempt when there is no Retry-After
+MAX_BACKOFF_SECONDS = 60.0
+
+_DONE = object()
+
+
+class NewsAPIError(RuntimeError):
+    """A NewsAPI request failed for good: bad key or query, or retries exhausted."""
+
+    def __init__(self, message, status_code=None, code=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+
+class _Failed:
+    """Queue item carrying a producer's exception to the consumer."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def _retry_delay(response, attempt):
+    """Seconds to wait before retry ``attempt``: Retry-After when given, else exponential backoff."""
+    header = response.headers.get("Retry-After") if response is not None else None
+    if header:
+        try:
+            return min(max(float(header), 0.0), MAX_BACKOFF_SECONDS)
+        except ValueError:
+            try:
+                wait = (parsedate_to_datetime(header) - datetime.now(timezone.utc)).total_seconds()
+                return min(max(wait, 0.0), MAX_BACKOFF_SECONDS)
+            except (TypeError, ValueError):
+                pass
+    return min(BACKOFF_SECONDS * 2 ** attempt, MAX_BACKOFF_SECONDS)
+
+
+def _error_code(response):
+    try:
+        body = response.json()
+    except ValueError:
+        return None, response.text[:200]
+    return body.get("code"), body.get("message")
+
+
+async def _fetch_page(client, semaphore, params, page, max_retries=MAX_RETRIES):
+    """
+    Fetch one page of results; return the JSON body, or None once the
+    plan's result cap is reached. Raises ``NewsAPIError`` on other failures.
+    """
+    for attempt in range(max_retries + 1):
+        response = None
+        try:
+            async with semaphore:
+                response = await client.get(NEWSAPI_URL, params={**params, "page": page})
+        except httpx.TransportError as e:
+            error = f"{type(e).__name__}: {e}"
+        else:
+            if response.status_code == 200:
+                return response.json()
+            code, message = _error_code(response)
+            if code == "maximumResultsReached":
+                # Developer plans stop paging after the first 100 results
+                logging.warning(f"NewsAPI result cap reached for q='{params['q']}' at page {page}")
+                return None
+            if response.status_code not in RETRY_STATUSES:
+                raise NewsAPIError(
+                    f"NewsAPI q='{params['q']}' page {page} failed with {response.status_code} ({code}): {message}",
+                    status_code=response.status_code,
+                    code=code,
+                )
+            error = f"status {response.status_code} ({code})"
+
+        if attempt == max_retries:
+            raise NewsAPIError(
+                f"NewsAPI q='{params['q']}' page {page} failed after {max_retries + 1} attempts: {error}",
+                status_code=response.status_code if response is not None else None,
+            )
+        delay = _retry_delay(response, attempt)
+        logging.warning(f"NewsAPI q='{params['q']}' page {page}: {error}; retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+async def _iter_query_pages(client, semaphore, params, max_pages=None, status=None):
+    """
+    Yield article lists for one query; pages after the first are fetched concurrently.
+
+    ``status["complete"]`` ends up True only when every result page was fetched
+    (no ``max_pages`` cut-off and no plan result cap).
+    """
+    status = {} if status is None else status
+    status["complete"] = False
+    first = await _fetch_page(client, semaphore, params, 1)
+    if first is None:
+        return
+    yield first.get("articles", [])
+
+    all_pages = math.ceil(first.get("totalResults", 0) / params["pageSize"])
+    total_pages = min(all_pages, max_pages) if max_pages else all_pages
+    capped = False
+
+    tasks = [
+        asyncio.create_task(_fetch_page(client, semaphore, params, page))
+        for page in range(2, total_pages + 1)
+    ]
+    try:
+        for next_page in asyncio.as_completed(tasks):
+            data = await next_page
+            if data is None:
+                capped = True
+                continue
+            yield data.get("articles", [])
+        status["complete"] = not capped and total_pages == all_pages
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def stream_articles(
+    queries,
+    from_date,
+    to_date,
+    api_key=None,
+    concurrency=DEFAULT_CONCURRENCY,
+    page_size=MAX_PAGE_SIZE,
+    max_pages=None,
+    since=None,
+    timeout=30.0,
+    report=None,
+    transport=None,
+):
+    """
+    Stream articles for one or many queries.
+
+    Args:
+        queries: A single query string or an iterable of queries (e.g. tickers).
+        from_date / to_date: Date or ISO-8601 timestamp bounds passed to NewsAPI.
+        api_key: NewsAPI key (defaults to the NEWS_API_KEY environment variable).
+        concurrency: Max requests in flight; also sizes the connection pool.
+        page_size: Results per page (NewsAPI caps this at 100).
+        max_pages: Optional cap on pages fetched per query.
+        since: Optional {query: timestamp} map that overrides from_date per
+            query, e.g. incremental watermarks.
+        report: Optional dict filled with {query: {"articles": n, "complete": bool}};
+            ``complete`` is False when ``max_pages`` or the plan's result cap cut
+            the query short.
+        transport: Optional httpx async transport (e.g. ``httpx.MockTransport`` in tests).
+
+    Raises:
+        NewsAPIError: A query failed for a reason other than a retried rate
+            limit or server error (e.g. 401 for a bad API key).
+    """
+    if isinstance(queries, str):
+        queries = [queries]
+    since = since or {}
+    api_key = api_key or os.getenv("NEWS_API_KEY")
+    if not api_key:
+        raise ValueError("NEWS_API_KEY environment variable is not set")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    queue = asyncio.Queue(maxsize=concurrency * MAX_PAGE_SIZE)  # bounded: producers wait on a slow consumer
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def produce(client, query):
+        params = {
+            "q": query,
+            "from": str(since.get(query, from_date)),
+            "to": str(to_date),
+            "pageSize": min(page_size, MAX_PAGE_SIZE),
+        }
+        status = {"articles": 0, "complete": False}
+        if report is not None:
+            report[query] = status
+        try:
+            async for articles in _iter_query_pages(client, semaphore, params, max_pages, status):
+                for article in articles:
+                    await queue.put({**article, "query": query})
+                    status["articles"] += 1
+            logging.info(
+                f"Successfully extracted {status['articles']} articles for q='{query}'"
+                f"{'' if status['complete'] else ' (incomplete: page cap reached)'}"
+            )
+        except Exception as e:
+            logging.error(f"Error extracting q='{query}': {e}")
+            await queue.put(_Failed(e))
+            return
+        await queue.put(_DONE)
+
+    async with httpx.AsyncClient(
+        headers={"X-Api-Key": api_key}, limits=limits, timeout=timeout, transport=transport
+    ) as client:
+        producers = [asyncio.create_task(produce(client, q)) for q in queries]
+        remaining = len(producers)
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is _DONE:
+                    remaining -= 1
+                    continue
+                if isinstance(item, _Failed):
+                    raise item.error
+                yield item
+        finally:
+            for p in producers:
+                p.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+
+
+async def collect_articles(queries, from_date, to_date, **kwargs):
+    """Drain ``stream_articles`` into a list."""
+    return [article async for article in stream_articles(queries, from_date, to_date, **kwargs)]
+
+
+def extract_articles(queries, from_date, to_date, **kwargs):
+    """Synchronous wrapper around ``collect_articles`` (safe to call from Jupyter)."""
+    return run_sync(collect_articles(queries, from_date, to_date, **kwargs))
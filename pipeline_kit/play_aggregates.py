@@ -0,0 +1,374 @@
+"""
+Incremental Play-by-Play Aggregates
+===================================
+Pitcher, batter and inning statistics built from native ``groupby``
+reductions (``size``/``sum``/``count``/``max``) and one ``value_counts``
+over the whole frame for the most frequent pitch, with no Python lambda
+per group.
+
+Every table stores *additive* measures only (a velocity sum and count
+rather than a mean, pitch counts per pitcher and type rather than a mode),
+so aggregates of different batches of plays combine with another
+``groupby().sum()``. Means and modes are derived when a table is
+finalized, at whatever level is asked for:
+
+    store = AggregateStore()
+    store.append(plays, game_id="ws2025_g7")     # aggregates only plays not stored yet
+    game = store.rollup("game")                  # {"pitcher": ..., "batter": ..., "inning": ...}
+    season = store.rollup("season")              # same tables summed over every game
+
+Layout (Parquet, one directory per table)::
+
+    {PLAY_STATS_ROOT}/{table}/game_id=.../batch=.../part-0.parquet
+
+``plays`` is the index of (play_id, play_hash, enrichment) already
+aggregated per game, where ``enrichment`` is a digest of the play's
+aggregated columns (extraction, canonical ids, excitement). It is written
+last and readers only count batches listed in it, so a batch interrupted
+half-way is ignored and rewritten under the same id next time. When a
+stored play comes back with different enrichment (a re-run extraction or
+analysis), the game's batches are replaced instead of keeping the stale
+values.
+``save_to_postgres`` mirrors a batch into ``play_stats_*`` tables.
+
+Configuration:
+- PLAY_STATS_ROOT: store location (default: {PIPELINE_ARTIFACT_ROOT}/play_stats)
+"""
+
+import hashlib
+import logging
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from psycopg import sql
+from pyarrow import fs as pafs
+
+from pipeline_kit.artifacts import artifact_root, filesystem_for
+from pipeline_kit.bulk_load import copy_frame
+
+# Table -> (grouping keys besides game_id, {measure: how it combines across batches})
+TABLES = {
+    "pitcher": (
+        ["pitcher_id", "pitcher_name"],
+        {"total_pitches": "sum", "velocity_sum": "sum", "velocity_count": "sum"},
+    ),
+    "pitch_mix": (
+        ["pitcher_id", "pitch_type"],
+        {"pitches": "sum"},
+    ),
+    "batter": (
+        ["batter_id", "batter_name"],
+        {"total_balls": "sum", "total_strikes": "sum", "balls_in_play": "sum", "plate_appearances": "sum"},
+    ),
+    "inning": (
+        ["inning_number", "inning_half"],
+        {"plays": "sum", "key_moments": "sum", "excitement_sum": "sum", "excitement_count": "sum",
+         "excitement_max": "max"},
+    ),
+}
+INDEX_TABLE = "plays"
+# Play columns the tables are built from; a change in any of them re-aggregates the game
+AGGREGATE_INPUTS = [
+    "pitcher_id", "pitcher_canonical_name", "batter_id", "batter_canonical_name", "pitch_type_canonical",
+    "pitch_velocity_mph", "post_pitch_balls", "post_pitch_strikes", "ball_in_play",
+    "inning_number", "inning_half", "key_moment", "excitement",
+]
+FLAG_INPUTS = {"ball_in_play", "key_moment"}
+TEXT_INPUTS = {"pitcher_canonical_name", "batter_canonical_name", "pitch_type_canonical", "inning_half"}
+LEVELS = {"game": ["game_id"], "season": []}
+
+PG_DDL = {
+    "pitcher": "pitcher_id BIGINT, pitcher_name TEXT, total_pitches BIGINT, "
+               "velocity_sum DOUBLE PRECISION, velocity_count BIGINT",
+    "pitch_mix": "pitcher_id BIGINT, pitch_type TEXT, pitches BIGINT",
+    "batter": "batter_id BIGINT, batter_name TEXT, total_balls BIGINT, total_strikes BIGINT, "
+              "balls_in_play BIGINT, plate_appearances BIGINT",
+    "inning": "inning_number BIGINT, inning_half TEXT, plays BIGINT, key_moments BIGINT, "
+              "excitement_sum DOUBLE PRECISION, excitement_count BIGINT, excitement_max DOUBLE PRECISION",
+}
+
+
+def _numeric(plays, column):
+    if column not in plays:
+        return pd.Series(float("nan"), index=plays.index)
+    return pd.to_numeric(plays[column], errors="coerce")
+
+
+def _flag(plays, column):
+    """Boolean column (True/False/None) as 0/1, nulls counting as 0."""
+    if column not in plays:
+        return pd.Series(0, index=plays.index)
+    return plays[column].astype("boolean").fillna(False).astype("int64")
+
+
+def enrichment_digest(plays):
+    """Per-play digest (hex string) of the ``AGGREGATE_INPUTS`` columns present in ``plays``."""
+    columns = {}
+    for column in AGGREGATE_INPUTS:
+        if column not in plays:
+            continue
+        # Normalized first, so 95 and 95.0 from differently typed checkpoints digest the same
+        if column in FLAG_INPUTS:
+            values = plays[column].astype("boolean")
+        elif column in TEXT_INPUTS:
+            values = plays[column]
+        else:
+            values = _numeric(plays, column).astype(float)
+        columns[column] = values.astype("string")
+    frame = pd.DataFrame(columns, index=plays.index)
+    return pd.util.hash_pandas_object(frame, index=False).map("{:016x}".format)
+
+
+def partial_aggregates(plays, game_id):
+    """
+    Additive aggregate tables for one batch of plays of one game.
+
+    ``plays`` needs play_id plus whichever of the extracted, canonical and
+    analysis columns are available; tables whose key columns are missing
+    come back empty.
+    """
+    plays = plays.assign(
+        game_id=game_id,
+        velocity=_numeric(plays, "pitch_velocity_mph"),
+        balls=_numeric(plays, "post_pitch_balls"),
+        strikes=_numeric(plays, "post_pitch_strikes"),
+        in_play=_flag(plays, "ball_in_play"),
+        key=_flag(plays, "key_moment"),
+        score=_numeric(plays, "excitement"),
+    ).rename(columns={
+        "pitcher_canonical_name": "pitcher_name",
+        "batter_canonical_name": "batter_name",
+        "pitch_type_canonical": "pitch_type",
+    })
+    tables = {}
+
+    keys = ["game_id", *TABLES["pitcher"][0]]
+    if set(keys) <= set(plays.columns):
+        pitchers = plays[plays["pitcher_id"].notna()]
+        tables["pitcher"] = pitchers.groupby(keys, sort=False).agg(
+            total_pitches=("play_id", "size"),
+            velocity_sum=("velocity", "sum"),
+            velocity_count=("velocity", "count"),
+        ).reset_index()
+        # Mode input: one value_counts over the whole frame instead of one per pitcher
+        tables["pitch_mix"] = pitchers.value_counts(["game_id", *TABLES["pitch_mix"][0]]).rename(
+            "pitches"
+        ).reset_index()
+
+    keys = ["game_id", *TABLES["batter"][0]]
+    if set(keys) <= set(plays.columns):
+        tables["batter"] = plays[plays["batter_id"].notna()].groupby(keys, sort=False).agg(
+            total_balls=("balls", "sum"),
+            total_strikes=("strikes", "sum"),
+            balls_in_play=("in_play", "sum"),
+            plate_appearances=("play_id", "size"),
+        ).reset_index()
+
+    keys = ["game_id", *TABLES["inning"][0]]
+    if set(keys) <= set(plays.columns):
+        tables["inning"] = plays.groupby(keys, sort=False).agg(
+            plays=("play_id", "size"),
+            key_moments=("key", "sum"),
+            excitement_sum=("score", "sum"),
+            excitement_count=("score", "count"),
+            excitement_max=("score", "max"),
+        ).reset_index()
+
+    for name, (keys, measures) in TABLES.items():
+        columns = ["game_id", *keys, *measures]
+        tables[name] = tables.get(name, pd.DataFrame(columns=columns))[columns]
+    return tables
+
+
+def combine(tables, level="game"):
+    """Sum (or max) each additive table over ``level``: "game" keeps game_id, "season" drops it."""
+    combined = {}
+    for name, (keys, measures) in TABLES.items():
+        frame = tables.get(name)
+        group = LEVELS[level] + keys
+        if frame is None or frame.empty:
+            combined[name] = pd.DataFrame(columns=[*group, *measures])
+            continue
+        combined[name] = frame.groupby(group, sort=False).agg(measures).reset_index()
+    return combined
+
+
+def finalize(tables, level="game"):
+    """
+    Report tables at ``level``, deriving means and modes from the additive measures.
+
+    Returns {"pitcher", "batter", "inning"} DataFrames; the pitcher table
+    carries avg_pitch_speed_mph and most_frequent_pitch, the inning table
+    avg_excitement.
+    """
+    combined = combine(tables, level)
+    group = LEVELS[level]
+
+    pitcher = combined["pitcher"]
+    pitcher["avg_pitch_speed_mph"] = pitcher["velocity_sum"] / pitcher["velocity_count"].where(
+        pitcher["velocity_count"] > 0
+    )
+    # Mode: highest count per pitcher (ties broken by name, so the result is stable)
+    mix = combined["pitch_mix"].sort_values(["pitches", "pitch_type"], ascending=[False, True])
+    mode = mix.drop_duplicates([*group, "pitcher_id"])[[*group, "pitcher_id", "pitch_type"]]
+    pitcher = pitcher.merge(
+        mode.rename(columns={"pitch_type": "most_frequent_pitch"}), on=[*group, "pitcher_id"], how="left"
+    )
+    pitcher = pitcher[[*group, "pitcher_id", "pitcher_name", "avg_pitch_speed_mph", "most_frequent_pitch",
+                       "total_pitches"]]
+
+    inning = combined["inning"]
+    inning["avg_excitement"] = inning["excitement_sum"] / inning["excitement_count"].where(
+        inning["excitement_count"] > 0
+    )
+    inning = inning[[*group, "inning_number", "inning_half", "plays", "key_moments", "avg_excitement",
+                     "excitement_max"]]
+    return {
+        "pitcher": pitcher.sort_values([*group, "total_pitches"], ascending=[True] * len(group) + [False],
+                                       ignore_index=True),
+        "batter": combined["batter"].sort_values([*group, "plate_appearances"],
+                                                 ascending=[True] * len(group) + [False], ignore_index=True),
+        "inning": inning.sort_values([*group, "inning_number", "inning_half"], ascending=[True] * len(group) +
+                                     [True, False], ignore_index=True),
+    }
+
+
+def _safe(part):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", str(part))
+
+
+class AggregateStore:
+    """Parquet store of additive aggregate tables, one partition per (game, batch of plays)."""
+
+    PARTITIONING = ds.partitioning(pa.schema([("game_id", pa.string()), ("batch", pa.string())]), flavor="hive")
+
+    def __init__(self, root=None):
+        self.root = (root or os.getenv("PLAY_STATS_ROOT") or f"{artifact_root().rstrip('/')}/play_stats").rstrip("/")
+        self.filesystem, self.path = filesystem_for(self.root)
+
+    def _read(self, table):
+        path = f"{self.path}/{table}"
+        if self.filesystem.get_file_info(path).type == pafs.FileType.NotFound:
+            return None
+        dataset = ds.dataset(path, filesystem=self.filesystem, format="parquet", partitioning=self.PARTITIONING)
+        return dataset.to_table().to_pandas()
+
+    def _write(self, table, frame, game_id, batch):
+        path = f"{self.path}/{table}/game_id={_safe(game_id)}/batch={batch}"
+        self.filesystem.create_dir(path, recursive=True)
+        self.filesystem.delete_dir_contents(path, missing_dir_ok=True)
+        data = pa.Table.from_pandas(frame.drop(columns=["game_id"], errors="ignore"), preserve_index=False)
+        pq.write_table(data, f"{path}/part-0.parquet", filesystem=self.filesystem)
+
+    def index(self):
+        """(game_id, batch, play_id, play_hash, enrichment) of every play already aggregated."""
+        index = self._read(INDEX_TABLE)
+        if index is None:
+            return pd.DataFrame(columns=["play_id", "play_hash", "enrichment", "game_id", "batch"])
+        return index
+
+    def append(self, plays, game_id):
+        """
+        Aggregate the plays of ``game_id`` that are not in the store yet.
+
+        Plays are identified by (play_id, play_hash), so re-running a game
+        adds nothing and a longer file for the same game adds only its new
+        plays. If a stored play comes back with different enrichment, the
+        game's batches are dropped and all of ``plays`` is aggregated again.
+        Returns (batch id, partial tables), or (None, {}) when every play
+        was already stored.
+        """
+        game_id = _safe(game_id)
+        plays = plays.assign(enrichment=enrichment_digest(plays))
+        index = self.index()
+        seen = index.loc[index["game_id"] == game_id].reindex(columns=["play_id", "play_hash", "enrichment"])
+        matched = plays.merge(seen.astype({"play_id": plays["play_id"].dtype}), on=["play_id", "play_hash"],
+                              how="left", suffixes=("", "_stored"), indicator=True)
+        stored = matched["_merge"] == "both"
+        changed = stored & (matched["enrichment"] != matched["enrichment_stored"])
+        if changed.any():
+            dropped = len(seen) - int(stored.sum())
+            logging.warning(
+                f"Aggregates for {game_id}: enrichment changed for {int(changed.sum())} stored plays; "
+                f"replacing the game's batches{f' ({dropped} stored plays not in this input are dropped)' if dropped else ''}"
+            )
+            self.drop_game(game_id)
+            fresh = plays
+        else:
+            fresh = plays[~stored.to_numpy()]
+        if fresh.empty:
+            logging.info(f"Aggregates for {game_id}: all {len(plays)} plays already stored")
+            return None, {}
+
+        # Enrichment is part of the batch id, so re-enriched plays never reuse a stale batch
+        keys = fresh["play_id"].astype(str) + ":" + fresh["play_hash"].astype(str) + ":" + fresh["enrichment"]
+        batch = hashlib.sha256("\n".join([game_id, *sorted(keys)]).encode("utf-8")).hexdigest()[:16]
+        tables = partial_aggregates(fresh, game_id)
+        for name, frame in tables.items():
+            self._write(name, frame, game_id, batch)
+        # Written last: a batch is only counted once its plays are indexed
+        self._write(INDEX_TABLE, fresh[["play_id", "play_hash", "enrichment"]], game_id, batch)
+        logging.info(f"Aggregates for {game_id}: batch {batch} with {len(fresh)} new of {len(plays)} plays")
+        return batch, tables
+
+    def batches(self, game_id):
+        """Committed batch ids of one game."""
+        index = self.index()
+        return index.loc[index["game_id"] == _safe(game_id), "batch"].unique().tolist()
+
+    def drop_game(self, game_id):
+        """Remove every stored batch of one game (e.g. before re-aggregating rebuilt stages)."""
+        for table in [*TABLES, INDEX_TABLE]:
+            path = f"{self.path}/{table}/game_id={_safe(game_id)}"
+            if self.filesystem.get_file_info(path).type != pafs.FileType.NotFound:
+                self.filesystem.delete_dir(path)
+
+    def load(self, game_ids=None):
+        """Stored additive tables (committed batches only), optionally for some games."""
+        committed = self.index()[["game_id", "batch"]].drop_duplicates()
+        if game_ids is not None:
+            committed = committed[committed["game_id"].isin([_safe(g) for g in game_ids])]
+        tables = {}
+        for name in TABLES:
+            frame = self._read(name)
+            if frame is not None:
+                frame = frame.merge(committed, on=["game_id", "batch"]).drop(columns="batch")
+            tables[name] = frame
+        return tables
+
+    def rollup(self, level="game", game_ids=None):
+        """Finalized pitcher/batter/inning tables per game ("game") or over all games ("season")."""
+        return finalize(self.load(game_ids), level)
+
+
+def save_to_postgres(conn, tables, game_id, batch, batches=None):
+    """
+    Mirror one batch of additive tables into ``play_stats_<table>`` (created if missing).
+
+    Rows of the same (game_id, batch) are replaced, so a retried task does
+    not double count. Pass ``batches`` (the game's batches still in the
+    store) to also delete rows of batches the store has since replaced.
+    The caller owns the transaction.
+    """
+    keep = [b for b in (batches or []) if b != batch]
+    with conn.cursor() as cur:
+        for name, frame in tables.items():
+            if name not in PG_DDL:
+                continue
+            table = sql.Identifier(f"play_stats_{name}")
+            cur.execute(sql.SQL(
+                "CREATE TABLE IF NOT EXISTS {} (game_id TEXT NOT NULL, batch TEXT NOT NULL, " + PG_DDL[name] + ")"
+            ).format(table))
+            if batches is None:
+                cur.execute(sql.SQL("DELETE FROM {} WHERE game_id = %s AND batch = %s").format(table),
+                            (_safe(game_id), batch))
+            else:
+                cur.execute(sql.SQL("DELETE FROM {} WHERE game_id = %s AND NOT batch = ANY(%s)").format(table),
+                            (_safe(game_id), keep))
+    for name, frame in tables.items():
+        if name in PG_DDL and not frame.empty:
+            copy_frame(conn, f"play_stats_{name}", frame.assign(game_id=_safe(game_id), batch=batch))
@@ -0,0 +1,136 @@
+"""
+Rule-Based Play-by-Play Pre-Extraction
+======================================
+Inning, half, outs, ball-strike count, score, pitch speed and pitch type
+are written in a handful of fixed phrasings ("Bottom of the third, one
+out", "the count is 0-1", "a 97-mph slider", "the home team leading
+3-0"). ``pre_extract`` pulls them out of the whole text column with
+compiled regexes (``Series.str.extract``, no Python loop per play), so the
+LLM only has to fill what the rules left null.
+
+    rules = pre_extract(df["playbyplay"])        # one row per play, RULE_FIELDS columns
+    remaining = rules.isna()                     # ask the LLM for these only
+
+Where a phrase occurs more than once, the first occurrence wins: it
+describes the situation before the pitch. Counts outside 0-3 balls /
+0-2 strikes are dropped rather than guessed.
+"""
+
+import re
+
+import pandas as pd
+
+WORD_NUMBERS = {
+    "no": 0, "nobody": 0, "none": 0, "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4,
+    "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6,
+    "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10, "eleventh": 11, "twelfth": 12,
+}
+PITCH_TYPES = [
+    "four-seam fastball", "four-seamer", "two-seam fastball", "two-seamer", "cut fastball",
+    "knuckle curveball", "knuckle curve", "knuckle-curve", "split-finger fastball", "split-finger",
+    "fastball", "sinker", "cutter", "slider", "sweeper", "curveball", "changeup", "change-up", "splitter",
+]
+
+_NUMBER = r"\d{1,2}|" + "|".join(WORD_NUMBERS)
+
+INNING_RE = re.compile(
+    r"\b(?P<half>top|bottom)\s+(?:half\s+)?of\s+the\s+"
+    r"(?P<inning>\d{1,2}(?:st|nd|rd|th)|" + "|".join(ORDINALS) + r")\b",
+    re.IGNORECASE,
+)
+OUTS_RE = re.compile(r"\b(?P<outs>no|nobody|none|zero|one|two|[012])\s+outs?\b", re.IGNORECASE)
+VELOCITY_RE = re.compile(r"\b(?P<mph>\d{2,3}(?:\.\d)?)\s*-?\s*mph\b", re.IGNORECASE)
+PITCH_TYPE_RE = re.compile(
+    r"\b(?P<pitch>" + "|".join(re.escape(p) for p in PITCH_TYPES) + r")\b", re.IGNORECASE
+)
+# Alternatives in one pattern, so the earliest count phrase in the text wins
+PRE_COUNT_RE = re.compile(
+    r"\bcount\s+(?:is\s+|at\s+|of\s+|sits\s+at\s+|stands\s+at\s+)(?:now\s+)?(?:fresh\s+at\s+)?"
+    r"(?P<b1>\d)-(?P<s1>\d)\b"
+    r"|\b(?P<b2>\d)-(?P<s2>\d)\s+count\b"
+    r"|\bcount\s+is\s+(?P<b3>no|one|two|three)\s+balls?\s+and\s+(?P<s3>no|one|two)\s+strikes?\b"
+    r"|\b(?P<full>full\s+count)\b"
+    r"|\b(?P<fresh>fresh\s+count|count\s+is\s+(?:fresh|all\s+zeroe?s))\b",
+    re.IGNORECASE,
+)
+POST_COUNT_RE = re.compile(
+    r"\b(?:count|it)\s+(?:[a-z]+\s+){0,2}?to\s+(?:a\s+)?(?P<b>\d)-(?P<s>\d)\b", re.IGNORECASE
+)
+SCORE_RE = re.compile(
+    r"\b(?P<team>home|visiting|away|visitors?)(?:\s+team)?(?:\s+(?:is|are|now|still))*\s+"
+    r"(?:(?P<lead>leading|leads|lead|ahead|trailing|trails|trail|behind)\s+(?:by\s+[a-z ]{1,25},?\s+)?(?:an?\s+)?"
+    r"(?P<x1>\d+)(?:-|\s+to\s+)(?P<y1>\d+)"
+    r"|(?:holding|holds|clings?\s+to|nursing|owns?)\s+an?\s+(?P<x2>\d+)-(?P<y2>\d+)\s+lead)"
+    r"|\btied\s+(?:up\s+)?(?:at\s+)?(?P<tie>" + _NUMBER + r")\b(?!-)"
+    r"|\btied\s+(?:at\s+)?(?P<t1>\d+)-(?P<t2>\d+)"
+    r"|\b(?P<scoreless>no\s+score|scoreless|score(?:board)?\s+(?:reads\s+|is\s+)?all\s+zeroe?s|nothing-nothing)\b",
+    re.IGNORECASE,
+)
+
+RULE_FIELDS = [
+    "inning_number", "inning_half", "outs", "score_home", "score_away",
+    "pre_pitch_balls", "pre_pitch_strikes", "post_pitch_balls", "post_pitch_strikes",
+    "pitch_type", "pitch_velocity_mph",
+]
+
+
+def _words_to_int(series):
+    """'two'/'2'/'2nd'/'second' -> 2; anything else -> <NA>."""
+    lowered = series.str.lower()
+    numbers = lowered.map(WORD_NUMBERS).fillna(lowered.map(ORDINALS))
+    digits = pd.to_numeric(lowered.str.extract(r"^(\d+)", expand=False), errors="coerce")
+    return numbers.fillna(digits).astype("Int64")
+
+
+def _count(balls, strikes):
+    """Keep only valid ball/strike counts (0-3 / 0-2)."""
+    valid = balls.between(0, 3) & strikes.between(0, 2)
+    return balls.where(valid), strikes.where(valid)
+
+
+def pre_extract(texts):
+    """Extract RULE_FIELDS from a Series of play-by-play texts; unmatched fields are <NA>."""
+    texts = pd.Series(texts, dtype=object).fillna("").astype(str)
+    out = pd.DataFrame(index=texts.index)
+
+    inning = texts.str.extract(INNING_RE)
+    out["inning_number"] = _words_to_int(inning["inning"])
+    out["inning_half"] = inning["half"].str.capitalize()
+
+    out["outs"] = _words_to_int(texts.str.extract(OUTS_RE)["outs"])
+
+    score = texts.str.extract(SCORE_RE)
+    x = _words_to_int(score["x1"].fillna(score["x2"]))
+    y = _words_to_int(score["y1"].fillna(score["y2"]))
+    high, low = x.where(x >= y, y), x.where(x < y, y)
+    leading = score["lead"].str.lower().str.match(r"lead|ahead").fillna(False) | score["x2"].notna()
+    home = score["team"].str.lower().eq("home").fillna(False)
+    home_ahead = home == leading
+    out["score_home"] = high.where(home_ahead, low)
+    out["score_away"] = low.where(home_ahead, high)
+    tie = _words_to_int(score["tie"]).fillna(_words_to_int(score["t1"]))
+    tie = tie.where(score["scoreless"].isna(), 0)
+    out["score_home"] = out["score_home"].fillna(tie)
+    out["score_away"] = out["score_away"].fillna(tie)
+
+    count = texts.str.extract(PRE_COUNT_RE)
+    balls = _words_to_int(count["b1"].fillna(count["b2"]).fillna(count["b3"]))
+    strikes = _words_to_int(count["s1"].fillna(count["s2"]).fillna(count["s3"]))
+    balls = balls.mask(count["full"].notna(), 3).mask(count["fresh"].notna(), 0)
+    strikes = strikes.mask(count["full"].notna(), 2).mask(count["fresh"].notna(), 0)
+    out["pre_pitch_balls"], out["pre_pitch_strikes"] = _count(balls, strikes)
+
+    post = texts.str.extract(POST_COUNT_RE)
+    out["post_pitch_balls"], out["post_pitch_strikes"] = _count(_words_to_int(post["b"]), _words_to_int(post["s"]))
+
+    out["pitch_type"] = texts.str.extract(PITCH_TYPE_RE)["pitch"].str.lower()
+    out["pitch_velocity_mph"] = pd.to_numeric(texts.str.extract(VELOCITY_RE)["mph"], errors="coerce").astype("Float64")
+    return out[RULE_FIELDS]
+
+
+def coverage(rules):
+    """Share of plays each rule field was filled for."""
+    return rules.notna().mean().round(3).to_dict()
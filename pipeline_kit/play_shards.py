@@ -0,0 +1,232 @@
+"""
+World Series Play Shards, Windows and Checkpoints
+=================================================
+Helpers the World Series DAG uses to name and read its per-game, per-stage
+Parquet checkpoints (see ``artifacts.py``). Each stage writes only the
+columns it adds, under a name built from the game and (for mapped stages)
+the shard:
+
+    stage = game_stage("game_7", shard_stage("extracted", 3))   # "game_7.extracted-0003"
+
+Readers join just the columns they need on ``play_id``, optionally limited
+to one shard's play range (pushed down to the Parquet row groups):
+
+    df = read_plays((plays_ref, ["play_hash", "playbyplay"]), (extracted_ref, ["pitcher_name"]),
+                    play_ids=(51, 100))
+
+``stage_checkpoint`` is ``completed_artifact`` plus the DAG's
+``{"rebuild": true}`` switch: a stage is reused only while the upstream
+writes it was built from are unchanged.
+
+The LLM stages fan out over play ranges: ``plan_game_shards`` splits one
+loaded game into ``{game_id, shard, plays, first_play_id, last_play_id}``
+dicts (the mapped tasks' kwargs), and ``merge_shard_artifacts`` reduces the
+shards' checkpoints back into one per game, ordered by play_id. Shards end
+on half-inning boundaries (the ``half_inning`` column the load stage adds
+with ``half_innings``), so a window-mode shard never cuts a half-inning in two.
+
+    shards = plan_game_shards("game_7", plays_ref, shard_size=50)
+    merged = merge_shard_artifacts(shard_refs, game_stage("game_7", "extracted"), context=context)
+
+Window-mode excitement analysis scores consecutive plays of one half-inning
+in a single call: ``half_inning_windows`` groups them (split to a token
+budget), ``window_key`` identifies a scored window for reuse, and
+``window_results`` keeps the scores the model returned for that window's
+plays.
+
+    for half_inning, window in half_inning_windows(df):
+        key = window_key(game_id, half_inning, window, hash_of)
+
+LLM results are also kept per play across runs and games in an
+``enrichment_store`` (a ``MemoTable``) keyed by ``play_hash``;
+``pending_plays`` lists the plays it cannot answer, so a re-run only sends
+new or changed text to the LLM.
+
+    store = enrichment_store("extracted", "gpt-4o", system_prompt)
+    pending = pending_plays(df["play_hash"], store.get_many(df["play_hash"].unique()), remaining)
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+
+from .artifacts import completed_artifact, read_frame, write_artifact
+from .memo import MemoTable, memo_version
+from .play_rules import pre_extract
+from .sentiment import pack_batches
+
+DEFAULT_WINDOW_TOKENS = 6000  # Input tokens per half-inning window call
+
+
+def game_stage(game_id, stage):
+    """Checkpoint name for one game's output of a stage."""
+    return f"{game_id}.{stage}"
+
+
+def shard_stage(stage, shard):
+    """Checkpoint name for one shard of a mapped stage."""
+    return f"{stage}-{shard:04d}"
+
+
+def stage_checkpoint(stage, context=None, inputs=None, rebuild=False, **uri_kwargs):
+    """This run's finished checkpoint for ``stage`` built from ``inputs``, or None (always None on rebuild)."""
+    if rebuild:
+        return None
+    return completed_artifact(stage, context=context, inputs=inputs, **uri_kwargs)
+
+
+def read_plays(*sources, play_ids=None):
+    """
+    Join ``(ref, columns)`` checkpoints on play_id, reading only the requested columns.
+
+    ``play_ids`` is an inclusive (first, last) range, e.g. one shard's plays.
+    """
+    rows = None
+    if play_ids:
+        rows = (pc.field("play_id") >= play_ids[0]) & (pc.field("play_id") <= play_ids[1])
+    df = None
+    for ref, columns in sources:
+        part = read_frame(ref, ["play_id", *columns], filter=rows)
+        df = part if df is None else df.merge(part, on="play_id", how="left")
+    return df
+
+
+def half_innings(texts):
+    """
+    Half-inning label ("1Top", "7Bottom", ...) of each play, from the regex rules.
+
+    Plays the rules miss stay with the previous play's half-inning ("" before
+    the first one), so label a whole game at once rather than one shard at a time.
+    """
+    rules = pre_extract(texts)
+    inning = rules["inning_number"].ffill().astype("string")
+    half = rules["inning_half"].ffill().astype("string")
+    return (inning + half).fillna("")
+
+
+def _runs(labels):
+    """Run number of each label: it goes up wherever the label differs from the one before."""
+    labels = pd.Series(labels, dtype=object).reset_index(drop=True)
+    return labels.ne(labels.shift()).cumsum().to_numpy()
+
+
+def _shard_ranges(play_ids, labels, size):
+    """(first, last) play_id ranges of about ``size`` plays that end where ``labels`` change."""
+    units = _runs(labels) if labels is not None else np.arange(len(play_ids))
+    ranges = []
+    for _, unit in play_ids.groupby(units, sort=False):
+        # A half-inning longer than the shard size becomes a shard of its own
+        if ranges and ranges[-1][2] + len(unit) <= size:
+            first, _, count = ranges[-1]
+            ranges[-1] = (first, unit.iloc[-1], count + len(unit))
+        else:
+            ranges.append((unit.iloc[0], unit.iloc[-1], len(unit)))
+    return [(first, last) for first, last, _ in ranges]
+
+
+def plan_game_shards(game_id, plays_ref, shard_size=None):
+    """
+    Split one loaded game into play_id ranges of about ``shard_size`` plays (None: one shard).
+
+    Shards end on half-inning boundaries when the plays have a ``half_inning``
+    column; without it they are cut every ``shard_size`` plays.
+    """
+    total = plays_ref["rows"]
+    if not total:
+        return []
+    if shard_size:
+        frame = read_frame(plays_ref, ["play_id", "half_inning"]).sort_values("play_id", ignore_index=True)
+        ranges = _shard_ranges(frame["play_id"], frame.get("half_inning"), shard_size)
+    else:
+        ranges = [(1, total)]
+    return [
+        {
+            "game_id": game_id, "shard": shard, "plays": plays_ref,
+            "first_play_id": int(first), "last_play_id": int(last),
+        }
+        for shard, (first, last) in enumerate(ranges)
+    ]
+
+
+def merge_shard_artifacts(shard_refs, stage, context=None, rebuild=False, **uri_kwargs):
+    """
+    Reduce the shard checkpoints of one game's mapped stage into one checkpoint, ordered by play_id.
+
+    The merged checkpoint is reused until any shard is rewritten.
+    """
+    inputs = {shard_stage(stage, shard): ref for shard, ref in enumerate(shard_refs)}
+    done = stage_checkpoint(stage, context=context, inputs=inputs, rebuild=rebuild, **uri_kwargs)
+    if done:
+        return done
+    df = pd.concat([read_frame(ref) for ref in shard_refs], ignore_index=True)
+    df = df.sort_values("play_id", ignore_index=True)
+    return write_artifact(df, stage, context=context, inputs=inputs, **uri_kwargs)
+
+
+def half_inning_windows(df, token_budget=DEFAULT_WINDOW_TOKENS):
+    """
+    (half-inning, [(play_id, text), ...]) pairs of consecutive plays, each split to fit the token budget.
+
+    Uses the ``half_inning`` column when ``df`` has one.
+    """
+    df = df.sort_values("play_id")
+    # The load stage's whole-game labels when present; a shard's own otherwise
+    half_inning = df["half_inning"] if "half_inning" in df else half_innings(df["playbyplay"])
+
+    windows = []
+    for _, group in df.groupby(_runs(half_inning), sort=False):
+        play_ids = group["play_id"].tolist()
+        label = half_inning.loc[group.index[0]]
+        for batch in pack_batches(group["playbyplay"].tolist(), token_budget=token_budget):
+            windows.append((label, [(play_ids[pos], text) for pos, text in batch]))
+    return windows
+
+
+def window_key(game_id, half_inning, window, hash_of):
+    """
+    Identity of one scored window, given ``hash_of`` ({play_id: play_hash}).
+
+    A play's window score depends on the plays around it, not just its text,
+    so the key covers the game, the half-inning and every play in the window.
+    """
+    payload = [game_id, half_inning, [hash_of[play_id] for play_id, _ in window]]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()[:16]
+
+
+def window_results(window, parsed):
+    """{play_id: analysis} for the ids of ``window`` the model returned, excitement clamped to 1-10."""
+    play_ids = {play_id for play_id, _ in window}
+    results = {}
+    for item in parsed.plays if parsed else []:
+        if item.play_id in play_ids:
+            results[item.play_id] = {
+                "key_moment": item.key_moment,
+                "excitement": max(1, min(10, item.excitement)),
+            }
+    return results
+
+
+def enrichment_store(stage, model, *version_parts, path=None):
+    """
+    Per-play results of a stage from earlier runs and games, keyed by play_hash or a window key.
+
+    A different model, prompt or schema (``version_parts``) starts a fresh version.
+    """
+    return MemoTable(f"enriched.{stage}", version=memo_version(model, *version_parts), path=path)
+
+
+def pending_plays(play_hashes, stored, fields=None):
+    """
+    Positions of the plays ``stored`` ({play_hash: result}) cannot answer.
+
+    With ``fields`` (one tuple of field names per play), a stored result
+    only counts if it has every field asked of that play now.
+    """
+    fields = fields if fields is not None else [()] * len(play_hashes)
+    return [
+        pos for pos, (play_hash, asked) in enumerate(zip(play_hashes, fields))
+        if play_hash not in stored or not set(asked) <= set(stored[play_hash])
+    ]
@@ -0,0 +1,94 @@
+"""
+Streaming Article Preprocessing
+===============================
+Consumes any iterator of NewsAPI article dicts (a list, a generator, ...)
+and yields fixed-size DataFrame chunks with the text already normalized by
+vectorized pandas string ops. Only one chunk is held in memory at a time,
+however many articles the extractor produces.
+
+    for chunk in iter_article_chunks(articles, chunk_size=1000):
+        chunk["sentiment"] = batch_sentiment(chunk["content"].tolist())
+        ...
+
+How many rows to process is a ``sample`` argument rather than a code edit:
+None keeps every article, an int keeps the first N, and a float in (0, 1)
+keeps that fraction at random.
+"""
+
+import logging
+import random
+from itertools import islice
+
+import pandas as pd
+
+TEXT_COLUMNS = ["title", "description", "content"]
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def take_sample(articles, sample=None, random_state=0):
+    """Lazily yield all articles, the first ``sample`` (int) or a random fraction (float)."""
+    if sample is None:
+        return iter(articles)
+    if isinstance(sample, float) and 0 < sample < 1:
+        rng = random.Random(random_state)
+        return (article for article in articles if rng.random() < sample)
+    return islice(articles, int(sample))
+
+
+def normalize_articles(frame):
+    """Clean title/description/content and build the combined ``content`` text column."""
+    text = frame.reindex(columns=TEXT_COLUMNS).fillna("").astype(str)
+    for column in TEXT_COLUMNS:
+        text[column] = text[column].str.replace(r"\s+", " ", regex=True).str.strip()
+    # NewsAPI truncates content with a "[+1234 chars]" marker
+    text["content"] = text["content"].str.replace(r"\s*\[\+\d+ chars\]$", "", regex=True)
+
+    combined = text["title"] + " " + text["description"] + " " + text["content"]
+    return frame.assign(
+        title=text["title"],
+        description=text["description"],
+        content=combined.str.replace(r"\s+", " ", regex=True).str.strip(),
+    )
+
+
+def iter_article_chunks(
+    articles,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    sample=None,
+    random_state=0,
+    columns=TEXT_COLUMNS,
+    as_arrow=False,
+):
+    """
+    Yield normalized chunks of at most ``chunk_size`` rows.
+
+    Args:
+        articles: Iterable of article dicts; consumed lazily.
+        sample: None, an int (first N articles) or a float fraction; see ``take_sample``.
+        columns: Article keys to keep; text columns are always present.
+        as_arrow: Yield ``pyarrow.RecordBatch`` instead of DataFrame chunks.
+    """
+    columns = list(dict.fromkeys([*TEXT_COLUMNS, *columns]))
+    stream = take_sample(articles, sample, random_state)
+    start = 0
+    while True:
+        records = list(islice(stream, chunk_size))
+        if not records:
+            break
+        chunk = normalize_articles(pd.DataFrame.from_records(records, columns=columns))
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        if as_arrow:
+            import pyarrow as pa
+            yield pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+        else:
+            yield chunk
+    logging.info(f"Preprocessed {start} articles in chunks of {chunk_size}")
+
+
+def preprocess_articles(articles, **kwargs):
+    """Collect ``iter_article_chunks`` into one DataFrame (for small, interactive runs)."""
+    chunks = list(iter_article_chunks(articles, **kwargs))
+    if not chunks:
+        return pd.DataFrame(columns=TEXT_COLUMNS)
+    return pd.concat(chunks)
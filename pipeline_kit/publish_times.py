@@ -0,0 +1,57 @@
+"""
+Deterministic Publish Date/Time Columns
+=======================================
+``short_date`` and the EST/PST/GMT timestamps are pure functions of
+``publish_date``, so they are computed for the whole column at once with
+``pd.to_datetime(...).dt.tz_convert`` instead of asking the LLM to do
+timezone arithmetic (and occasionally invent an offset).
+
+    enriched_df = add_publish_times(enriched_df)
+
+Values are ISO-8601 strings with an explicit offset, ready for TIMESTAMPTZ
+columns and JSON-serializable for XCom. ``short_date`` is the calendar
+date as published, in the publish_date's own offset (23:30 -04:00 stays on
+that day rather than rolling over to the UTC date). Unparseable dates
+become None.
+"""
+
+import pandas as pd
+
+TIMEZONES = {
+    "publish_est": "America/New_York",
+    "publish_pst": "America/Los_Angeles",
+    "publish_gmt": "UTC",
+}
+
+
+def _iso(timestamps):
+    """Format tz-aware timestamps as ISO-8601 with a ``+HH:MM`` offset; NaT becomes None."""
+    text = timestamps.dt.strftime("%Y-%m-%dT%H:%M:%S%z").str.replace(r"([+-]\d{2})(\d{2})$", r"\1:\2", regex=True)
+    return text.astype(object).where(timestamps.notna(), None)
+
+
+def publish_times(values):
+    """Derive short_date and the EST/PST/GMT timestamps from a Series of publish dates."""
+    values = pd.Series(values)
+    # format="ISO8601": otherwise the first row's format is inferred and other ISO shapes become NaT
+    published = pd.to_datetime(values, utc=True, errors="coerce", format="ISO8601")
+    # The date as written, before conversion to UTC; fall back to the UTC date for non-ISO text
+    local_date = values.astype("string").str.extract(r"^\s*(\d{4}-\d{2}-\d{2})", expand=False)
+    short_date = local_date.fillna(published.dt.strftime("%Y-%m-%d"))
+    columns = {"short_date": short_date.astype(object).where(published.notna(), None)}
+    for name, tz in TIMEZONES.items():
+        columns[name] = _iso(published.dt.tz_convert(tz))
+    return pd.DataFrame(columns, index=published.index)
+
+
+def add_publish_times(df, column="publish_date"):
+    """Return ``df`` with short_date, publish_est, publish_pst and publish_gmt derived from ``column``."""
+    return df.assign(**publish_times(df[column]))
+
+
+def with_publish_times(articles, column="publish_date"):
+    """``add_publish_times`` for a list of article dicts (e.g. XCom payloads); other keys are untouched."""
+    if not articles:
+        return []
+    times = publish_times([article.get(column) for article in articles]).to_dict("records")
+    return [{**article, **derived} for article, derived in zip(articles, times)]
@@ -0,0 +1,126 @@
+"""
+Versioned Schema Registry for AI-Generated DDL
+==============================================
+The load step describes its table as a ``{column: type}`` field map and
+asks an LLM for the DDL. Doing that on every run puts a blocking LLM call
+on the critical path for a schema that almost never changes.
+
+``ensure_schema`` hashes the field map and keeps every applied version in
+``schema_registry``:
+
+- hash unchanged: nothing to do, no LLM call
+- no table yet: ``generate_ddl`` produces the CREATE TABLE
+- field map changed: ``generate_migration`` produces ALTER TABLE statements
+  from the old and new maps (by default they are derived directly)
+
+    result = ensure_schema(conn, "news_articles", sample_fields, generate_ddl=ask_llm_for_ddl)
+    # {"version": 2, "action": "unchanged", ...}
+"""
+
+import hashlib
+import json
+import logging
+
+REGISTRY_DDL = """
+CREATE TABLE IF NOT EXISTS schema_registry (
+    table_name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    fields_hash TEXT NOT NULL,
+    fields JSONB NOT NULL,
+    ddl TEXT NOT NULL,
+    applied_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (table_name, version)
+);
+"""
+
+
+def fields_hash(fields):
+    """Stable hash of a {column: type} field map."""
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def migration_ddl(table, old_fields, new_fields):
+    """ALTER TABLE statements that add new columns and retype changed ones (never drops)."""
+    statements = []
+    for column, col_type in new_fields.items():
+        if column not in old_fields:
+            statements.append(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {col_type};")
+        elif old_fields[column] != col_type:
+            statements.append(
+                f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {col_type} USING {column}::{col_type};"
+            )
+    return "\n".join(statements)
+
+
+def _latest_version(cur, table):
+    cur.execute(
+        """
+        SELECT version, fields_hash, fields FROM schema_registry
+        WHERE table_name = %s ORDER BY version DESC LIMIT 1
+        """,
+        (table,),
+    )
+    return cur.fetchone()
+
+
+def _existing_columns(cur, table):
+    cur.execute(
+        "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = %s",
+        (table,),
+    )
+    return dict(cur.fetchall())
+
+
+def ensure_schema(conn, table, fields, generate_ddl, generate_migration=migration_ddl):
+    """
+    Create or migrate ``table`` to match ``fields``, calling the generators only on change.
+
+    Args:
+        generate_ddl: Callable (table, fields) -> CREATE TABLE statement.
+        generate_migration: Callable (table, old_fields, new_fields) -> ALTER TABLE statements.
+
+    Returns:
+        {table, version, fields_hash, action, ddl}; action is one of
+        "unchanged", "created", "migrated" or "registered" (an existing table
+        adopted by the registry without changes).
+    """
+    digest = fields_hash(fields)
+    with conn.cursor() as cur:
+        cur.execute(REGISTRY_DDL)
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"schema_registry:{table}",))
+
+        latest = _latest_version(cur, table)
+        if latest and latest[1] == digest:
+            conn.commit()
+            logging.info(f"Schema for {table} unchanged (version {latest[0]}); skipping DDL generation")
+            return {"table": table, "version": latest[0], "fields_hash": digest, "action": "unchanged", "ddl": None}
+
+        existing = _existing_columns(cur, table)
+        if latest:
+            old_fields = latest[2]
+        elif existing:
+            # Table predates the registry: only column names are comparable
+            old_fields = {column: fields.get(column, col_type) for column, col_type in existing.items()}
+        else:
+            old_fields = None
+
+        if old_fields is None:
+            ddl, action = generate_ddl(table, fields), "created"
+        elif any(old_fields.get(column) != col_type for column, col_type in fields.items()):
+            ddl, action = generate_migration(table, old_fields, fields), "migrated"
+        else:
+            ddl, action = "", "registered"
+
+        if ddl.strip():
+            cur.execute(ddl)
+        version = (latest[0] if latest else 0) + 1
+        cur.execute(
+            """
+            INSERT INTO schema_registry (table_name, version, fields_hash, fields, ddl)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            (table, version, digest, json.dumps(fields), ddl),
+        )
+    conn.commit()
+    logging.info(f"Schema for {table} {action} (version {version}):\n{ddl}")
+    return {"table": table, "version": version, "fields_hash": digest, "action": action, "ddl": ddl}
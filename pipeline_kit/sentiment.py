@@ -0,0 +1,124 @@
+"""
+Batched Sentiment Scoring
+=========================
+Packs many texts into one ``beta.chat.completions.parse`` call and gets
+back a structured list of ``{id, score}`` objects, instead of sending the
+full prompt and system message once per text and parsing free text.
+
+Batches are packed greedily against a token budget, so short headlines
+share a request with dozens of neighbours while long articles travel in
+smaller groups.
+
+    scores = batch_sentiment(df["content"].tolist())
+    df["sentiment"] = pd.Series(scores, index=df.index)
+"""
+
+import json
+import logging
+from typing import List
+
+from pydantic import BaseModel
+
+from pipeline_kit.concurrency import estimate_tokens
+from pipeline_kit.llm_cache import CachedOpenAI
+
+DEFAULT_TOKEN_BUDGET = 6000     # input tokens per request
+DEFAULT_MAX_BATCH_SIZE = 50     # caps output length per request
+
+
+class SentimentScore(BaseModel):
+    id: int
+    score: float               # -1 (very negative) to 1 (very positive)
+
+
+class SentimentBatch(BaseModel):
+    scores: List[SentimentScore]
+
+
+BATCH_SYSTEM_PROMPT = """
+You are a sentiment analysis agent. The user sends a JSON list of objects with
+an integer "id" and a "text". For every object, return its id and a numerical
+sentiment score from -1 (very negative) to 1 (very positive).
+
+Rules:
+- Return exactly one score per input id, using the ids as given.
+- Score each text on its own; do not let neighbouring texts influence it.
+""".strip()
+
+
+def pack_batches(texts, token_budget=DEFAULT_TOKEN_BUDGET, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+    """
+    Group texts into batches of (position, text) pairs under a token budget.
+
+    A text larger than the whole budget is truncated and sent on its own.
+    """
+    batches, current, used = [], [], 0
+    for pos, text in enumerate(texts):
+        text = "" if text is None else str(text)
+        cost = estimate_tokens(text, overhead=10)
+        if cost > token_budget:
+            text = text[: token_budget * 4]
+            cost = token_budget
+        if current and (used + cost > token_budget or len(current) >= max_batch_size):
+            batches.append(current)
+            current, used = [], 0
+        current.append((pos, text))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def score_batch(batch, llm=None, model="gpt-4o"):
+    """Score one packed batch; return {position: score} for the ids the model returned."""
+    llm = llm or CachedOpenAI()
+    payload = [{"id": i, "text": text} for i, (_, text) in enumerate(batch)]
+    completion = llm.beta.chat.completions.parse(
+        model=model,
+        messages=[
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
+        ],
+        response_format=SentimentBatch,
+        temperature=0.3
+    )
+    parsed = completion.choices[0].message.parsed
+    scores = {}
+    for item in parsed.scores if parsed else []:
+        if 0 <= item.id < len(batch):
+            scores[batch[item.id][0]] = max(-1.0, min(1.0, item.score))
+    return scores
+
+
+def batch_sentiment(
+    texts,
+    llm=None,
+    model="gpt-4o",
+    token_budget=DEFAULT_TOKEN_BUDGET,
+    max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+):
+    """
+    Score every text with as few requests as the token budget allows.
+
+    Returns a list aligned with ``texts``; rows the model skipped or batches
+    that failed come back as None.
+    """
+    texts = list(texts)
+    llm = llm or CachedOpenAI()
+    results = [None] * len(texts)
+    batches = pack_batches(texts, token_budget, max_batch_size)
+
+    for n, batch in enumerate(batches, start=1):
+        try:
+            scores = score_batch(batch, llm=llm, model=model)
+        except Exception as e:
+            logging.error(f"Error scoring sentiment batch {n}/{len(batches)}: {e}")
+            continue
+        for pos, score in scores.items():
+            results[pos] = score
+        missing = len(batch) - len(scores)
+        if missing:
+            logging.warning(f"Batch {n}/{len(batches)}: model skipped {missing} of {len(batch)} ids")
+
+    logging.info(f"Scored {len(texts)} texts in {len(batches)} requests")
+    return results
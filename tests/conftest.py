@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+# Listings import pipeline_kit from the repo root; do the same for the tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+class FakeCopy:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_types(self, types):
+        pass
+
+    def write_row(self, row):
+        self.conn.copied.append(row)
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = conn.rowcount
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        if hasattr(query, "as_string"):  # psycopg.sql.Composed
+            query = query.as_string(None)
+        self.conn.executed.append((query, params))
+
+    def executemany(self, query, rows):
+        self.conn.executed.append((query, list(rows)))
+
+    def fetchone(self):
+        return self.conn.one
+
+    def fetchall(self):
+        return list(self.conn.rows)
+
+    def copy(self, statement):
+        self.execute(statement)
+        return FakeCopy(self.conn)
+
+
+class FakeConnection:
+    """psycopg connection stand-in: records statements and answers every fetch with the canned ``one``/``rows``."""
+
+    def __init__(self, one=None, rows=(), rowcount=-1, autocommit=False):
+        self.one = one
+        self.rows = list(rows)
+        self.rowcount = rowcount
+        self.autocommit = autocommit
+        self.executed = []
+        self.copied = []
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def statements(self, prefix=""):
+        """(query, params) of the executed statements starting with ``prefix``."""
+        return [(query, params) for query, params in self.executed if query.strip().startswith(prefix)]
+
+
+@pytest.fixture
+def fake_connection():
+    """The FakeConnection class: ``conn = fake_connection(rows=[...])``."""
+    return FakeConnection
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from pipeline_kit.aio import run_sync
+
+
+async def answer():
+    await asyncio.sleep(0)
+    return 42
+
+
+async def fail():
+    raise ValueError("boom")
+
+
+def test_runs_without_an_event_loop():
+    assert run_sync(answer()) == 42
+
+
+def test_runs_inside_a_running_loop_like_jupyter():
+    async def notebook_cell():
+        return run_sync(answer())
+
+    assert asyncio.run(notebook_cell()) == 42
+
+
+def test_errors_reach_the_caller_from_the_worker_thread():
+    async def notebook_cell():
+        return run_sync(fail())
+
+    with pytest.raises(ValueError, match="boom"):
+        asyncio.run(notebook_cell())
@@ -0,0 +1,56 @@
+import pyarrow.compute as pc
+
+from pipeline_kit.artifacts import artifact_uri, completed_artifact, read_frame, read_records, write_artifact
+
+ROWS = [
+    {"query": "Tesla", "title": "A", "rank": 1},
+    {"query": "NVIDIA", "title": "B", "rank": 2},
+    {"query": "Tesla", "title": "C", "rank": 3},
+]
+
+
+def test_uri_is_root_dag_run_stage_with_unsafe_characters_replaced(tmp_path):
+    uri = artifact_uri("extract", dag_id="news", run_id="manual__2025-10-05T12:00:00+00:00", root=str(tmp_path))
+    assert uri == f"{tmp_path}/news/manual__2025-10-05T12_00_00_00_00/extract"
+
+
+def test_round_trip_projects_and_filters(tmp_path):
+    ref = write_artifact(ROWS, "extract", root=str(tmp_path), chunk_rows=2)
+    assert ref["rows"] == 3 and ref["columns"] == ["query", "title", "rank"]
+    assert sorted(r["title"] for r in read_records(ref, columns=["title", "missing"])) == ["A", "B", "C"]
+    assert read_records(ref, columns=["title"], filter=pc.field("rank") >= 2) in (
+        [{"title": "B"}, {"title": "C"}], [{"title": "C"}, {"title": "B"}],
+    )
+
+
+def test_partitioned_write_reads_back_every_row(tmp_path):
+    ref = write_artifact(ROWS, "extract", root=str(tmp_path), partition_cols=["query"])
+    frame = read_frame(ref).sort_values("rank")
+    assert frame["title"].tolist() == ["A", "B", "C"]
+    assert frame["query"].astype(str).tolist() == ["Tesla", "NVIDIA", "Tesla"]
+
+
+def test_rewrite_replaces_previous_output(tmp_path):
+    write_artifact(ROWS, "extract", root=str(tmp_path))
+    ref = write_artifact(ROWS[:1], "extract", root=str(tmp_path))
+    assert read_records(ref) == [ROWS[0]]
+
+
+def test_empty_stage_reads_back_as_empty(tmp_path):
+    ref = write_artifact([], "extract", root=str(tmp_path))
+    assert ref["rows"] == 0
+    assert read_records(ref, columns=["title"]) == []
+    assert completed_artifact("extract", root=str(tmp_path))["rows"] == 0
+
+
+def test_checkpoint_only_counts_for_the_same_inputs(tmp_path):
+    root = str(tmp_path)
+    assert completed_artifact("transform", root=root) is None
+
+    load = write_artifact(ROWS, "load", root=root)
+    ref = write_artifact(ROWS, "transform", root=root, inputs={"load": load})
+    assert completed_artifact("transform", root=root, inputs={"load": load}) == ref
+    assert completed_artifact("transform", root=root) == ref
+
+    reloaded = write_artifact(ROWS, "load", root=root)
+    assert completed_artifact("transform", root=root, inputs={"load": reloaded}) is None
@@ -0,0 +1,126 @@
+import json
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+from pydantic import BaseModel
+
+from pipeline_kit.batch_api import chat_request, parse_results, response_format_param, run_batch
+from pipeline_kit.llm_cache import CachedOpenAI, ResponseCache
+
+
+class PlayAnalysis(BaseModel):
+    key_moment: bool
+    excitement: int
+
+
+def completion(content):
+    return {
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content, "refusal": None}}],
+    }
+
+
+class FakeBatchAPI:
+    """Just enough of /files and /batches for one job: created, polled once in progress, then completed."""
+
+    def __init__(self):
+        self.uploaded = []
+        self.polls = 0
+
+    def batch(self, status):
+        return {
+            "id": "batch-1", "object": "batch", "endpoint": "/v1/chat/completions", "completion_window": "24h",
+            "created_at": 0, "input_file_id": "file-in", "status": status,
+            "output_file_id": "file-out" if status == "completed" else None,
+            "request_counts": {"total": len(self.uploaded), "completed": 0, "failed": 0},
+        }
+
+    def __call__(self, request):
+        path = request.url.path
+        if request.method == "POST" and path == "/v1/files":
+            body = request.content.decode("utf-8", errors="replace")
+            self.uploaded = [json.loads(line) for line in body.splitlines() if line.startswith('{"custom_id"')]
+            return httpx.Response(200, json={"id": "file-in", "object": "file", "bytes": len(body), "created_at": 0,
+                                             "filename": "batch.jsonl", "purpose": "batch", "status": "processed"})
+        if request.method == "POST" and path == "/v1/batches":
+            return httpx.Response(200, json=self.batch("validating"))
+        if request.method == "GET" and path == "/v1/batches/batch-1":
+            self.polls += 1
+            return httpx.Response(200, json=self.batch("in_progress" if self.polls == 1 else "completed"))
+        if request.method == "GET" and path == "/v1/files/file-out/content":
+            lines = [
+                json.dumps({"custom_id": line["custom_id"], "response": {
+                    "status_code": 200, "body": completion(json.dumps({"key_moment": True, "excitement": 8})),
+                }})
+                for line in self.uploaded
+            ]
+            return httpx.Response(200, text="\n".join(lines))
+        return httpx.Response(404, json={"error": {"message": f"unexpected {request.method} {path}"}})
+
+
+@pytest.fixture
+def api():
+    return FakeBatchAPI()
+
+
+@pytest.fixture
+def client(api):
+    return openai.OpenAI(api_key="test", base_url="http://batch.test/v1",
+                         http_client=httpx.Client(transport=httpx.MockTransport(api)))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(path=str(tmp_path / "llm_cache.sqlite"))
+
+
+def messages(text):
+    return [{"role": "system", "content": "Rate the play."}, {"role": "user", "content": text}]
+
+
+def test_response_format_is_strict_json_schema():
+    param = response_format_param(PlayAnalysis)
+    schema = param["json_schema"]["schema"]
+    assert param["type"] == "json_schema" and param["json_schema"]["strict"] is True
+    assert schema["additionalProperties"] is False
+    assert schema["required"] == ["key_moment", "excitement"]
+
+
+def test_create_poll_download(api, client, cache):
+    requests = [chat_request(f"p{i}", "gpt-4o", messages(f"play {i}"), PlayAnalysis) for i in range(3)]
+    parsed = parse_results(run_batch(requests, client=client, poll_interval=0, cache=cache), PlayAnalysis)
+    assert parsed == {f"p{i}": PlayAnalysis(key_moment=True, excitement=8) for i in range(3)}
+    assert api.polls == 2
+    # Only the Batch API fields are uploaded
+    assert [sorted(line) for line in api.uploaded] == [["body", "custom_id", "method", "url"]] * 3
+
+
+def test_cached_requests_are_not_uploaded(api, client, cache):
+    run_batch([chat_request("p0", "gpt-4o", messages("play 0"), PlayAnalysis)], client=client, poll_interval=0,
+              cache=cache)
+    api.polls = 0
+    requests = [chat_request(f"p{i}", "gpt-4o", messages(f"play {i}"), PlayAnalysis) for i in range(2)]
+    results = run_batch(requests, client=client, poll_interval=0, cache=cache)
+    assert set(results) == {"p0", "p1"}
+    assert [line["custom_id"] for line in api.uploaded] == ["p1"]
+
+    api.uploaded, api.polls = [], 0
+    run_batch(requests, client=client, poll_interval=0, cache=cache)
+    assert api.polls == 0
+
+
+def test_batch_results_answer_the_sync_client(client, cache):
+    run_batch([chat_request("p0", "gpt-4o", messages("play 0"), PlayAnalysis)], client=client, poll_interval=0,
+              cache=cache)
+
+    def no_api(**kwargs):
+        raise AssertionError("the sync call should have been a cache hit")
+
+    no_client = SimpleNamespace(beta=SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(parse=no_api))))
+    llm = CachedOpenAI(client=no_client, cache=cache)
+    completion = llm.beta.chat.completions.parse(model="gpt-4o", messages=messages("play 0"),
+                                                 response_format=PlayAnalysis)
+    assert completion.choices[0].message.parsed == PlayAnalysis(key_moment=True, excitement=8)
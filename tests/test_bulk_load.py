@@ -0,0 +1,65 @@
+from datetime import date, datetime, timezone
+
+import pandas as pd
+import pytest
+
+from pipeline_kit.bulk_load import _bool, _date, _timestamp, _timestamptz, upsert_frame
+
+MIXED_ISO = pd.Series([
+    "2025-10-05T12:00:00Z",
+    "2025-10-05T13:45:10.123Z",
+    "2025-10-05 08:00:00 -04:00",
+    "2025-10-06",
+    None,
+])
+
+
+def test_timestamptz_parses_every_iso_form():
+    values = _timestamptz(MIXED_ISO)
+    assert list(values) == [
+        datetime(2025, 10, 5, 12, 0, tzinfo=timezone.utc),
+        datetime(2025, 10, 5, 13, 45, 10, 123000, tzinfo=timezone.utc),
+        datetime(2025, 10, 5, 12, 0, tzinfo=timezone.utc),
+        datetime(2025, 10, 6, tzinfo=timezone.utc),
+        None,
+    ]
+
+
+def test_timestamp_and_date_share_the_parser():
+    assert _timestamp(MIXED_ISO)[1] == datetime(2025, 10, 5, 13, 45, 10, 123000)
+    assert list(_date(MIXED_ISO)) == [date(2025, 10, 5)] * 3 + [date(2025, 10, 6), None]
+
+
+def test_unparseable_timestamp_raises():
+    with pytest.raises(ValueError, match="not a date"):
+        _timestamptz(pd.Series(["2025-10-05T12:00:00Z", "not a date"]))
+
+
+def test_bool_maps_spellings_explicitly():
+    series = pd.Series(["true", "false", "t", "f", "1", "0", True, False, 1, 0, None])
+    assert list(_bool(series)) == [True, False] * 5 + [None]
+
+
+def test_bool_rejects_unknown_values():
+    with pytest.raises(ValueError, match="maybe"):
+        _bool(pd.Series(["true", "maybe"]))
+
+
+def test_upsert_stages_in_a_session_temp_table(fake_connection):
+    conn = fake_connection(rows=[("url_hash", "text"), ("title", "text")], rowcount=2)
+    data = [{"url_hash": "a", "title": "old"}, {"url_hash": "b", "title": "B"}, {"url_hash": "a", "title": "new"}]
+    stats = upsert_frame(conn, "public.news_articles", data, key="url_hash")
+    drop, create, _, copy, merge = [query for query, _ in conn.executed]
+    assert drop == 'DROP TABLE IF EXISTS "pg_temp"."news_articles_staging"'
+    assert create.startswith('CREATE TEMP TABLE "news_articles_staging" ON COMMIT DROP AS SELECT')
+    assert create.endswith('FROM "public"."news_articles" WITH NO DATA')
+    assert copy.startswith('COPY "pg_temp"."news_articles_staging"')
+    assert merge.startswith('INSERT INTO "public"."news_articles"')
+    # Duplicate keys keep their last row
+    assert conn.copied == [("b", "B"), ("a", "new")]
+    assert stats["merged"] == 2
+
+
+def test_upsert_refuses_autocommit(fake_connection):
+    with pytest.raises(ValueError, match="transaction"):
+        upsert_frame(fake_connection(autocommit=True), "news_articles", [{"url_hash": "a"}], key="url_hash")
@@ -0,0 +1,50 @@
+from pipeline_kit.canonical_match import CanonicalMatcher, normalize_name
+
+PITCHERS = {
+    28976: "Max Scherzer",
+    66019: "Shohei Ohtani",
+    60001: "Teoscar Hernandez",
+    60002: "Felix Hernandez",
+    60003: "Vladimir Guerrero Jr.",
+}
+PITCHES = {"FF": "Four-Seam Fastball", "SL": "Slider", "CU": "Curveball"}
+
+
+def test_normalize_strips_accents_punctuation_and_suffixes():
+    assert normalize_name("  Vladimir GUERRERO, Jr. ") == "vladimir guerrero"
+    assert normalize_name("Teóscar Hernández") == "teoscar hernandez"
+
+
+def test_exact_alias_and_code_matches_are_high_confidence():
+    matcher = CanonicalMatcher(PITCHES, aliases={"heater": "FF", "sweeper": "ST"})
+    assert matcher.match("slider") == {"key": "SL", "name": "Slider", "confidence": "high", "method": "exact", "score": 100.0}
+    assert matcher.match("ff")["key"] == "FF"
+    assert matcher.match("Heater")["method"] == "alias"
+    assert "sweeper" not in matcher.aliases  # alias pointing outside the reference
+
+
+def test_unique_last_names_match_and_shared_ones_need_an_initial():
+    matcher = CanonicalMatcher(PITCHERS, last_names=True)
+    assert matcher.match("Ohtani")["key"] == 66019
+    assert matcher.match("Ohtani")["confidence"] == "medium"
+    assert matcher.match("Hernandez") is None
+    assert matcher.match("T. Hernandez")["key"] == 60001
+    assert matcher.match("vlad guerrero")["key"] == 60003
+
+
+def test_fuzzy_match_needs_cutoff_and_margin():
+    matcher = CanonicalMatcher(PITCHERS)
+    fuzzy = matcher.match("Max Scherzr")
+    assert fuzzy["key"] == 28976 and fuzzy["method"] == "fuzzy"
+    assert matcher.match("Hernandes") is None  # two Hernandez names score alike
+    assert matcher.match("Someone Else") is None
+
+
+def test_match_many_skips_nulls_and_repeats_and_counts_escalations():
+    matcher = CanonicalMatcher(PITCHERS, last_names=True)
+    matches = matcher.match_many(["Max Scherzer", None, float("nan"), "Max Scherzer", "Hernandez", ""])
+    assert list(matches) == ["Max Scherzer", "Hernandez", ""]
+    assert matches["Hernandez"] is None and matches[""] is None
+    stats = matcher.stats()
+    assert stats["values"] == 3 and stats["exact"] == 1 and stats["escalated"] == 2
+    assert stats["escalation_rate"] == 0.667
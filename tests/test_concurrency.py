@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+
+from pipeline_kit.concurrency import RateLimiter, estimate_tokens, map_concurrent
+
+
+def test_results_keep_input_order_and_failures_become_none():
+    def slow_square(x):
+        time.sleep(0.01 * (5 - x))  # later items finish first
+        if x == 3:
+            raise ValueError("boom")
+        return x * x
+
+    assert map_concurrent(slow_square, range(5), max_in_flight=5) == [0, 1, 4, None, 16]
+
+
+def test_in_flight_calls_are_capped():
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work(x):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return x
+
+    assert map_concurrent(work, range(12), max_in_flight=3) == list(range(12))
+    assert peak == 3
+
+
+def test_rate_limiter_waits_once_the_bucket_is_empty(monkeypatch):
+    waits = []
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+        limiter.updated -= seconds  # time passes without the test waiting for it
+
+    async def take(n):
+        for _ in range(n):
+            await limiter.acquire()
+
+    limiter = RateLimiter(per_minute=60)
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    asyncio.run(take(61))
+    assert len(waits) == 1 and abs(waits[0] - 1.0) < 0.05
+
+
+def test_oversized_requests_still_pass():
+    limiter = RateLimiter(per_minute=100)
+    asyncio.run(limiter.acquire(1000))
+    assert limiter.available == 0
+
+
+def test_estimate_tokens_is_four_characters_per_token_plus_overhead():
+    assert estimate_tokens("x" * 400) == 200
+    assert estimate_tokens("x" * 400, overhead=0) == 100
@@ -0,0 +1,69 @@
+import logging
+
+import pytest
+
+from pipeline_kit import db
+
+
+class FakePool:
+    def __init__(self, kwargs, **options):
+        self.kwargs = kwargs
+        self.options = options
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(db, "ConnectionPool", FakePool)
+    monkeypatch.setattr(db, "_pools", {})
+    monkeypatch.setattr(db, "_stats", {})
+    for name in ("PGHOST", "PGPORT", "PGDATABASE", "PGUSER", "PGPASSWORD", "PG_PREPARE_THRESHOLD", "PG_SLOW_STATEMENT_MS"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_conninfo_reads_env_and_overrides(monkeypatch):
+    monkeypatch.setenv("PGHOST", "db.internal")
+    params = db.conninfo_from_env(dbname="other")
+    assert params["host"] == "db.internal" and params["dbname"] == "other" and params["user"] == "news_user"
+
+
+def test_one_pool_per_parameter_set():
+    pool = db.get_pool()
+    assert db.get_pool() is pool
+    assert db.get_pool(dbname="other") is not pool
+    assert pool.kwargs["cursor_factory"] is db.TimedCursor
+    assert "prepare_threshold" not in pool.kwargs  # psycopg's default
+
+
+def test_prepare_threshold_can_be_set_or_disabled(monkeypatch):
+    monkeypatch.setenv("PG_PREPARE_THRESHOLD", "none")
+    assert db.get_pool().kwargs["prepare_threshold"] is None
+    monkeypatch.setenv("PG_PREPARE_THRESHOLD", "2")
+    assert db.get_pool(dbname="other").kwargs["prepare_threshold"] == 2
+
+
+def test_close_pools_closes_and_forgets_them():
+    pool = db.get_pool()
+    db.close_pools()
+    assert pool.closed and db.get_pool() is not pool
+
+
+def test_statement_stats_group_by_normalized_text_slowest_first():
+    db._record("SELECT 1\n  FROM t", 0.002)
+    db._record("SELECT  1 FROM t", 0.004)
+    db._record("UPDATE t SET x = 1", 0.010)
+    assert db.statement_stats() == {
+        "UPDATE t SET x = 1": {"calls": 1, "total_ms": 10.0, "mean_ms": 10.0},
+        "SELECT 1 FROM t": {"calls": 2, "total_ms": 6.0, "mean_ms": 3.0},
+    }
+
+
+def test_slow_statements_are_logged(monkeypatch, caplog):
+    monkeypatch.setenv("PG_SLOW_STATEMENT_MS", "5")
+    with caplog.at_level(logging.WARNING):
+        db._record("SELECT fast", 0.001)
+        db._record("SELECT slow", 0.006)
+    assert [record.getMessage() for record in caplog.records] == ["Slow statement (6 ms): SELECT slow"]
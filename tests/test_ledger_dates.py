@@ -0,0 +1,57 @@
+import pandas as pd
+from pandas.tseries.holiday import USFederalHolidayCalendar
+from pandas.tseries.offsets import BDay
+
+from pipeline_kit.ledger_dates import add_ledger_dates, business_due_dates, fiscal_quarters, term_days
+
+
+def test_term_days_parses_spellings_and_leaves_the_rest_na():
+    days = term_days(["NET30", "net 45", "Net-60", "COD", None, "NET30"])
+    assert days.tolist()[:3] == [30, 45, 60]
+    assert days.iloc[3:5].isna().all() and days.iloc[5] == 30
+
+
+def test_due_dates_match_bday_without_holidays():
+    dates = pd.Series(pd.to_datetime(["2025-10-03 09:30", "2025-10-04 15:00", "2025-10-05 00:00", "2025-12-29 00:00"]))
+    days = pd.Series([1, 1, 10, 30])
+    expected = [date + BDay(n) for date, n in zip(dates, days)]
+    assert business_due_dates(dates, days).tolist() == expected
+
+
+def test_zero_day_terms_roll_forward_like_bday():
+    dates = pd.Series(pd.to_datetime(["2025-01-05 08:00", "2025-01-06 08:00", "2025-01-04 00:00"]))
+    days = pd.Series([0, 0, 0])
+    expected = [date + BDay(0) for date in dates]
+    assert business_due_dates(dates, days).tolist() == expected
+    assert business_due_dates(dates, days).iloc[0] == pd.Timestamp("2025-01-06 08:00")
+
+
+def test_zero_day_terms_on_a_holiday_roll_to_the_next_business_day():
+    due = business_due_dates(pd.Series([pd.Timestamp("2025-07-04 10:00")]), [0], holidays=USFederalHolidayCalendar())
+    assert due.iloc[0] == pd.Timestamp("2025-07-07 10:00")
+
+
+def test_due_dates_keep_timezone_and_skip_holidays():
+    dates = pd.Series([pd.Timestamp("2025-11-26 17:00", tz="America/New_York")])
+    due = business_due_dates(dates, [1], holidays=USFederalHolidayCalendar())
+    assert due.iloc[0] == pd.Timestamp("2025-11-28 17:00", tz="America/New_York")  # past Thanksgiving
+
+
+def test_unparseable_dates_or_terms_give_nat():
+    due = business_due_dates(pd.Series(["2025-10-01", "not a date", "2025-10-01"]), pd.array([5, 5, None], dtype="Int64"))
+    assert due.iloc[0] == pd.Timestamp("2025-10-08")
+    assert due.iloc[1:].isna().all()
+
+
+def test_fiscal_quarters_start_in_february():
+    quarters = fiscal_quarters(["2025-01-15", "2025-02-01", "2025-05-31", "2025-11-30", None])
+    assert quarters.tolist() == ["Q4", "Q1", "Q2", "Q4", None]
+    assert fiscal_quarters(["2025-01-15"], start_month=1).tolist() == ["Q1"]
+
+
+def test_add_ledger_dates_derives_both_columns():
+    ledger = pd.DataFrame({"transaction_date": ["2025-10-03"], "terms": ["NET 1"]})
+    result = add_ledger_dates(ledger)
+    assert result["due_date"].iloc[0] == pd.Timestamp("2025-10-06")
+    assert result["fiscal_quarter"].iloc[0] == "Q3"
+    assert "due_date" not in ledger
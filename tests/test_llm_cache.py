@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import pytest
+from openai.types.chat import ChatCompletion, ParsedChatCompletion
+from pydantic import BaseModel
+
+from pipeline_kit.llm_cache import CachedOpenAI, ResponseCache, request_key
+
+
+class Sentiment(BaseModel):
+    score: float
+
+
+def completion(content, refusal=None, response_format=None):
+    message = {"role": "assistant", "content": content, "refusal": refusal}
+    model = ChatCompletion
+    if response_format:  # the real parse() returns the validated object alongside the text
+        message["parsed"] = response_format.model_validate_json(content)
+        model = ParsedChatCompletion[response_format]
+    return model.model_validate({
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": message}],
+    })
+
+
+class FakeClient:
+    def __init__(self, content='{"score": 0.5}', refusal=None):
+        self.calls = []
+        self.content = content
+        self.refusal = refusal
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.call))
+        self.beta = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(parse=self.call)))
+
+    def call(self, **kwargs):
+        self.calls.append(kwargs)
+        return completion(self.content, self.refusal, kwargs.get("response_format"))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(path=str(tmp_path / "llm_cache.sqlite"))
+
+
+def messages(text):
+    return [{"role": "system", "content": "Score sentiment."}, {"role": "user", "content": text}]
+
+
+def test_request_key_covers_endpoint_messages_schema_and_parameters():
+    key = request_key("create", model="gpt-4o", messages=messages("up"), temperature=0.3)
+    assert key == request_key("create", temperature=0.3, messages=messages("up"), model="gpt-4o")
+    assert key != request_key("parse", model="gpt-4o", messages=messages("up"), temperature=0.3)
+    assert key != request_key("create", model="gpt-4o", messages=messages("down"), temperature=0.3)
+    assert key != request_key("create", model="gpt-4o", messages=messages("up"), temperature=0.7)
+
+    class Other(BaseModel):
+        score: int
+
+    assert request_key("parse", response_format=Sentiment) != request_key("parse", response_format=Other)
+
+
+def test_identical_requests_are_answered_from_disk(cache):
+    client = FakeClient(content="0.5")
+    llm = CachedOpenAI(client=client, cache=cache)
+    first = llm.chat.completions.create(model="gpt-4o", messages=messages("up"))
+    second = llm.chat.completions.create(model="gpt-4o", messages=messages("up"))
+    assert len(client.calls) == 1
+    assert second.choices[0].message.content == first.choices[0].message.content == "0.5"
+    assert cache.stats()["hits"] == 1 and cache.stats()["entries"] == 1
+
+
+def test_parse_hits_restore_the_parsed_model(cache):
+    client = FakeClient()
+    CachedOpenAI(client=client, cache=cache).beta.chat.completions.parse(
+        model="gpt-4o", messages=messages("up"), response_format=Sentiment
+    )
+    hit = CachedOpenAI(client=FakeClient(content='{"score": -1}'), cache=cache).beta.chat.completions.parse(
+        model="gpt-4o", messages=messages("up"), response_format=Sentiment
+    )
+    assert hit.choices[0].message.parsed == Sentiment(score=0.5)
+    assert len(client.calls) == 1
+
+
+def test_refusals_and_streams_are_not_cached(cache):
+    client = FakeClient(content=None, refusal="no")
+    llm = CachedOpenAI(client=client, cache=cache)
+    llm.chat.completions.create(model="gpt-4o", messages=messages("up"))
+    llm.chat.completions.create(model="gpt-4o", messages=messages("up"))
+    llm.chat.completions.create(model="gpt-4o", messages=messages("up"), stream=True)
+    assert len(client.calls) == 3
+    assert cache.stats()["entries"] == 0
+
+
+def test_expired_entries_are_refetched(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "llm_cache.sqlite"), ttl_seconds=1e-9)
+    cache.set("k", "v")
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_over_max_size(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "llm_cache.sqlite"), max_mb=10 / (1024 * 1024))
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    assert cache.get("a") == "aaaa"  # a is now the most recently used
+    cache.set("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa" and cache.get("c") == "cccc"
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from pipeline_kit.local_sentiment import lexicon_scores, tiered_sentiment
+
+
+def test_lexicon_scores_count_hits_and_flip_negated_terms():
+    scores = lexicon_scores(pd.Series(
+        ["Shares surge after profits beat estimates", "Revenue did not gain", "Quarterly call today", None],
+        index=[10, 11, 12, 13],
+    ))
+    assert list(scores.index) == [10, 11, 12, 13]
+    assert scores["hits"].tolist() == [3, 1, 0, 0]
+    assert scores.loc[10, "score"] > 0.8
+    assert scores.loc[11, "score"] < 0
+    assert scores.loc[12, "score"] == 0.0 and scores.loc[13, "score"] == 0.0
+
+
+def test_only_low_confidence_rows_reach_the_llm():
+    texts = pd.Series(
+        ["Shares surge after profits beat estimates", "Quarterly call today", "Stock plunges as losses mount, fraud probe"],
+        index=["a", "b", "c"],
+    )
+    sent = []
+
+    def llm(batch):
+        sent.extend(batch)
+        return ["Neutral"]
+
+    scores, report = tiered_sentiment(texts, llm)
+    assert sent == ["Quarterly call today"]
+    assert scores.index.tolist() == ["a", "b", "c"]
+    assert scores["a"] > 0.25 and scores["c"] < -0.25 and scores["b"] == 0.0
+    assert report["rows"] == 3 and report["escalated"] == 1 and report["escalation_rate"] == 0.333
+    assert report["agreement_escalated"] == 1.0 and report["agreement_audited"] is None
+
+
+def test_audited_rows_keep_their_local_score():
+    texts = ["Shares surge after profits beat estimates", "Stock plunges as losses mount, fraud probe"]
+    local = lexicon_scores(texts)["score"]
+    scores, report = tiered_sentiment(texts, lambda batch: [-1.0] * len(batch), audit_fraction=1.0)
+    assert scores.tolist() == local.tolist()
+    assert report["escalated"] == 0 and report["audited"] == 2
+    assert report["agreement_audited"] == 0.5
+
+
+def test_failed_llm_rows_come_back_as_nan():
+    scores, _ = tiered_sentiment(["Quarterly call today"], lambda batch: [None])
+    assert scores.isna().all()
+
+
+def test_nothing_escalated_skips_the_llm():
+    def never(batch):
+        raise AssertionError("LLM should not be called")
+
+    scores, report = tiered_sentiment(["Shares surge after profits beat estimates"], never)
+    assert report["escalated"] == 0 and report["llm_seconds_per_row"] == 0.0
+    assert scores.iloc[0] > 0
@@ -0,0 +1,60 @@
+from pipeline_kit import memo
+from pipeline_kit.memo import MemoTable, distinct_values, memo_version
+
+
+class CountingResolver:
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def __call__(self, values):
+        self.calls.append(list(values))
+        return {value: self.answers.get(value) for value in values}
+
+
+def test_distinct_values_drop_nulls_and_keep_first_seen_order():
+    assert distinct_values(["b", None, "a", "b", float("nan"), "a"]) == ["b", "a"]
+
+
+def test_version_changes_with_any_part():
+    assert memo_version("prompt", "gpt-4o") == memo_version("prompt", "gpt-4o")
+    assert memo_version("prompt", "gpt-4o") != memo_version("prompt", "gpt-4o-mini")
+
+
+def test_resolve_calls_the_resolver_once_per_new_value(tmp_path):
+    path = str(tmp_path / "memo.sqlite")
+    resolver = CountingResolver({"Scherzer": {"id": 1}, "Ohtani": {"id": 2}})
+
+    first = MemoTable("pitcher", version="v1", path=path)
+    assert first.resolve(["Scherzer", "Ohtani", "Scherzer"], resolver) == {"Scherzer": {"id": 1}, "Ohtani": {"id": 2}}
+    assert resolver.calls == [["Scherzer", "Ohtani"]]
+
+    # A later run (new table object, same file) only pays for unseen values
+    second = MemoTable("pitcher", version="v1", path=path)
+    assert second.resolve(["Ohtani", "Scherzer"], resolver) == {"Ohtani": {"id": 2}, "Scherzer": {"id": 1}}
+    assert resolver.calls == [["Scherzer", "Ohtani"]]
+    assert second.stats() == {"hits": 2, "misses": 0, "hit_rate": 1.0}
+
+
+def test_unresolved_values_are_retried(tmp_path):
+    table = MemoTable("pitcher", version="v1", path=str(tmp_path / "memo.sqlite"))
+    resolver = CountingResolver({})
+    assert table.resolve(["Nobody"], resolver) == {}
+    resolver.answers["Nobody"] = {"id": 9}
+    assert table.resolve(["Nobody"], resolver) == {"Nobody": {"id": 9}}
+    assert resolver.calls == [["Nobody"], ["Nobody"]]
+
+
+def test_namespaces_and_versions_are_isolated(tmp_path):
+    path = str(tmp_path / "memo.sqlite")
+    MemoTable("pitcher", version="v1", path=path).set_many({"Scherzer": {"id": 1}})
+    assert MemoTable("pitcher", version="v2", path=path).get_many(["Scherzer"]) == {}
+    assert MemoTable("batter", version="v1", path=path).get_many(["Scherzer"]) == {}
+
+
+def test_get_many_spans_lookup_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(memo, "LOOKUP_CHUNK", 3)
+    table = MemoTable("plays", path=str(tmp_path / "memo.sqlite"))
+    table.set_many({f"h{i}": {"n": i} for i in range(10)})
+    found = table.get_many([f"h{i}" for i in range(12)])
+    assert found == {f"h{i}": {"n": i} for i in range(10)}
@@ -0,0 +1,54 @@
+import json
+
+from pipeline_kit.batch_api import parse_results, response_format_param
+from pipeline_kit.news_enrichment import (
+    MERGED_PROMPT, QC_PROMPT, REGIONS, TOPICS, EnrichedArticle, clean_enrichment, fallback_rows,
+)
+
+
+def merged_body(**fields):
+    content = {
+        "source": "Reuters", "title": "Tesla beats estimates", "short_summary": "Deliveries rose.",
+        "publish_date": "2025-10-05T12:00:00Z", "sentiment": 0.6, "topic": "Financial", "region": "North America",
+        **fields,
+    }
+    return {"choices": [{"message": {"role": "assistant", "content": json.dumps(content)}}]}
+
+
+def test_prompts_embed_the_schema_and_every_label():
+    assert '"title": "EnrichedArticle"' in MERGED_PROMPT
+    assert all(label in MERGED_PROMPT and label in QC_PROMPT for label in TOPICS + REGIONS)
+    schema = response_format_param(EnrichedArticle)["json_schema"]
+    assert schema["strict"] and set(schema["schema"]["required"]) >= {"sentiment", "topic", "region"}
+
+
+def test_merged_response_parses_into_clean_fields():
+    parsed = parse_results({"a": merged_body(topic=" financial ", region="north america")}, EnrichedArticle)
+    item = clean_enrichment(parsed["a"].model_dump())
+    assert (item["sentiment"], item["topic"], item["region"]) == (0.6, "Financial", "North America")
+    assert fallback_rows([item], ["sentiment", "topic", "region"]) == []
+
+
+def test_out_of_range_sentiment_is_clamped_and_unknown_labels_fall_back():
+    parsed = parse_results({
+        "high": merged_body(sentiment=3.5),
+        "label": merged_body(topic="Earnings", region="United States"),
+        "nan": merged_body(sentiment="NaN"),
+    }, EnrichedArticle)
+    items = [clean_enrichment(parsed[key].model_dump()) for key in ("high", "label", "nan")]
+    assert items[0]["sentiment"] == 1.0
+    assert items[1]["topic"] is None and items[1]["region"] is None
+    assert items[2]["sentiment"] is None
+    assert fallback_rows(items, ["sentiment"]) == [2]
+    assert fallback_rows(items, ["topic", "region"]) == [1]
+
+
+def test_unparseable_merged_response_maps_to_none():
+    body = {"choices": [{"message": {"role": "assistant", "content": '{"title": "missing fields"}'}}]}
+    assert parse_results({"a": body}, EnrichedArticle) == {"a": None}
+
+
+def test_staged_items_only_have_their_own_fields_checked():
+    item = clean_enrichment({"title": "T", "short_summary": "S"})
+    assert item == {"title": "T", "short_summary": "S"}
+    assert fallback_rows([item, {"sentiment": None}, {"sentiment": 0.1}], ["sentiment"]) == [0, 1]
@@ -0,0 +1,56 @@
+from pipeline_kit.news_state import _watermarks, article_hashes, filter_unseen, record_loaded
+
+
+def loaded(url, query, published_at):
+    url_hash, content_hash = article_hashes({"url": url, "title": url})
+    return {"url": url, "query": query, "publishedAt": published_at, "url_hash": url_hash, "content_hash": content_hash}
+
+
+def test_article_hashes_ignore_case_and_whitespace():
+    a = {"url": "https://example.com/1", "title": " Tesla ", "description": "Up"}
+    b = {"url": "https://example.com/1", "title": "tesla", "description": "up "}
+    assert article_hashes(a) == article_hashes(b)
+
+
+def test_filter_unseen_drops_loaded_and_duplicate_articles_oldest_first(fake_connection):
+    seen_url_hash, _ = article_hashes({"url": "https://example.com/old"})
+    conn = fake_connection(rows=[(seen_url_hash, "x")])
+    articles = [
+        {"url": "https://example.com/new", "title": "B", "publishedAt": "2025-10-05T13:00:00Z"},
+        {"url": "https://example.com/old", "title": "A", "publishedAt": "2025-10-05T10:00:00Z"},
+        {"url": "https://example.com/mid", "title": "C", "publishedAt": "2025-10-05T11:00:00Z"},
+        {"url": "https://example.com/mid", "title": "C", "publishedAt": "2025-10-05T11:00:00Z"},
+    ]
+    assert [a["url"] for a in filter_unseen(conn, articles)] == ["https://example.com/mid", "https://example.com/new"]
+
+
+def test_watermark_is_newest_loaded_article():
+    rows = [("Tesla", "2025-10-05T10:00:00Z"), ("Tesla", "2025-10-05T12:00:00Z"), ("NVIDIA", "2025-10-05T09:00:00Z")]
+    assert _watermarks(rows) == {"Tesla": "2025-10-05T12:00:00Z", "NVIDIA": "2025-10-05T09:00:00Z"}
+
+
+def test_watermark_stays_below_oldest_unloaded_article():
+    rows = [("Tesla", "2025-10-05T10:00:00Z"), ("Tesla", "2025-10-05T12:00:00Z")]
+    pending = [{"query": "Tesla", "publishedAt": "2025-10-05T11:00:00Z"}]
+    assert _watermarks(rows, pending) == {"Tesla": "2025-10-05T10:00:00Z"}
+    pending = [{"query": "Tesla", "publishedAt": "2025-10-05T09:00:00Z"}]
+    assert _watermarks(rows, pending) == {}
+
+
+def test_watermark_only_advances_for_fully_paged_queries():
+    rows = [("Tesla", "2025-10-05T12:00:00Z"), ("NVIDIA", "2025-10-05T09:00:00Z")]
+    assert _watermarks(rows, complete={"NVIDIA"}) == {"NVIDIA": "2025-10-05T09:00:00Z"}
+
+
+def test_record_loaded_ignores_loaded_articles_in_pending(fake_connection):
+    done = loaded("https://example.com/1", "Tesla", "2025-10-05T12:00:00Z")
+    dropped = loaded("https://example.com/2", "Tesla", "2025-10-05T11:00:00Z")
+    conn = fake_connection()
+    record_loaded(conn, [done], pending=[done, dropped], complete={"Tesla"})
+    (_, hashes), (_, watermarks) = conn.executed
+    assert hashes == [(done["url_hash"], done["content_hash"], "Tesla", "2025-10-05T12:00:00Z")]
+    assert watermarks == []
+
+    conn = fake_connection()
+    record_loaded(conn, [done], pending=[done], complete={"Tesla"})
+    assert conn.executed[1][1] == [("Tesla", "2025-10-05T12:00:00Z")]
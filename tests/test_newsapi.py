@@ -0,0 +1,97 @@
+import httpx
+import pytest
+
+from pipeline_kit import newsapi
+from pipeline_kit.newsapi import NewsAPIError, extract_articles
+
+
+def article(n):
+    return {"title": f"Article {n}", "url": f"https://example.com/{n}", "publishedAt": "2025-10-05T12:00:00Z"}
+
+
+def pages(total, page_size=2):
+    """Handler serving ``total`` articles, ``page_size`` per page."""
+    def handler(request):
+        page = int(request.url.params["page"])
+        start = (page - 1) * page_size
+        return httpx.Response(200, json={
+            "status": "ok",
+            "totalResults": total,
+            "articles": [article(n) for n in range(start, min(start + page_size, total))],
+        })
+    return handler
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of waiting."""
+    delays = []
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(newsapi.asyncio, "sleep", sleep)
+    return delays
+
+
+def fetch(handler, queries="Tesla", **kwargs):
+    return extract_articles(
+        queries, "2025-10-05", "2025-10-06", api_key="key", page_size=2,
+        transport=httpx.MockTransport(handler), **kwargs
+    )
+
+
+def test_pages_every_query_and_reports_completion():
+    report = {}
+    articles = fetch(pages(5), ["Tesla", "NVIDIA"], report=report)
+    assert len(articles) == 10
+    assert {a["query"] for a in articles} == {"Tesla", "NVIDIA"}
+    assert report == {"Tesla": {"articles": 5, "complete": True}, "NVIDIA": {"articles": 5, "complete": True}}
+
+
+def test_max_pages_marks_query_incomplete():
+    report = {}
+    assert len(fetch(pages(5), max_pages=2, report=report)) == 4
+    assert report["Tesla"]["complete"] is False
+
+
+def test_bad_api_key_raises():
+    def handler(request):
+        return httpx.Response(401, json={"status": "error", "code": "apiKeyInvalid", "message": "Your API key is invalid"})
+
+    with pytest.raises(NewsAPIError, match="401") as error:
+        fetch(handler)
+    assert error.value.code == "apiKeyInvalid"
+
+
+def test_rate_limit_is_retried_after_retry_after(sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "7"}, json={"code": "rateLimited"})
+        return pages(1)(request)
+
+    assert len(fetch(handler)) == 1
+    assert sleeps == [7.0]
+
+
+def test_server_errors_back_off_then_raise(sleeps):
+    def handler(request):
+        return httpx.Response(503, text="unavailable")
+
+    with pytest.raises(NewsAPIError, match="attempts"):
+        fetch(handler)
+    assert sleeps == [1.0, 2.0, 4.0, 8.0]
+
+
+def test_result_cap_stops_paging_without_failing():
+    def handler(request):
+        if request.url.params["page"] != "1":
+            return httpx.Response(426, json={"code": "maximumResultsReached", "message": "cap"})
+        return pages(6)(request)
+
+    report = {}
+    assert len(fetch(handler, report=report)) == 2
+    assert report["Tesla"]["complete"] is False
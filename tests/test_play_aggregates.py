@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from pipeline_kit.play_aggregates import AggregateStore, enrichment_digest, finalize, partial_aggregates
+
+
+def plays(n=4, excitement=5, start=0):
+    return pd.DataFrame({
+        "play_id": range(start, start + n),
+        "play_hash": [f"h{i}" for i in range(start, start + n)],
+        "inning_number": 1,
+        "inning_half": "top",
+        "pitcher_id": 10,
+        "pitcher_canonical_name": "Ace",
+        "pitch_type_canonical": ["Fastball", "Fastball", "Slider", "Fastball"][:n] if start == 0 else "Slider",
+        "pitch_velocity_mph": 95.0,
+        "post_pitch_balls": 1,
+        "post_pitch_strikes": 1,
+        "ball_in_play": False,
+        "batter_id": 20,
+        "batter_canonical_name": "Slugger",
+        "key_moment": [True] + [False] * (n - 1),
+        "excitement": excitement,
+    })
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AggregateStore(str(tmp_path / "play_stats"))
+
+
+def test_finalize_derives_means_and_modes():
+    game = finalize(partial_aggregates(plays(), "g1"))
+    pitcher = game["pitcher"].iloc[0]
+    assert pitcher["total_pitches"] == 4
+    assert pitcher["avg_pitch_speed_mph"] == 95.0
+    assert pitcher["most_frequent_pitch"] == "Fastball"
+    assert game["inning"].iloc[0][["plays", "key_moments", "avg_excitement"]].tolist() == [4, 1, 5.0]
+
+
+def test_reappend_is_idempotent_and_new_plays_are_added(store):
+    batch, _ = store.append(plays(), "g1")
+    assert batch
+    assert store.append(plays(), "g1") == (None, {})
+    longer = pd.concat([plays(), plays(2, start=4)], ignore_index=True)
+    batch2, _ = store.append(longer, "g1")
+    assert batch2 not in (None, batch)
+    assert store.rollup("game")["pitcher"]["total_pitches"].tolist() == [6]
+
+
+def test_changed_enrichment_replaces_the_game(store):
+    store.append(plays(excitement=5), "g1")
+    store.append(plays(excitement=5), "g2")
+    batch, _ = store.append(plays(excitement=9), "g1")
+    assert batch
+    assert store.batches("g1") == [batch]
+    inning = store.rollup("game")["inning"].set_index("game_id")
+    assert inning.loc["g1", "avg_excitement"] == 9.0
+    assert inning.loc["g1", "plays"] == 4
+    assert inning.loc["g2", "avg_excitement"] == 5.0
+
+
+def test_digest_ignores_dtype_differences():
+    ints = plays()
+    floats = ints.assign(post_pitch_balls=1.0, excitement=5.0, key_moment=ints["key_moment"].astype(object))
+    assert enrichment_digest(ints).tolist() == enrichment_digest(floats).tolist()
+    assert enrichment_digest(ints).tolist() != enrichment_digest(ints.assign(excitement=6)).tolist()
+
+
+def test_season_rollup_sums_games(store):
+    store.append(plays(), "g1")
+    store.append(plays(), "g2")
+    season = store.rollup("season")
+    assert season["pitcher"]["total_pitches"].tolist() == [8]
+    assert season["batter"]["plate_appearances"].tolist() == [8]
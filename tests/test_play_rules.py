@@ -0,0 +1,51 @@
+import pandas as pd
+
+from pipeline_kit.play_rules import RULE_FIELDS, coverage, pre_extract
+
+
+def row(text):
+    return pre_extract([text]).iloc[0]
+
+
+def test_situation_fields_from_a_typical_call():
+    rules = row(
+        "Bottom of the third, one out, the home team leading 3-1. "
+        "The count is 1-2 and Scherzer fires a 97-mph Slider, fouled off; the count moves to 1-2 again."
+    )
+    assert rules["inning_number"] == 3 and rules["inning_half"] == "Bottom"
+    assert rules["outs"] == 1
+    assert (rules["score_home"], rules["score_away"]) == (3, 1)
+    assert (rules["pre_pitch_balls"], rules["pre_pitch_strikes"]) == (1, 2)
+    assert (rules["post_pitch_balls"], rules["post_pitch_strikes"]) == (1, 2)
+    assert rules["pitch_type"] == "slider" and rules["pitch_velocity_mph"] == 97.0
+
+
+def test_trailing_team_and_word_forms():
+    rules = row("Top of the 9th, nobody out, visitors trailing 2-5 with a full count.")
+    assert rules["inning_number"] == 9 and rules["inning_half"] == "Top"
+    assert rules["outs"] == 0
+    assert (rules["score_home"], rules["score_away"]) == (5, 2)
+    assert (rules["pre_pitch_balls"], rules["pre_pitch_strikes"]) == (3, 2)
+
+
+def test_ties_and_scoreless_games():
+    assert (row("Game tied at two in the sixth.")[["score_home", "score_away"]] == [2, 2]).all()
+    assert (row("Still scoreless here.")[["score_home", "score_away"]] == [0, 0]).all()
+
+
+def test_first_count_phrase_wins_and_invalid_counts_are_dropped():
+    assert row("The count is 2-1; the count goes to 3-1.")[["pre_pitch_balls", "post_pitch_balls"]].tolist() == [2, 3]
+    invalid = row("The count is 4-2.")
+    assert pd.isna(invalid["pre_pitch_balls"]) and pd.isna(invalid["pre_pitch_strikes"])
+
+
+def test_unmatched_and_missing_texts_are_null():
+    rules = pre_extract(["Crowd noise.", None])
+    assert list(rules.columns) == RULE_FIELDS
+    assert rules.isna().all().all()
+
+
+def test_coverage_is_share_of_plays_filled():
+    rules = pre_extract(["A 95 mph fastball.", "Changeup, low.", "Ball in the dirt."])
+    shares = coverage(rules)
+    assert shares["pitch_type"] == 0.667 and shares["pitch_velocity_mph"] == 0.333 and shares["outs"] == 0.0
@@ -0,0 +1,163 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from pipeline_kit.artifacts import read_frame, write_artifact
+from pipeline_kit.play_shards import (
+    enrichment_store, game_stage, half_inning_windows, half_innings, merge_shard_artifacts, pending_plays,
+    plan_game_shards, read_plays, shard_stage, stage_checkpoint, window_key, window_results,
+)
+
+TEXTS = [
+    "Top of the 1st inning. Scherzer pitches to Springer.",
+    "Ball 1 low and away.",
+    "Springer grounds out to short.",
+    "Bottom of the 1st inning. Bassitt pitches to Ohtani.",
+    "Ohtani homers to right!",
+]
+
+
+def plays(game_id="game_7", texts=TEXTS):
+    return pd.DataFrame({
+        "game_id": game_id,
+        "play_id": range(1, len(texts) + 1),
+        "play_hash": [f"h{i}" for i in range(len(texts))],
+        "playbyplay": texts,
+    })
+
+
+def test_stage_names_combine_game_and_shard():
+    assert game_stage("game_7", shard_stage("extracted", 3)) == "game_7.extracted-0003"
+
+
+def test_stage_is_reused_only_while_its_inputs_are_unchanged(tmp_path):
+    root = str(tmp_path)
+    stage = game_stage("game_7", shard_stage("extracted", 0))
+    plays_ref = write_artifact(plays(), game_stage("game_7", "plays"), root=root)
+    assert stage_checkpoint(stage, inputs={"plays": plays_ref}, root=root) is None
+
+    ref = write_artifact(plays()[["play_id"]], stage, inputs={"plays": plays_ref}, root=root)
+    assert stage_checkpoint(stage, inputs={"plays": plays_ref}, root=root) == ref
+    assert stage_checkpoint(stage, inputs={"plays": plays_ref}, rebuild=True, root=root) is None
+
+    # Re-loading the game issues a new token, so the shard is rebuilt
+    reloaded = write_artifact(plays(), game_stage("game_7", "plays"), root=root)
+    assert stage_checkpoint(stage, inputs={"plays": reloaded}, root=root) is None
+
+
+def test_read_plays_joins_projected_columns_for_one_range(tmp_path):
+    root = str(tmp_path)
+    plays_ref = write_artifact(plays(), "plays", root=root, chunk_rows=2)
+    extracted = write_artifact(pd.DataFrame({"play_id": [1, 3, 4], "outs": [0, 1, 0]}), "extracted", root=root)
+    df = read_plays((plays_ref, ["play_hash"]), (extracted, ["outs", "missing"]), play_ids=(2, 4))
+    df = df.sort_values("play_id", ignore_index=True)
+    assert list(df.columns) == ["play_id", "play_hash", "outs"]
+    assert df["play_id"].tolist() == [2, 3, 4]
+    assert df["outs"].tolist()[1:] == [1, 0] and pd.isna(df["outs"].iloc[0])
+
+
+def ranges(shards):
+    return [(s["first_play_id"], s["last_play_id"]) for s in shards]
+
+
+def test_shards_cover_the_game_in_consecutive_ranges(tmp_path):
+    ref = write_artifact(plays(), "plays", root=str(tmp_path))
+    shards = plan_game_shards("game_7", ref, shard_size=2)
+    assert [s["shard"] for s in shards] == [0, 1, 2] and ranges(shards) == [(1, 2), (3, 4), (5, 5)]
+    assert all(s["game_id"] == "game_7" and s["plays"] is ref for s in shards)
+    assert ranges(plan_game_shards("game_7", ref)) == [(1, 5)]
+    assert plan_game_shards("game_7", {"uri": "u", "rows": 0}, shard_size=2) == []
+
+
+def test_shards_end_on_half_inning_boundaries(tmp_path):
+    df = plays()
+    df["half_inning"] = half_innings(df["playbyplay"]).values
+    assert df["half_inning"].tolist() == ["1Top"] * 3 + ["1Bottom"] * 2
+    ref = write_artifact(df, "plays", root=str(tmp_path))
+    # The 3-play top half is never split, even when it is longer than a shard
+    assert ranges(plan_game_shards("game_7", ref, shard_size=2)) == [(1, 3), (4, 5)]
+    assert ranges(plan_game_shards("game_7", ref, shard_size=4)) == [(1, 3), (4, 5)]
+    assert ranges(plan_game_shards("game_7", ref, shard_size=5)) == [(1, 5)]
+
+
+def test_windows_of_a_shard_use_the_whole_game_labels(tmp_path):
+    df = plays()
+    df["half_inning"] = half_innings(df["playbyplay"]).values
+    # Alone, the shard's first play has no inning marker to label it
+    shard = df[df["play_id"] >= 2]
+    assert [label for label, _ in half_inning_windows(shard[["play_id", "playbyplay"]])] == ["", "1Bottom"]
+    assert [label for label, _ in half_inning_windows(shard)] == ["1Top", "1Bottom"]
+
+
+def test_merge_orders_by_play_id_and_is_rebuilt_when_a_shard_changes(tmp_path):
+    root = str(tmp_path)
+    stage = game_stage("game_7", "analysis")
+    shard_refs = [
+        write_artifact(pd.DataFrame({"play_id": [4, 3], "excitement": [9, 2]}), shard_stage(stage, 1), root=root),
+        write_artifact(pd.DataFrame({"play_id": [1, 2], "excitement": [1, 5]}), shard_stage(stage, 0), root=root),
+    ]
+    merged = merge_shard_artifacts(shard_refs, stage, root=root)
+    assert read_frame(merged)["play_id"].tolist() == [1, 2, 3, 4]
+    assert merge_shard_artifacts(shard_refs, stage, root=root) == merged
+
+    shard_refs[0] = write_artifact(pd.DataFrame({"play_id": [3], "excitement": [2]}), shard_stage(stage, 1), root=root)
+    remerged = merge_shard_artifacts(shard_refs, stage, root=root)
+    assert remerged["token"] != merged["token"] and remerged["rows"] == 3
+
+
+def test_windows_follow_half_innings_in_play_order():
+    windows = half_inning_windows(plays().iloc[::-1])
+    assert [(label, [play_id for play_id, _ in window]) for label, window in windows] == [
+        ("1Top", [1, 2, 3]), ("1Bottom", [4, 5]),
+    ]
+    assert windows[0][1][1] == (2, "Ball 1 low and away.")
+
+
+def test_long_half_innings_are_split_to_the_token_budget():
+    windows = half_inning_windows(plays(), token_budget=40)
+    assert [(label, [play_id for play_id, _ in window]) for label, window in windows] == [
+        ("1Top", [1, 2]), ("1Top", [3]), ("1Bottom", [4, 5]),
+    ]
+
+
+def test_window_key_depends_on_game_and_every_play_in_the_window():
+    window = [(1, "a"), (2, "b")]
+    hash_of = {1: "h1", 2: "h2"}
+    key = window_key("game_7", "1Top", window, hash_of)
+    assert key == window_key("game_7", "1Top", window, dict(hash_of))
+    assert key != window_key("game_6", "1Top", window, hash_of)
+    assert key != window_key("game_7", "1Top", window, {1: "h1", 2: "changed"})
+    assert key != window_key("game_7", "1Top", window[:1], hash_of)
+
+
+def test_window_results_keep_the_window_ids_and_clamp_excitement():
+    window = [(1, "a"), (2, "b")]
+    parsed = SimpleNamespace(plays=[
+        SimpleNamespace(play_id=1, key_moment=True, excitement=14),
+        SimpleNamespace(play_id=2, key_moment=False, excitement=0),
+        SimpleNamespace(play_id=9, key_moment=True, excitement=5),
+    ])
+    assert window_results(window, parsed) == {
+        1: {"key_moment": True, "excitement": 10}, 2: {"key_moment": False, "excitement": 1},
+    }
+    assert window_results(window, None) == {}
+
+
+def test_enrichment_store_reuses_plays_by_hash_across_runs(tmp_path):
+    path = str(tmp_path / "memo.sqlite")
+    enrichment_store("extracted", "gpt-4o", "prompt", path=path).set_many({"h0": {"outs": 0}, "h1": {"outs": 1}})
+
+    # A later run of another game with the same play text finds it; a new prompt does not
+    df = plays("game_6")
+    stored = enrichment_store("extracted", "gpt-4o", "prompt", path=path).get_many(df["play_hash"])
+    assert stored == {"h0": {"outs": 0}, "h1": {"outs": 1}}
+    assert pending_plays(df["play_hash"], stored) == [2, 3, 4]
+    assert enrichment_store("extracted", "gpt-4o", "new prompt", path=path).get_many(df["play_hash"]) == {}
+    assert enrichment_store("analysis", "gpt-4o", "prompt", path=path).get_many(df["play_hash"]) == {}
+
+
+def test_stored_plays_count_only_if_they_have_every_field_asked_now():
+    stored = {"h0": {"outs": 0, "pitch_type": "Slider"}, "h1": {"outs": 1}}
+    asked = [("outs",), ("outs", "pitch_type"), ()]
+    assert pending_plays(["h0", "h1", "h1"], stored, asked) == [1]
+    assert pending_plays(["h0", "h9"], stored, [(), ()]) == [1]
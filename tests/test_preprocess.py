@@ -0,0 +1,46 @@
+import pandas as pd
+import pyarrow as pa
+
+from pipeline_kit.preprocess import iter_article_chunks, normalize_articles, preprocess_articles, take_sample
+
+
+def articles(n):
+    for i in range(n):
+        yield {"title": f" Title\n{i} ", "description": "Desc", "content": f"Body  {i} [+1234 chars]", "url": f"u{i}"}
+
+
+def test_normalize_cleans_whitespace_and_truncation_markers():
+    frame = normalize_articles(pd.DataFrame([{"title": " A\tB ", "description": None, "content": "Text [+99 chars]"}]))
+    assert frame.loc[0, "title"] == "A B"
+    assert frame.loc[0, "description"] == ""
+    assert frame.loc[0, "content"] == "A B Text"
+
+
+def test_chunks_are_fixed_size_with_a_running_index():
+    chunks = list(iter_article_chunks(articles(5), chunk_size=2, columns=["url"]))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert chunks[2].index.tolist() == [4]
+    assert list(chunks[0].columns) == ["title", "description", "content", "url"]
+    assert chunks[0].loc[1, "content"] == "Title 1 Desc Body 1"
+
+
+def test_articles_are_consumed_lazily():
+    stream = articles(10)
+    chunk = next(iter_article_chunks(stream, chunk_size=3))
+    assert len(chunk) == 3
+    assert next(stream)["url"] == "u3"
+
+
+def test_sample_by_count_or_fraction():
+    assert list(take_sample(range(10), 3)) == [0, 1, 2]
+    assert list(take_sample(range(10))) == list(range(10))
+    fraction = list(take_sample(range(1000), 0.1, random_state=1))
+    assert fraction == list(take_sample(range(1000), 0.1, random_state=1))
+    assert 50 < len(fraction) < 150
+
+
+def test_arrow_chunks_and_collected_frame():
+    batch = next(iter_article_chunks(articles(3), as_arrow=True))
+    assert isinstance(batch, pa.RecordBatch) and batch.num_rows == 3
+    assert len(preprocess_articles(articles(5), chunk_size=2)) == 5
+    assert preprocess_articles([]).columns.tolist() == ["title", "description", "content"]
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from pipeline_kit.publish_times import publish_times, with_publish_times
+
+
+def test_mixed_iso_forms_all_parse():
+    times = publish_times([
+        "2025-10-05T12:00:00Z",
+        "2025-10-05T13:45:10.123Z",
+        "2025-10-05 08:00:00 -04:00",
+        "2025-10-06",
+    ])
+    assert times["publish_gmt"].tolist() == [
+        "2025-10-05T12:00:00+00:00",
+        "2025-10-05T13:45:10+00:00",
+        "2025-10-05T12:00:00+00:00",
+        "2025-10-06T00:00:00+00:00",
+    ]
+    assert times["publish_est"][2] == "2025-10-05T08:00:00-04:00"
+    assert times["publish_pst"][0] == "2025-10-05T05:00:00-07:00"
+
+
+def test_short_date_keeps_the_published_offset():
+    times = publish_times(["2025-10-05T23:30:00-04:00", pd.Timestamp("2025-10-05 23:30", tz="America/New_York")])
+    assert times["short_date"].tolist() == ["2025-10-05", "2025-10-05"]
+    assert times["publish_gmt"][0] == "2025-10-06T03:30:00+00:00"
+
+
+def test_unparseable_and_missing_dates_become_none():
+    times = publish_times(["yesterday", None])
+    assert times.isna().all().all()
+    assert times["short_date"].tolist() == [None, None]
+
+
+def test_with_publish_times_keeps_other_keys():
+    articles = with_publish_times([{"title": "A", "publish_date": "2025-10-05T12:00:00Z"}])
+    assert articles[0]["title"] == "A"
+    assert articles[0]["short_date"] == "2025-10-05"
+    assert with_publish_times([]) == []
@@ -0,0 +1,52 @@
+from pipeline_kit.schema_registry import ensure_schema, fields_hash, migration_ddl
+
+FIELDS = {"title": "TEXT", "sentiment": "FLOAT"}
+
+
+def never(*args):
+    raise AssertionError("generator should not be called")
+
+
+def test_fields_hash_ignores_key_order():
+    assert fields_hash({"a": "TEXT", "b": "INT"}) == fields_hash({"b": "INT", "a": "TEXT"})
+    assert fields_hash({"a": "TEXT"}) != fields_hash({"a": "INT"})
+
+
+def test_migration_adds_and_retypes_but_never_drops():
+    ddl = migration_ddl("news", {"title": "TEXT", "old": "TEXT", "score": "INT"}, {"title": "TEXT", "score": "FLOAT", "url": "TEXT"})
+    assert ddl.splitlines() == [
+        "ALTER TABLE news ALTER COLUMN score TYPE FLOAT USING score::FLOAT;",
+        "ALTER TABLE news ADD COLUMN IF NOT EXISTS url TEXT;",
+    ]
+
+
+def test_unchanged_schema_skips_generation(fake_connection):
+    conn = fake_connection(one=(3, fields_hash(FIELDS), FIELDS))
+    result = ensure_schema(conn, "news", FIELDS, generate_ddl=never, generate_migration=never)
+    assert result["action"] == "unchanged" and result["version"] == 3
+    assert not conn.statements("INSERT")
+    assert conn.commits == 1
+
+
+def test_new_table_is_created_and_registered(fake_connection):
+    conn = fake_connection()
+    result = ensure_schema(conn, "news", FIELDS, generate_ddl=lambda table, fields: f"CREATE TABLE {table} ();")
+    assert result["action"] == "created" and result["version"] == 1
+    assert ("CREATE TABLE news ();", None) in conn.executed
+    (_, params), = conn.statements("INSERT")
+    assert params[:3] == ("news", 1, fields_hash(FIELDS))
+
+
+def test_changed_fields_are_migrated_from_the_latest_version(fake_connection):
+    old = {"title": "TEXT"}
+    conn = fake_connection(one=(1, fields_hash(old), old))
+    result = ensure_schema(conn, "news", FIELDS, generate_ddl=never)
+    assert result["action"] == "migrated" and result["version"] == 2
+    assert result["ddl"] == "ALTER TABLE news ADD COLUMN IF NOT EXISTS sentiment FLOAT;"
+
+
+def test_existing_table_is_adopted_without_ddl(fake_connection):
+    conn = fake_connection(rows=[("title", "text"), ("sentiment", "double precision")])
+    result = ensure_schema(conn, "news", FIELDS, generate_ddl=never, generate_migration=never)
+    assert result["action"] == "registered" and result["ddl"] == ""
+    assert len(conn.statements("INSERT")) == 1
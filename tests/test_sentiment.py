@@ -0,0 +1,52 @@
+import json
+from types import SimpleNamespace
+
+from pipeline_kit.sentiment import SentimentBatch, batch_sentiment, pack_batches
+
+
+class FakeLLM:
+    """Scores each text by its length; ``skip`` ids are left out and ``fail`` texts raise."""
+
+    def __init__(self, skip=(), fail=()):
+        self.requests = []
+        self.skip = set(skip)
+        self.fail = set(fail)
+        self.beta = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(parse=self.parse)))
+
+    def parse(self, model, messages, response_format, temperature):
+        payload = json.loads(messages[-1]["content"])
+        self.requests.append(payload)
+        if any(item["text"] in self.fail for item in payload):
+            raise RuntimeError("rate limited")
+        parsed = SentimentBatch(scores=[
+            {"id": item["id"], "score": len(item["text"]) / 10 - 1}
+            for item in payload if item["text"] not in self.skip
+        ] + [{"id": 99, "score": 0.0}])  # an id that was never sent is ignored
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(parsed=parsed))])
+
+
+def test_pack_batches_respects_budget_and_size():
+    batches = pack_batches(["x" * 40] * 5, token_budget=50, max_batch_size=10)
+    assert [[pos for pos, _ in batch] for batch in batches] == [[0, 1], [2, 3], [4]]
+    assert len(pack_batches(["a"] * 7, max_batch_size=3)) == 3
+
+
+def test_oversized_texts_are_truncated_and_sent_alone():
+    batches = pack_batches(["short", "y" * 1000, None], token_budget=100)
+    assert [len(batch) for batch in batches] == [1, 1, 1]
+    assert batches[1] == [(1, "y" * 400)] and batches[2] == [(2, "")]
+
+
+def test_scores_align_with_inputs_and_are_clamped():
+    llm = FakeLLM()
+    scores = batch_sentiment(["abcde", "", "x" * 30], llm=llm)
+    assert scores == [-0.5, -1.0, 1.0]
+    assert len(llm.requests) == 1
+    assert [item["id"] for item in llm.requests[0]] == [0, 1, 2]
+
+
+def test_skipped_ids_and_failed_batches_are_none():
+    llm = FakeLLM(skip={"b"}, fail={"c"})
+    scores = batch_sentiment(["a", "b", "c", "d"], llm=llm, max_batch_size=2)
+    assert scores == [-0.9, None, None, None]
+    assert len(llm.requests) == 2